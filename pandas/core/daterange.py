@@ -2,11 +2,13 @@
 
 from datetime import datetime
 import operator
+import threading
 
 import numpy as np
 
 from pandas.core.index import Index
 import pandas.core.datetools as datetools
+import pandas.lib.tseries as tseries
 
 __all__ = ['DateRange']
 
@@ -22,6 +24,185 @@ def _bin_op(op):
 _CACHE_START = datetime(1950, 1, 1)
 _CACHE_END   = datetime(2030, 1, 1)
 
+# cached windows stay within the dates datetime can represent
+_MIN_MICROS = datetools._to_micros(datetime(1, 1, 2))
+_MAX_MICROS = datetools._to_micros(datetime(9999, 1, 1))
+
+def _isCacheable(offset):
+    return (offset.isAnchored() and
+            isinstance(offset, (datetools.CacheableOffset, datetools.Tick)))
+
+class _RangeCache(object):
+    """
+    Thread-safe LRU cache of the dates of anchored offsets, which DateRange
+    slices its ranges from. Each offset's window starts at 1950-2030 (Ticks:
+    the first requested range) and is extended lazily, doubling its span,
+    when a request falls outside it
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of offsets kept, the least recently used is evicted first
+    maxlength : int
+        Windows that would grow beyond this many dates are not stored, the
+        request is served from a one-off window instead
+    """
+    def __init__(self, maxsize=32, maxlength=250000):
+        self.maxsize = maxsize
+        self.maxlength = maxlength
+
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            # key -> (DateRange, int64 micros), keys least recently used first
+            self._entries = {}
+            self._order = []
+            self.hits = self.misses = self.extensions = self.evictions = 0
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        self._lock.acquire()
+        try:
+            return {'hits' : self.hits, 'misses' : self.misses,
+                    'extensions' : self.extensions,
+                    'evictions' : self.evictions,
+                    'size' : len(self._entries), 'maxsize' : self.maxsize,
+                    'dates' : sum([len(micros) for _, micros
+                                   in self._entries.values()])}
+        finally:
+            self._lock.release()
+
+    def lookup(self, offset, start, end, periods):
+        """
+        Slice start:end (or periods dates from start / up to end) of the
+        cached dates of offset. start and end must lie on the offset
+        """
+        if start is not None:
+            lo = hi = datetools._to_micros(start)
+            if end is not None:
+                hi = max(hi, datetools._to_micros(end))
+        else:
+            lo = hi = datetools._to_micros(end)
+
+        key = offset, 0
+        if isinstance(offset, datetools.Tick):
+            # all dates of a Tick range are congruent modulo its step
+            step = offset._anchorStep
+            key = offset, lo % step
+
+            if start is None:
+                lo = hi - max(periods - 1, 0) * step
+            elif end is None:
+                hi = lo + max(periods - 1, 0) * step
+
+            minSpan = step
+        else:
+            minSpan = 366 * datetools._US_PER_DAY
+
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                if isinstance(offset, datetools.Tick):
+                    window = lo, hi
+                else:
+                    window = (min(lo, datetools._to_micros(_CACHE_START)),
+                              max(hi, datetools._to_micros(_CACHE_END)))
+                entry = _generate_window(offset, window[0], window[1])
+            else:
+                self.hits += 1
+                self._order.remove(key)
+
+            cached = entry
+            while True:
+                cachedRange, micros = entry
+                startLoc, endLoc = _locate(micros, start, end, periods)
+
+                below = startLoc < 0 or micros[0] > lo
+                above = endLoc > len(micros) or micros[-1] < hi
+                if not (below or above):
+                    break
+
+                # at least double the window on the side that is short
+                span = max(micros[-1] - micros[0], minSpan)
+                newLo = micros[0]
+                if below:
+                    newLo = max(min(lo, micros[0] - span), _MIN_MICROS)
+                newHi = micros[-1]
+                if above:
+                    newHi = min(max(hi, micros[-1] + span), _MAX_MICROS)
+
+                if isinstance(offset, datetools.Tick):
+                    # stay on the grid of the cached dates
+                    newLo = micros[0] - (micros[0] - newLo) // step * step
+                    newHi = micros[-1] + (newHi - micros[-1]) // step * step
+
+                    if (newHi - newLo) // step >= self.maxlength:
+                        # serve the request alone, keeping the cached window
+                        entry = _generate_window(offset, lo, hi)
+                        continue
+
+                if newLo == micros[0] and newHi == micros[-1]:
+                    # can't extend past the supported dates
+                    break
+
+                self.extensions += 1
+                entry = cached = _generate_window(offset, newLo, newHi)
+
+            if len(cached[1]) <= self.maxlength:
+                self._entries[key] = cached
+                self._order.append(key)
+
+                while len(self._order) > self.maxsize:
+                    del self._entries[self._order.pop(0)]
+                    self.evictions += 1
+            elif key in self._entries:
+                del self._entries[key]
+        finally:
+            self._lock.release()
+
+        return cachedRange[max(startLoc, 0):max(endLoc, 0)]
+
+def _generate_window(offset, lo, hi):
+    if isinstance(offset, datetools.Tick):
+        step = offset._anchorStep
+        micros = lo + step * np.arange((hi - lo) // step + 1, dtype=np.int64)
+        dates = tseries.micros_to_dates(micros)
+    else:
+        bounds = np.array([lo, hi], dtype=np.int64)
+        start, end = tseries.micros_to_dates(bounds)
+
+        dates = _generate_array(start, end, offset=offset)
+        micros = tseries.dates_to_micros(dates)
+
+    cachedRange = DateRange.fromIndex(dates)
+    cachedRange.offset = offset
+
+    return cachedRange, micros
+
+def _locate(micros, start, end, periods):
+    """
+    Positions start:end of the requested slice of a window, possibly out of
+    its bounds
+    """
+    if start is not None:
+        startLoc = micros.searchsorted(datetools._to_micros(start))
+    if end is not None:
+        endLoc = micros.searchsorted(datetools._to_micros(end), 'right')
+
+    if start is None:
+        startLoc = endLoc - periods
+    elif end is None:
+        endLoc = startLoc + periods
+
+    return startLoc, endLoc
+
 class DateRange(Index):
     """
     Fixed frequency date range according to input parameters.
@@ -41,7 +222,7 @@ class DateRange(Index):
         Used to determine the dates returned
     timeRule : timeRule to use
     """
-    _cache = {}
+    _cache = _RangeCache()
     def __new__(cls, start=None, end=None, periods=None,
                 offset=datetools.bday, timeRule=None, **kwds):
 
@@ -66,23 +247,17 @@ class DateRange(Index):
             start = datetools.to_datetime(start)
             end = datetools.to_datetime(end)
 
-            # inside cache range
-            fromInside = start is not None and start > _CACHE_START
-            toInside = end is not None and end < _CACHE_END
+            useCache = ((start is not None and end is not None) or
+                        (periods is not None and (start or end) is not None))
 
-            useCache = fromInside and toInside
-
-            if (useCache and offset.isAnchored() and
-                isinstance(offset, datetools.CacheableOffset)):
+            if useCache and _isCacheable(offset):
 
                 index = cls._cached_range(start, end, periods=periods,
                                           offset=offset, timeRule=timeRule)
 
             else:
-                xdr = generate_range(start=start, end=end, periods=periods,
-                                     offset=offset, timeRule=timeRule)
-
-                index = np.array(list(xdr), dtype=object, copy=False)
+                index = _generate_array(start=start, end=end,
+                                        periods=periods, offset=offset)
 
                 index = index.view(cls)
                 index.offset = offset
@@ -120,17 +295,6 @@ class DateRange(Index):
         if offset is None:
             raise Exception('Must provide a DateOffset!')
 
-        if offset not in cls._cache:
-            xdr = generate_range(_CACHE_START, _CACHE_END, offset=offset)
-            arr = np.array(list(xdr), dtype=object, copy=False)
-
-            cachedRange = DateRange.fromIndex(arr)
-            cachedRange.offset = offset
-
-            cls._cache[offset] = cachedRange
-        else:
-            cachedRange = cls._cache[offset]
-
         if start is None:
             if end is None:
                 raise Exception('Must provide start or end date!')
@@ -140,28 +304,34 @@ class DateRange(Index):
             assert(isinstance(end, datetime))
 
             end = offset.rollback(end)
-
-            endLoc = cachedRange.indexMap[end] + 1
-            startLoc = endLoc - periods
         elif end is None:
             assert(isinstance(start, datetime))
             start = offset.rollforward(start)
 
-            startLoc = cachedRange.indexMap[start]
             if periods is None:
                 raise Exception('Must provide number of periods!')
-
-            endLoc = startLoc + periods
         else:
             start = offset.rollforward(start)
             end = offset.rollback(end)
 
-            startLoc = cachedRange.indexMap[start]
-            endLoc = cachedRange.indexMap[end] + 1
+        return cls._cache.lookup(offset, start, end, periods)
+
+    @classmethod
+    def cacheStats(cls):
+        """
+        Statistics of the cache of dates DateRanges are sliced from
 
-        indexSlice = cachedRange[startLoc:endLoc]
+        Returns
+        -------
+        dict with hits, misses (offsets not cached), extensions (cached
+        windows grown to fit a request), evictions, size (number of offsets
+        cached), maxsize and dates (total number of dates cached)
+        """
+        return cls._cache.stats()
 
-        return indexSlice
+    @classmethod
+    def clearCache(cls):
+        cls._cache.clear()
 
     @classmethod
     def fromIndex(cls, index):
@@ -231,8 +401,7 @@ class DateRange(Index):
             # immutable so OK
             return self
 
-        start = self[0] + n * self.offset
-        end = self[-1] + n * self.offset
+        start, end = (n * self.offset).apply_index([self[0], self[-1]])
         return DateRange(start, end, offset=self.offset)
 
     def union(self, other):
@@ -302,6 +471,13 @@ def generate_range(start=None, end=None, periods=None,
     if timeRule is not None:
         offset = datetools.getOffset(timeRule)
 
+    values = _range_micros(start, end, periods, offset)
+    if values is not None:
+        for date in tseries.micros_to_dates(values):
+            yield date
+
+        return
+
     if timeRule is None:
         if offset in datetools._offsetNames:
             timeRule = datetools._offsetNames[offset]
@@ -334,3 +510,181 @@ def generate_range(start=None, end=None, periods=None,
 
         # faster than cur + offset
         cur = offset.apply(cur)
+
+def _generate_array(start=None, end=None, periods=None,
+                    offset=datetools.BDay()):
+    """
+    Dates of generate_range as an object ndarray, computed in one pass on
+    int64 ordinals if the offset supports it
+    """
+    values = _range_micros(start, end, periods, offset)
+
+    if values is None:
+        xdr = generate_range(start=start, end=end, periods=periods,
+                             offset=offset)
+        return np.array(list(xdr), dtype=object, copy=False)
+
+    return tseries.micros_to_dates(values)
+
+def _range_micros(start, end, periods, offset):
+    """
+    Dates of generate_range as int64 microseconds since the epoch, or None
+    if the offset can't be vectorized
+    """
+    if not offset._vectorized:
+        return None
+
+    start = datetools.to_datetime(start)
+    end = datetools.to_datetime(end)
+
+    if periods is None and (start is None or end is None):
+        return None
+
+    if start and not offset.onOffset(start):
+        start = offset.rollforward(start)
+
+    if end and not offset.onOffset(end):
+        end = offset.rollback(end)
+
+        if periods is None and end < start:
+            return np.empty(0, dtype=np.int64)
+
+    # all dates after the first are normalized by apply
+    if offset._normalizeFirst:
+        if start is not None:
+            start = datetools.normalize_date(start)
+        if end is not None:
+            end = datetools.normalize_date(end)
+
+    step = offset._anchorStep
+
+    if start is None:
+        last = offset._anchor(end)
+        first = last - (periods - 1) * step
+    else:
+        first = offset._anchor(start)
+
+    if end is None:
+        count = periods
+    else:
+        count = max((offset._anchor(end) - first) // step + 1, 0)
+
+    anchors = first + step * np.arange(count, dtype=np.int64)
+
+    return offset._anchorMicros(anchors)
+
+#-------------------------------------------------------------------------------
+# Frequency conversion with aggregation
+
+_OHLC = ['open', 'high', 'low', 'close']
+
+def _default_closed(offset):
+    # bins of intraday and daily offsets contain their start, those of
+    # period ends (months, quarters, ...) their end
+    if (isinstance(offset, (datetools.Tick, datetools.BDay)) or
+        type(offset) is datetools.DateOffset):
+        return 'left'
+    return 'right'
+
+def _resample_bins(index, offset, closed=None, label=None):
+    """
+    Bins of the dates of a sorted index delimited by the dates of offset
+
+    Returns
+    -------
+    (labels, bins) : DateRange, int32 ndarray
+        Bin k holds the positions bins[k]:bins[k + 1] of the index. Bins are
+        labeled by their left or right edge
+    """
+    if closed is None:
+        closed = _default_closed(offset)
+    if label is None:
+        label = closed
+
+    if closed not in ('left', 'right') or label not in ('left', 'right'):
+        raise Exception('closed and label must be left or right')
+
+    micros = tseries.dates_to_micros(np.asarray(index, dtype=object))
+
+    if isinstance(offset, datetools.Tick):
+        # edges on the grid of the step from midnight of the first date
+        step = offset._anchorStep
+        origin = (micros[0] // datetools._US_PER_DAY) * datetools._US_PER_DAY
+        first = origin + ((micros[0] - origin) // step - 1) * step
+        count = (micros[-1] - first) // step + 2
+
+        edges = first + step * np.arange(count, dtype=np.int64)
+        edgeDates = DateRange.fromIndex(tseries.micros_to_dates(edges))
+        edgeDates.offset = offset
+    else:
+        # edges are whole days
+        micros = (micros // datetools._US_PER_DAY) * datetools._US_PER_DAY
+        first, last = tseries.micros_to_dates(micros[[0, -1]])
+
+        edgeDates = DateRange(first - offset, last + offset, offset=offset)
+        edges = tseries.dates_to_micros(np.asarray(edgeDates, dtype=object))
+
+    if closed == 'left':
+        bins = micros.searchsorted(edges, 'left')
+    else:
+        bins = micros.searchsorted(edges, 'right')
+
+    # drop the empty bins around the data
+    lo = (bins == 0).sum() - 1
+    hi = bins.searchsorted(len(micros), 'left')
+
+    bins = bins[lo:hi + 1].astype(np.int32)
+
+    if label == 'left':
+        labels = edgeDates[lo:hi]
+    else:
+        labels = edgeDates[lo + 1:hi + 1]
+
+    return labels, bins
+
+def _resample(values, index, rule, how='mean', closed=None, label=None):
+    """
+    Aggregate the rows of values (N x K) between consecutive dates of rule
+
+    Returns
+    -------
+    (labels, result) : DateRange, ndarray (nbins x K, or 4 x nbins x K for
+    how='ohlc')
+    """
+    if isinstance(rule, datetools.DateOffset):
+        offset = rule
+    else:
+        offset = datetools.getOffset(rule)
+
+    values = np.asarray(values, dtype=float)
+
+    if len(index) == 0:
+        labels = DateRange.fromIndex(np.empty(0, dtype=object))
+        labels.offset = offset
+        bins = np.zeros(1, dtype=np.int32)
+    else:
+        index = np.asarray(index, dtype=object)
+
+        if not (index[1:] >= index[:-1]).all():
+            indexer = index.argsort()
+            index = index.take(indexer)
+            values = values.take(indexer, axis=0)
+
+        labels, bins = _resample_bins(index, offset, closed=closed,
+                                      label=label)
+
+    if how == 'ohlc':
+        result = np.array([tseries.bin_reduce(values, bins, agg)
+                           for agg in ('first', 'max', 'min', 'last')])
+    elif callable(how):
+        result = np.empty((len(labels), values.shape[1]))
+        for k in xrange(len(labels)):
+            chunk = values[bins[k]:bins[k + 1]]
+            if len(chunk) == 0:
+                result[k] = np.NaN
+            else:
+                result[k] = [how(column) for column in chunk.T]
+    else:
+        result = tseries.bin_reduce(values, bins, how)
+
+    return labels, result
@@ -10,6 +10,10 @@ except ImportError: # pragma: no cover
 
 import calendar
 
+import numpy as np
+
+import pandas.lib.tseries as tseries
+
 #-------------------------------------------------------------------------------
 # Miscellaneous date functions
 
@@ -42,6 +46,49 @@ def to_datetime(arg):
 def normalize_date(dt):
     return datetime(dt.year, dt.month, dt.day)
 
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_US_PER_DAY = 86400 * 1000000
+
+def _day_ordinal(dt):
+    """Days since 1970-01-01"""
+    return dt.toordinal() - _EPOCH_ORDINAL
+
+def _month_ordinal(dt):
+    """Months since year 0, i.e. year * 12 + month - 1"""
+    return dt.year * 12 + dt.month - 1
+
+def _delta_micros(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def _to_micros(dt):
+    """Microseconds since 1970-01-01"""
+    return _delta_micros(dt - datetime(1970, 1, 1))
+
+def _split_micros(micros):
+    """Days since 1970-01-01 and microseconds into the day"""
+    days = micros // _US_PER_DAY
+    return days, micros - days * _US_PER_DAY
+
+def _weekdays(days):
+    # 1970-01-01 was a Thursday
+    return (days + 3) % 7
+
+def _month_ordinals(days):
+    """Month ordinals and days of month of an array of day ordinals"""
+    years, months, mdays = tseries.days_to_civil(days)
+    return years * 12 + months - 1, mdays
+
+def _bmonth_end_micros(months, time):
+    """
+    Last days of the given months, keeping the time of day, except where
+    that falls on a weekend: there the prior business day (normalized), as
+    in date - BDay()
+    """
+    ends = tseries.month_end_days(months, False)
+    bends = tseries.month_end_days(months, True)
+    return np.where(ends == bends, ends * _US_PER_DAY + time,
+                    bends * _US_PER_DAY)
+
 #-------------------------------------------------------------------------------
 # DateOffset
 
@@ -94,10 +141,112 @@ class DateOffset(object):
     # For some offsets, want to drop the time information off the
     # first date
     _normalizeFirst = False
+
+    # Offsets whose dates are evenly spaced in some integer "anchor" (e.g.
+    # business days or months since the epoch) generate date ranges as a
+    # whole on int64 ordinals. These define _anchor, mapping a date on the
+    # offset to its anchor, _anchorStep, the anchors per application of
+    # the offset, and _anchorMicros, mapping an array of anchors to int64
+    # microseconds since the epoch
+    _vectorized = False
+
     def __init__(self, n=1, **kwds):
         self.n = int(n)
         self.kwds = kwds
 
+    def _apply_micros(self, micros):
+        """
+        apply on an int64 array of microseconds since the epoch. Returns
+        None if the offset has no vectorized implementation
+        """
+        if type(self) is DateOffset and len(self.kwds) == 0:
+            return micros + self.n * _US_PER_DAY
+
+        return None
+
+    def _onOffset_micros(self, micros):
+        shifted = self._apply_micros(micros)
+        if shifted is None:
+            return None
+
+        return (-self)._apply_micros(shifted) == micros
+
+    def _roll_micros(self, micros, n):
+        if self._normalizeFirst:
+            micros = _split_micros(micros)[0] * _US_PER_DAY
+
+        onOffset = self._onOffset_micros(micros)
+        rolled = self.__class__(n, **self.kwds)._apply_micros(micros)
+        if onOffset is None or rolled is None:
+            return None
+
+        return np.where(onOffset, micros, rolled)
+
+    def _map_index(self, index, vectorized, func):
+        values = np.asarray(index, dtype=object)
+
+        try:
+            micros = tseries.dates_to_micros(values)
+        except TypeError: # not all datetimes
+            result = None
+        else:
+            result = vectorized(micros)
+
+        if result is None:
+            result = np.empty(len(values), dtype=object)
+            result[:] = [func(d) for d in values]
+        elif result.dtype != np.bool_:
+            result = tseries.micros_to_dates(result)
+
+        return result
+
+    def apply_index(self, index):
+        """
+        Apply the offset to each date of an Index or array of datetimes, in
+        one pass on int64 ordinals for the cacheable offsets and Ticks
+
+        Returns
+        -------
+        ndarray of datetime, equal to [d + offset for d in index]
+        """
+        return self._map_index(index, self._apply_micros, self.apply)
+
+    def onOffset_index(self, index):
+        """
+        Vectorized onOffset
+
+        Returns
+        -------
+        boolean ndarray
+        """
+        result = self._map_index(index, self._onOffset_micros,
+                                 self.onOffset)
+        return result.astype(bool)
+
+    def rollback_index(self, index):
+        """
+        Vectorized rollback
+
+        Returns
+        -------
+        ndarray of datetime
+        """
+        return self._map_index(index,
+                               lambda micros: self._roll_micros(micros, -1),
+                               self.rollback)
+
+    def rollforward_index(self, index):
+        """
+        Vectorized rollforward
+
+        Returns
+        -------
+        ndarray of datetime
+        """
+        return self._map_index(index,
+                               lambda micros: self._roll_micros(micros, 1),
+                               self.rollforward)
+
     def apply(self, other):
         if len(self.kwds) > 0:
             if self.n > 0:
@@ -238,6 +387,47 @@ class BDay(DateOffset, CacheableOffset):
     def isAnchored(self):
         return (self.n == 1)
 
+    @property
+    def _vectorized(self):
+        return self.n > 0 and self.normalize and not self.offset
+
+    @property
+    def _anchorStep(self):
+        return self.n
+
+    def _anchor(self, someDate):
+        # business days since the Monday before the epoch
+        days = _day_ordinal(someDate) + 3
+        return (days // 7) * 5 + days % 7
+
+    def _anchorMicros(self, anchors):
+        days = (anchors // 5) * 7 + anchors % 5 - 3
+        return days * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        weeks = (days + 3) // 7
+        weekdays = _weekdays(days)
+
+        # weekends count from the following Monday, unless moving backward
+        if self.n > 0:
+            anchors = weeks * 5 + np.minimum(weekdays, 4) + self.n
+        else:
+            anchors = weeks * 5 + np.minimum(weekdays, 5) + self.n
+
+        result = self._anchorMicros(anchors)
+
+        if not self.normalize:
+            result += time
+
+        if self.offset:
+            result += _delta_micros(self.offset)
+
+        return result
+
+    def _onOffset_micros(self, micros):
+        return _weekdays(_split_micros(micros)[0]) < 5
+
     def apply(self, other):
         if isinstance(other, datetime):
             n = self.n
@@ -276,6 +466,36 @@ class MonthEnd(DateOffset, CacheableOffset):
     _normalizeFirst = True
     """DateOffset of one month end"""
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return self.n
+
+    def _anchor(self, someDate):
+        return _month_ordinal(someDate)
+
+    def _anchorMicros(self, anchors):
+        return tseries.month_end_days(anchors, False) * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        months, _ = _month_ordinals(days)
+        onOffset = days == tseries.month_end_days(months, False)
+
+        # dates within a month count from the previous month end
+        months = np.where(onOffset, months + self.n,
+                          months - 1 + self.n + (self.n <= 0))
+
+        return self._anchorMicros(months) + time
+
+    def _onOffset_micros(self, micros):
+        days = _split_micros(micros)[0]
+        months, _ = _month_ordinals(days)
+        return days == tseries.month_end_days(months, False)
+
     def apply(self, other):
         n = self.n
         _, nDaysInMonth = calendar.monthrange(other.year, other.month)
@@ -300,6 +520,32 @@ class BMonthEnd(DateOffset, CacheableOffset):
     def isAnchored(self):
         return (self.n == 1)
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return self.n
+
+    def _anchor(self, someDate):
+        return _month_ordinal(someDate)
+
+    def _anchorMicros(self, anchors):
+        return tseries.month_end_days(anchors, True) * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        months, _ = _month_ordinals(days)
+        lastBDays = tseries.month_end_days(months, True)
+
+        if self.n > 0:
+            months = months + self.n - (days < lastBDays)
+        else:
+            months = months + self.n + (days > lastBDays)
+
+        return _bmonth_end_micros(months, time)
+
     def apply(self, other):
         n = self.n
 
@@ -344,6 +590,40 @@ class Week(DateOffset, CacheableOffset):
     def isAnchored(self):
         return (self.n == 1 and self.weekday is not None)
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return 7 * self.n
+
+    def _anchor(self, someDate):
+        return _day_ordinal(someDate)
+
+    def _anchorMicros(self, anchors):
+        return anchors * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        if self.weekday is None:
+            return micros + 7 * self.n * _US_PER_DAY
+
+        days = _split_micros(micros)[0]
+        ahead = (self.weekday - _weekdays(days)) % 7
+
+        if self.n > 0:
+            weeks = self.n - (ahead > 0)
+        else:
+            weeks = self.n
+
+        return micros + (ahead + 7 * weeks) * _US_PER_DAY
+
+    def _onOffset_micros(self, micros):
+        if self.weekday is None:
+            return np.zeros(len(micros), dtype=bool)
+
+        return _weekdays(_split_micros(micros)[0]) == self.weekday
+
     def apply(self, other):
         if self.weekday is None:
             return other + self.n * self.inc
@@ -427,6 +707,27 @@ class WeekOfMonth(DateOffset, CacheableOffset):
             else:
                 return offsetOfMonth
 
+    def _offsetOfMonth_micros(self, months):
+        firsts = tseries.month_end_days(months - 1, False) + 1
+        days = (firsts + (self.weekday - _weekdays(firsts)) % 7
+                + 7 * self.week)
+        return days * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        months, _ = _month_ordinals(_split_micros(micros)[0])
+        offsets = self._offsetOfMonth_micros(months)
+
+        if self.n == 1:
+            months = months + (micros >= offsets)
+        else:
+            months = months - (micros <= offsets)
+
+        return self._offsetOfMonth_micros(months)
+
+    def _onOffset_micros(self, micros):
+        months, _ = _month_ordinals(_split_micros(micros)[0])
+        return micros == self._offsetOfMonth_micros(months)
+
     def getOffsetOfMonth(self, someDate):
         w = Week(weekday=self.weekday)
         d = datetime(someDate.year, someDate.month, 1)
@@ -464,6 +765,39 @@ class BQuarterEnd(DateOffset, CacheableOffset):
     def isAnchored(self):
         return (self.n == 1 and self.startingMonth is not None)
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return 3 * self.n
+
+    def _anchor(self, someDate):
+        return _month_ordinal(someDate)
+
+    def _anchorMicros(self, anchors):
+        return tseries.month_end_days(anchors, True) * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        months, _ = _month_ordinals(days)
+        lastBDays = tseries.month_end_days(months, True)
+
+        monthsToGo = (3 - (months % 12 + 1 - self.startingMonth) % 3) % 3
+
+        if self.n > 0:
+            n = self.n - ((days < lastBDays) | (monthsToGo != 0))
+        else:
+            n = self.n + ((days > lastBDays) & (monthsToGo == 0))
+
+        return _bmonth_end_micros(months + monthsToGo + 3 * n, time)
+
+    def _onOffset_micros(self, micros):
+        months, _ = _month_ordinals(_split_micros(micros)[0])
+        modMonth = (months % 12 + 1 - self.startingMonth) % 3
+        return BMonthEnd()._onOffset_micros(micros) & (modMonth == 0)
+
     def apply(self, other):
         n = self.n
 
@@ -503,6 +837,35 @@ class BYearEnd(DateOffset, CacheableOffset):
 
         DateOffset.__init__(self, n=n, **kwds)
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return 12 * self.n
+
+    def _anchor(self, someDate):
+        return _month_ordinal(someDate)
+
+    def _anchorMicros(self, anchors):
+        return tseries.month_end_days(anchors, True) * _US_PER_DAY
+
+    def _apply_micros(self, micros):
+        days = _split_micros(micros)[0]
+        months, _ = _month_ordinals(days)
+
+        # self.month of the same year
+        months = (months // 12) * 12 + self.month - 1
+        lastBDays = tseries.month_end_days(months, True)
+
+        if self.n > 0:
+            years = self.n - (days < lastBDays)
+        else:
+            years = self.n + (days > lastBDays)
+
+        return self._anchorMicros(months + 12 * years)
+
     def apply(self, other):
         n = self.n
 
@@ -536,6 +899,23 @@ class YearEnd(DateOffset, CacheableOffset):
     """DateOffset increments between calendar year ends"""
     _normalizeFirst = True
 
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        months, mdays = _month_ordinals(days)
+        onOffset = (months % 12 == 11) & (mdays == 31)
+
+        # dates within a year count from the previous year end
+        years = months // 12 + self.n
+        if self.n > 0:
+            years -= ~onOffset
+
+        days = tseries.month_end_days(years * 12 + 11, False)
+        return days * _US_PER_DAY + np.where(onOffset, time, 0)
+
+    def _onOffset_micros(self, micros):
+        months, mdays = _month_ordinals(_split_micros(micros)[0])
+        return (months % 12 == 11) & (mdays == 31)
+
     def apply(self, other):
         n = self.n
         if other.month != 12 or other.day != 31:
@@ -554,6 +934,23 @@ class YearBegin(DateOffset, CacheableOffset):
     """DateOffset increments between calendar year begin dates"""
     _normalizeFirst = True
 
+    def _apply_micros(self, micros):
+        days, time = _split_micros(micros)
+        months, mdays = _month_ordinals(days)
+        onOffset = (months % 12 == 0) & (mdays == 1)
+
+        # dates within a year count from its first day
+        years = months // 12 + self.n
+        if self.n <= 0:
+            years += ~onOffset
+
+        days = tseries.month_end_days(years * 12 - 1, False) + 1
+        return days * _US_PER_DAY + np.where(onOffset, time, 0)
+
+    def _onOffset_micros(self, micros):
+        months, mdays = _month_ordinals(_split_micros(micros)[0])
+        return (months % 12 == 0) & (mdays == 1)
+
     def apply(self, other):
         n = self.n
         if other.month != 1 or other.day != 1:
@@ -582,6 +979,23 @@ class Tick(DateOffset):
 
         return self._delta
 
+    @property
+    def _vectorized(self):
+        return self.n > 0
+
+    @property
+    def _anchorStep(self):
+        return _delta_micros(self.delta)
+
+    def _anchor(self, someDate):
+        return _to_micros(someDate)
+
+    def _anchorMicros(self, anchors):
+        return anchors
+
+    def _apply_micros(self, micros):
+        return micros + _delta_micros(self.delta)
+
     def apply(self, other):
         if isinstance(other, (datetime, timedelta)):
             return other + self.delta
@@ -657,16 +1071,111 @@ for i, weekday in enumerate(['MON', 'TUE', 'WED', 'THU', 'FRI']):
 
 _offsetNames = dict([(v, k) for k, v in _offsetMap.iteritems()])
 
+def _daySpan(offset):
+    """Bounds on the number of days between consecutive dates of offset"""
+    if isinstance(offset, BDay):
+        return 1, 3
+    elif isinstance(offset, Week):
+        return 7, 7
+    elif isinstance(offset, (BMonthEnd, WeekOfMonth)):
+        return 26, 35
+    elif isinstance(offset, BQuarterEnd):
+        return 84, 98
+    else:
+        return 360, 370
+
+_ruleSpans = dict((k, _daySpan(v)) for k, v in _offsetMap.iteritems())
+
+def _inferTimeRule(index):
+    """
+    Name of the offset each date of index follows from the previous one
+    by, or None
+    """
+    offset = getattr(index, 'offset', None)
+    if offset is not None and offset in _offsetNames:
+        # DateRange
+        return _offsetNames[offset]
+
+    try:
+        micros = tseries.dates_to_micros(np.asarray(index, dtype=object))
+    except TypeError: # not all datetimes
+        return None
+
+    deltas = np.diff(_split_micros(micros)[0])
+    lo, hi = deltas.min(), deltas.max()
+
+    for rule, offset in _offsetMap.iteritems():
+        spanLo, spanHi = _ruleSpans[rule]
+        if lo < spanLo or hi > spanHi:
+            continue
+
+        if (offset._apply_micros(micros[:-1]) == micros[1:]).all():
+            return rule
+
+    return None
+
+def _cachedTimeRule(index):
+    """
+    Inferred time rule of index (None if there is none), cached on Index
+    objects
+    """
+    if len(index) < 3:
+        return None
+
+    try:
+        return index._cache_timeRule
+    except AttributeError:
+        pass
+
+    rule = _inferTimeRule(index)
+
+    try:
+        index._cache_timeRule = rule
+    except AttributeError: # not an Index
+        pass
+
+    return rule
+
 def inferTimeRule(index):
+    """
+    Infer the time rule (e.g. 'WEEKDAY', 'EOM') that all the consecutive
+    dates of index are spaced by. The result is cached on Index objects
+
+    Returns
+    -------
+    rule : string
+    """
     if len(index) < 3:
         raise Exception('Need at least three dates to infer time rule!')
 
-    first, second, third = index[:3]
-    for rule, offset in _offsetMap.iteritems():
-        if second == (first + offset) and third == (second + offset):
-            return rule
+    rule = _cachedTimeRule(index)
+
+    if rule is None:
+        raise Exception('Could not infer time rule from data!')
+
+    return rule
+
+def conformsToRule(index, freq):
+    """
+    Whether index is exactly the DateRange of freq between its first and
+    last dates, so that conforming it to freq would be a no-op
+
+    Parameters
+    ----------
+    index : Index
+    freq : DateOffset object, or time rule string (e.g. 'EOM')
+    """
+    if isinstance(freq, DateOffset):
+        rule = _offsetNames.get(freq)
+    else:
+        rule = freq
+
+    if rule not in _offsetMap or _cachedTimeRule(index) != rule:
+        return False
 
-    raise Exception('Could not infer time rule from data!')
+    # DateRange dates are normalized
+    first = index[0]
+    return first == normalize_date(first) and _offsetMap[rule].onOffset(first)
 
 def getOffset(name):
     """
@@ -12,7 +12,7 @@ import numpy as np
 
 from pandas.core.common import (_pickle_array, _unpickle_array, _pfixed,
                                 isnull, notnull)
-from pandas.core.daterange import DateRange
+from pandas.core.daterange import DateRange, _resample, _OHLC
 from pandas.core.index import Index, NULL_INDEX
 from pandas.core.mixins import Picklable, Groupable
 from pandas.core.series import Series
@@ -901,8 +901,50 @@ class DataFrame(Picklable, Groupable):
         else:
             dateRange = DateRange(self.index[0], self.index[-1], timeRule=freq)
 
+        if datetools.conformsToRule(self.index, freq):
+            # already at freq, nothing to fill
+            result = self.copy()
+            result.index = dateRange
+            return result
+
         return self.reindex(dateRange, method=method, fillMethod=fillMethod)
 
+    def resample(self, rule, how='mean', closed=None, label=None):
+        """
+        Convert the numeric TimeSeries inside to a lower frequency,
+        aggregating the values between consecutive dates of the provided
+        rule
+
+        Parameters
+        ----------
+        rule : DateOffset object, or time rule string (e.g. 'EOM')
+        how : {'mean', 'sum', 'ohlc', 'first', 'last', 'min', 'max', 'count',
+               'std', 'var'} or function, default 'mean'
+            Aggregation of the (non-NaN) values of each bin. A function is
+            called on the values of each nonempty bin
+        closed : {'left', 'right'}, optional
+            Side of each bin including its edge. Defaults to 'left' for
+            Ticks and daily offsets, 'right' for the others
+        label : {'left', 'right'}, optional
+            Edge labeling each bin, defaults to closed
+
+        Returns
+        -------
+        DataFrame, or WidePanel with items open, high, low and close for
+        how='ohlc'
+        """
+        cols = self._get_numeric_columns()
+        values = self.as_matrix(cols).reshape((len(self.index), len(cols)))
+
+        labels, result = _resample(values, self.index, rule, how=how,
+                                   closed=closed, label=label)
+
+        if how == 'ohlc':
+            from pandas.core.panel import WidePanel
+            return WidePanel(result, Index(_OHLC), labels, Index(cols))
+
+        return self._constructor(result, index=labels, columns=cols)
+
     def as_matrix(self, columns=None):
         """
         Convert the frame to its Numpy-array matrix representation
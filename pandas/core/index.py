@@ -1,6 +1,8 @@
 # pylint: disable=E1101,E1103,W0232
 
 import numpy as np
+
+from pandas.core.datetools import DateOffset, conformsToRule
 import pandas.lib.tseries as _tseries
 
 __all__ = ['Index']
@@ -139,7 +141,17 @@ class Index(np.ndarray):
             # OK because immutable
             return self
 
+        if conformsToRule(self, offset):
+            # every date is on offset, same dates as the DateRange shifted
+            from pandas.core.daterange import DateRange
+            start = (periods * offset).apply_index(self[:1])[0]
+            return DateRange(start, periods=len(self), offset=offset)
+
         offset = periods * offset
+
+        if isinstance(offset, DateOffset):
+            return Index(offset.apply_index(self))
+
         return Index([idx + offset for idx in self])
 
     def argsort(self, *args, **kwargs):
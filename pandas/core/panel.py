@@ -9,9 +9,11 @@ import warnings
 
 import numpy as np
 
+from pandas.core.daterange import _resample
 from pandas.core.index import Index
 from pandas.core.frame import DataFrame
 from pandas.core.matrix import DataMatrix
+from pandas.core.series import Series
 from pandas.core.mixins import Picklable, Groupable
 import pandas.core.common as common
 import pandas.lib.tseries as tseries
@@ -38,7 +40,7 @@ def _long_arith_method(op, name):
 
         Parameters
         ----------
-        other : DataFrame or Panel class
+        other : DataFrame, Series or Panel class
         axis : {'items', 'major', 'minor'}
 
         Returns
@@ -242,10 +244,10 @@ class WidePanel(Panel, Groupable):
         -------
         WidePanel
         """
-        data, index, columns = _homogenize(data, intersect=intersect)
         items = Index(sorted(data.keys()))
 
-        values = np.array([data[k].values for k in items], dtype=dtype)
+        values, index, columns = _homogenize([data[k] for k in items],
+                                             intersect=intersect, dtype=dtype)
 
         return cls(values, items, index, columns)
 
@@ -674,6 +676,28 @@ class WidePanel(Panel, Groupable):
 
         return LongPanel(values, self.items, index)
 
+    def toSparse(self):
+        """
+        Transform into a SparseWidePanel, dropping (major, minor) pairs
+        without any observations
+
+        Returns
+        -------
+        y : SparseWidePanel
+        """
+        I, N, K = self.dims
+
+        values = self.values.reshape((I, N * K))
+        selector = np.isfinite(values).any(axis=0)
+        cells = selector.nonzero()[0]
+
+        index = LongPanelIndex(self.major_axis, self.minor_axis,
+                               cells // K, cells % K, mask=selector)
+
+        values = np.ascontiguousarray(values.take(cells, axis=1).T)
+
+        return SparseWidePanel(values, self.items, index)
+
     def filter(self, items):
         """
         Restrict items in panel to input list
@@ -956,6 +980,42 @@ class WidePanel(Panel, Groupable):
                          minor_axis=minor_axis)
 
 
+    def resample(self, rule, how='mean', closed=None, label=None):
+        """
+        Convert the panel to a lower frequency along the major axis,
+        aggregating the values between consecutive dates of the provided
+        rule
+
+        Parameters
+        ----------
+        rule : DateOffset object, or time rule string (e.g. 'EOM')
+        how : {'mean', 'sum', 'first', 'last', 'min', 'max', 'count',
+               'std', 'var'} or function, default 'mean'
+            Aggregation of the (non-NaN) values of each bin. A function is
+            called on the values of each nonempty bin
+        closed : {'left', 'right'}, optional
+            Side of each bin including its edge. Defaults to 'left' for
+            Ticks and daily offsets, 'right' for the others
+        label : {'left', 'right'}, optional
+            Edge labeling each bin, defaults to closed
+
+        Returns
+        -------
+        WidePanel
+        """
+        if how == 'ohlc':
+            raise Exception('ohlc not supported for panels')
+
+        I, N, K = self.values.shape
+        values = self.values.swapaxes(0, 1).reshape((N, I * K))
+
+        labels, result = _resample(values, self.major_axis, rule, how=how,
+                                   closed=closed, label=label)
+
+        result = result.reshape((len(labels), I, K)).swapaxes(0, 1)
+
+        return WidePanel(result, self.items, labels, self.minor_axis)
+
     def truncate(self, before=None, after=None, axis='major'):
         """Function truncates a sorted Panel before and/or after
         some particular dates
@@ -1067,11 +1127,11 @@ class LongPanel(Panel):
         major_vec = data.pop(major_field)
         minor_vec = data.pop(minor_field)
 
-        major_axis = Index(sorted(set(major_vec)))
-        minor_axis = Index(sorted(set(minor_vec)))
+        major_labels, major_axis = _factorize(major_vec)
+        minor_labels, minor_axis = _factorize(minor_vec)
 
-        major_labels, _ = tseries.getMergeVec(major_vec, major_axis.indexMap)
-        minor_labels, _ = tseries.getMergeVec(minor_vec, minor_axis.indexMap)
+        major_axis = Index(major_axis)
+        minor_axis = Index(minor_axis)
 
         for col in exclude:
             del data[col]
@@ -1197,6 +1257,8 @@ class LongPanel(Panel):
     def _combine(self, other, func, axis='items'):
         if isinstance(other, DataFrame):
             return self._combineFrame(other, func, axis=axis)
+        elif isinstance(other, Series):
+            return self._combineSeries(other, func, axis=axis)
         elif isinstance(other, Panel):
             return self._combinePanel(other, func)
         elif np.isscalar(other):
@@ -1205,7 +1267,12 @@ class LongPanel(Panel):
 
     def _combineFrame(self, other, func, axis='items'):
         """
-        Arithmetic op
+        Arithmetic op, with the frame oriented as the matching cross-section
+        of the equivalent WidePanel:
+
+        items : index = major axis, columns = minor axis
+        major : index = minor axis, columns = items
+        minor : index = major axis, columns = items
 
         Parameters
         ----------
@@ -1217,9 +1284,54 @@ class LongPanel(Panel):
         -------
         y : LongPanel
         """
-        wide = self.toWide()
-        result = wide._combineFrame(other, func, axis=axis)
-        return result.toLong()
+        axis = WidePanel._get_axis_name(axis)
+
+        if axis == 'items':
+            other = other.reindex(index=self.major_axis,
+                                  columns=self.minor_axis)
+            values = other.values[self.index.major_labels,
+                                  self.index.minor_labels]
+            values = values.reshape((len(values), 1))
+        elif axis == 'major':
+            other = other.reindex(index=self.minor_axis, columns=self.items)
+            values = other.values.take(self.index.minor_labels, axis=0)
+        elif axis == 'minor':
+            other = other.reindex(index=self.major_axis, columns=self.items)
+            values = other.values.take(self.index.major_labels, axis=0)
+
+        return LongPanel(func(self.values, values), self.items, self.index,
+                         factors=self.factors)
+
+    def _combineSeries(self, other, func, axis='items'):
+        """
+        Arithmetic op with a Series indexed by the given axis, broadcast
+        along the other two
+
+        Parameters
+        ----------
+        other : Series
+        func : function
+        axis : int / string
+
+        Returns
+        -------
+        y : LongPanel
+        """
+        axis = WidePanel._get_axis_name(axis)
+
+        if axis == 'items':
+            values = other.reindex(self.items).values
+        elif axis == 'major':
+            values = other.reindex(self.major_axis).values
+            values = values.take(self.index.major_labels)
+            values = values.reshape((len(values), 1))
+        elif axis == 'minor':
+            values = other.reindex(self.minor_axis).values
+            values = values.take(self.index.minor_labels)
+            values = values.reshape((len(values), 1))
+
+        return LongPanel(func(self.values, values), self.items, self.index,
+                         factors=self.factors)
 
     def _combinePanel(self, other, func):
         """
@@ -1257,13 +1369,21 @@ class LongPanel(Panel):
         if axis == 'major':
             first = self.index.major_labels
             second = self.index.minor_labels
+            nfirst, nsecond = len(self.major_axis), len(self.minor_axis)
 
         elif axis == 'minor':
             first = self.index.minor_labels
             second = self.index.major_labels
+            nfirst, nsecond = len(self.minor_axis), len(self.major_axis)
+
+        first = np.asarray(first, dtype=np.int32)
+        second = np.asarray(second, dtype=np.int32)
 
-        # Lexsort starts from END
-        indexer = np.lexsort((second, first))
+        if tseries.is_lexsorted(first, second):
+            return self.copy()
+
+        # labels are dense ints, so a counting sort beats np.lexsort
+        indexer = tseries.lexsort_indexer(first, second, nfirst, nsecond)
 
         new_major = self.index.major_labels[indexer]
         new_minor = self.index.minor_labels[indexer]
@@ -1303,6 +1423,22 @@ class LongPanel(Panel):
 
         return WidePanel(values, self.items, self.major_axis, self.minor_axis)
 
+    def toSparse(self):
+        """
+        Transform into wide format, storing only the observed (major, minor)
+        pairs
+
+        Returns
+        -------
+        SparseWidePanel
+        """
+        if not self.index.consistent:
+            raise PanelError('Panel has duplicate (major, minor) pairs, '
+                             'cannot be reliably converted to wide format.')
+
+        panel = self.sort(axis='major')
+        return SparseWidePanel(panel.values, panel.items, panel.index)
+
     def toCSV(self, path):
         def format_cols(items):
             cols = ['Major', 'Minor'] + list(items)
@@ -1434,14 +1570,12 @@ class LongPanel(Panel):
                                        transform=lambda d: d.weekday())
         Returns
         -------
-        LongPanel, item names taken from chosen axis
+        DummyPanel, item names taken from chosen axis
         """
         if axis == 'minor':
-            dim = len(self.minor_axis)
             items = self.minor_axis
             labels = self.index.minor_labels
         elif axis == 'major':
-            dim = len(self.major_axis)
             items = self.major_axis
             labels = self.index.major_labels
         else: # pragma: no cover
@@ -1450,14 +1584,10 @@ class LongPanel(Panel):
         if transform:
             mapped = np.array([transform(val) for val in items])
 
-            items = np.array(sorted(set(mapped)))
-            labels = items.searchsorted(mapped[labels])
-            dim = len(items)
-
-        values = np.eye(dim, dtype=float)
-        values = values.take(labels, axis=0)
+            mapped_labels, items = _factorize(mapped)
+            labels = mapped_labels.take(labels)
 
-        result = LongPanel(values, items, self.index)
+        result = DummyPanel(labels, items, self.index)
 
         if prefix is None:
             prefix = ''
@@ -1478,19 +1608,12 @@ class LongPanel(Panel):
 
         Returns
         -------
-        LongPanel
+        DummyPanel
         """
         idx = self.items.indexMap[item]
-        values = self.values[:, idx]
+        labels, distinct_values = _factorize(self.values[:, idx])
 
-        distinct_values = np.array(sorted(set(values)))
-        mapping = distinct_values.searchsorted(values)
-
-        values = np.eye(len(distinct_values))
-
-        dummy_mat = values.take(mapping, axis=0)
-
-        return LongPanel(dummy_mat, distinct_values, self.index)
+        return DummyPanel(labels, distinct_values, self.index)
 
     def mean(self, axis='major', broadcast=False):
         return self.apply(lambda x: np.mean(x, axis=0), axis, broadcast)
@@ -1578,13 +1701,20 @@ class LongPanel(Panel):
 
         Parameters
         ----------
-        other : LongPanel
+        other : LongPanel or DummyPanel
         """
         assert(self.index is other.index)
 
-        values = np.concatenate((self.values, other.values), axis=1).copy()
         items = self.items.tolist() + other.items.tolist()
 
+        if isinstance(other, DummyPanel):
+            # indicators written straight into the result
+            values = np.zeros((len(self.index), len(items)))
+            values[:, :len(self.items)] = self.values
+            other._put_values(values[:, len(self.items):])
+        else:
+            values = np.concatenate((self.values, other.values), axis=1)
+
         return LongPanel(values, items, self.index)
 
     def addPrefix(self, prefix=None):
@@ -1608,6 +1738,464 @@ class LongPanel(Panel):
         return LongPanel(self.values, new_items, self.index)
 
 
+class DummyPanel(Panel):
+    """
+    Represents 1-0 dummy variables, one for each value of a categorical
+    variable observed on the rows of a LongPanel, by the position of the
+    value in items for each row rather than a dense (rows x values)
+    indicator matrix
+
+    Parameters
+    ----------
+    labels : ndarray (N)
+        Position in items of the value of each row, -1 if none (all
+        dummies 0)
+    items : sequence
+    index : LongPanelIndex
+
+    Note
+    ----
+    Created by LongPanel.get_dummies / get_axis_dummies. LongPanel.leftJoin
+    writes the indicators directly into the joined values, the values
+    property builds the dense matrix
+    """
+
+    def __init__(self, labels, items, index):
+        labels = np.asarray(labels, dtype=np.int32)
+
+        if len(labels) != len(index):
+            raise ValueError('Labels length %d mismatch to index length %d'
+                             % (len(labels), len(index)))
+
+        self.labels = labels
+        self.items = items
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def major_axis(self):
+        return self.index.major_axis
+
+    @property
+    def minor_axis(self):
+        return self.index.minor_axis
+
+    def _put_values(self, out):
+        "Write the indicators into the zeroed (N x len(items)) array out"
+        rows = (self.labels >= 0).nonzero()[0]
+        out[rows, self.labels.take(rows)] = 1
+
+    @property
+    def values(self):
+        values = np.zeros((len(self.index), len(self.items)))
+        self._put_values(values)
+        return values
+
+    def __getitem__(self, key):
+        "Return dummy variable as LongPanel"
+        loc = self.items.indexMap[key]
+        values = (self.labels == loc).astype(float)
+
+        return LongPanel(values.reshape((len(values), 1)), [key],
+                         self.index)
+
+    def filter(self, items):
+        """
+        Restrict items in panel to input list. Rows of dropped values
+        are 0 in all remaining dummies
+
+        Parameters
+        ----------
+        items : sequence
+
+        Returns
+        -------
+        DummyPanel
+        """
+        intersection = self.items.intersection(items)
+
+        # position of the old items among the new, -1 if dropped
+        mapping = np.empty(len(self.items) + 1, dtype=np.int32)
+        mapping.fill(-1)
+        for i, col in enumerate(intersection):
+            mapping[self.items.indexMap[col]] = i
+
+        # -1 wraps around to the last slot
+        labels = mapping.take(self.labels)
+
+        return DummyPanel(labels, intersection, self.index)
+
+    def addPrefix(self, prefix=None):
+        """
+        Concatenate prefix string with panel items names.
+
+        Parameters
+        ----------
+        prefix : string
+
+        Returns
+        -------
+        DummyPanel
+        """
+        new_items = [_prefix_item(item, prefix) for item in self.items]
+
+        return DummyPanel(self.labels, new_items, self.index)
+
+    def toLong(self):
+        """
+        Convert to LongPanel with dense 1-0 values
+
+        Returns
+        -------
+        LongPanel
+        """
+        return LongPanel(self.values, self.items, self.index)
+
+
+class SparseWidePanel(Panel):
+    """
+    Wide format panel data storing only the observed (major, minor) cells,
+    e.g. for an unbalanced panel where few minor axis values are present on
+    each date. All other cells are treated as NaN
+
+    Parameters
+    ----------
+    values : ndarray (nobs x items)
+        One row per observed (major, minor) pair
+    items : sequence
+    index : LongPanelIndex
+        Labels of the rows, sorted by major axis without duplicate pairs
+
+    Note
+    ----
+    Use LongPanel.toSparse or WidePanel.toSparse rather than calling the
+    constructor directly. Only toWide and __getitem__ (one item at a time)
+    allocate dense major x minor arrays
+    """
+
+    def __init__(self, values, items, index):
+        self.items = items
+        self.index = index
+
+        self.values = values
+
+    @property
+    def major_axis(self):
+        return self.index.major_axis
+
+    @property
+    def minor_axis(self):
+        return self.index.minor_axis
+
+    def _get_values(self):
+        return self._values
+
+    def _set_values(self, values):
+        shape = len(self.index), len(self.items)
+
+        if values.shape != shape:
+            raise ValueError('Values shape %s mismatch to %s' % (values.shape,
+                                                                shape))
+
+        self._values = values
+
+    values = property(fget=_get_values, fset=_set_values)
+
+    def __getstate__(self):
+        "Returned pickled representation of the panel"
+
+        return (common._pickle_array(self.values),
+                common._pickle_array(self.items),
+                self.index)
+
+    def __setstate__(self, state):
+        "Unpickle the panel"
+        (vals, items, index) = state
+
+        self.items = common._unpickle_array(items)
+        self.index = index
+        self.values = common._unpickle_array(vals)
+
+    def copy(self):
+        """
+        Return copy of SparseWidePanel (copies ndarray)
+
+        Returns
+        -------
+        y : SparseWidePanel
+        """
+        return SparseWidePanel(self.values.copy(), self.items, self.index)
+
+    @property
+    def nobs(self):
+        "Number of stored (major, minor) cells"
+        return len(self.index)
+
+    def _combine(self, other, func, axis=0):
+        if np.isscalar(other):
+            return SparseWidePanel(func(self.values, other), self.items,
+                                   self.index)
+
+    def _cells_to_frame(self, values, fill_value=np.NaN):
+        "Scatter one value per stored cell into a major x minor DataMatrix"
+        N, K = self.index.dims
+
+        mat = np.empty(N * K, dtype=float)
+        mat.fill(fill_value)
+        mat[self.index.major_labels * K + self.index.minor_labels] = values
+
+        return DataMatrix(mat.reshape((N, K)), index=self.major_axis,
+                          columns=self.minor_axis)
+
+    def __getitem__(self, key):
+        """
+        Returns
+        -------
+        y : DataMatrix (dense)
+            index -> major axis, columns -> minor axis
+        """
+        loc = self.items.indexMap[key]
+        return self._cells_to_frame(self.values[:, loc])
+
+    def major_xs(self, key):
+        """
+        Parameters
+        ----------
+
+        Returns
+        -------
+        y : DataMatrix
+            index -> minor axis, columns -> items
+        """
+        try:
+            loc = self.major_axis.indexMap[key]
+        except KeyError:
+            raise KeyError('%s not contained in major axis!' % key)
+
+        left, right = self.index._get_label_bounds(loc, loc + 1)
+
+        mat = np.empty((len(self.minor_axis), len(self.items)))
+        mat.fill(np.NaN)
+        mat[self.index.minor_labels[left:right]] = self.values[left:right]
+
+        return DataMatrix(mat, index=self.minor_axis, columns=self.items)
+
+    def minor_xs(self, key):
+        """
+        Parameters
+        ----------
+
+        Returns
+        -------
+        y : DataMatrix
+            index -> major axis, columns -> items
+        """
+        try:
+            loc = self.minor_axis.indexMap[key]
+        except KeyError:
+            raise KeyError('%s not contained in minor axis!' % key)
+
+        rows = (self.index.minor_labels == loc).nonzero()[0]
+
+        mat = np.empty((len(self.major_axis), len(self.items)))
+        mat.fill(np.NaN)
+        mat[self.index.major_labels.take(rows)] = self.values.take(rows,
+                                                                   axis=0)
+
+        return DataMatrix(mat, index=self.major_axis, columns=self.items)
+
+    def toLong(self, filter_observations=True):
+        """
+        Transform into long (stacked) format
+
+        Parameters
+        ----------
+        filter_observations : boolean, default True
+            Drop (major, minor) pairs without a complete set of observations
+            across all the items. Cells which are not stored are never
+            included
+
+        Returns
+        -------
+        y : LongPanel
+        """
+        values = self.values
+        index = self.index
+
+        if filter_observations:
+            selector = np.isfinite(values).all(axis=1)
+
+            if not selector.all():
+                values = values[selector]
+                index = LongPanelIndex(self.major_axis, self.minor_axis,
+                                       index.major_labels[selector],
+                                       index.minor_labels[selector])
+
+        return LongPanel(values.copy(), self.items, index)
+
+    def toWide(self):
+        """
+        Transform into a dense WidePanel, filling the cells which are not
+        stored with NaN
+
+        Returns
+        -------
+        y : WidePanel
+        """
+        I, N, K = self.dims
+
+        values = np.empty((I, N, K), dtype=self.values.dtype)
+
+        for i in xrange(I):
+            values[i] = self._cells_to_frame(self.values[:, i]).values
+
+        return WidePanel(values, self.items, self.major_axis, self.minor_axis)
+
+    def _aggregate(self, how, axis='major'):
+        axis = WidePanel._get_axis_name(axis)
+
+        values = self.values
+        mask = np.isfinite(values)
+
+        if axis == 'items':
+            # each stored cell is a group of len(items) values
+            labels = np.arange(self.nobs, dtype=np.int32)
+            labels = labels.repeat(len(self.items))
+
+            result = _labeled_reduce(how, values.ravel(), labels,
+                                     mask.ravel(), self.nobs)
+
+            fill_value = 0 if how == 'count' else np.NaN
+            return self._cells_to_frame(result, fill_value=fill_value)
+
+        if axis == 'major':
+            labels = self.index.minor_labels
+            index = self.minor_axis
+        elif axis == 'minor':
+            labels = self.index.major_labels
+            index = self.major_axis
+
+        labels = np.asarray(labels, dtype=np.int32)
+
+        result = np.empty((len(index), len(self.items)))
+        for i in xrange(len(self.items)):
+            result[:, i] = _labeled_reduce(how, values[:, i], labels,
+                                           mask[:, i], len(index))
+
+        return DataMatrix(result, index=index, columns=self.items)
+
+    def count(self, axis='major'):
+        """
+        Return DataMatrix of observation counts along desired axis
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('count', axis=axis)
+
+    def sum(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('sum', axis=axis)
+
+    def mean(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('mean', axis=axis)
+
+    def var(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('var', axis=axis)
+
+    def std(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self.var(axis=axis).apply(np.sqrt)
+
+    def max(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('max', axis=axis)
+
+    def min(self, axis='major'):
+        """
+
+        Returns
+        -------
+        y : DataMatrix
+        """
+        return self._aggregate('min', axis=axis)
+
+def _group_counts(labels, ngroups):
+    """
+    Number of occurrences of each label 0, ..., ngroups - 1
+    """
+    counts = np.zeros(ngroups, dtype=int)
+
+    if len(labels) > 0:
+        binned = np.bincount(labels)
+        counts[:len(binned)] = binned
+
+    return counts
+
+def _labeled_reduce(how, values, labels, mask, ngroups):
+    """
+    Reduce the non-NaN values (where mask is True) with each label
+    0, ..., ngroups - 1. Groups without observations are NaN
+    """
+    values = values[mask]
+    labels = labels[mask]
+
+    counts = _group_counts(labels, ngroups)
+
+    if how == 'count':
+        return counts.astype(float)
+    elif how == 'max':
+        return tseries.labeled_max(values, labels, ngroups)
+    elif how == 'min':
+        return tseries.labeled_min(values, labels, ngroups)
+
+    sums = tseries.labeled_sum(values, labels, ngroups)
+
+    if how == 'sum':
+        result = sums
+    elif how == 'mean':
+        result = sums / counts
+    elif how == 'var':
+        sumsq = tseries.labeled_sum(values * values, labels, ngroups)
+        result = (sumsq - sums * sums / counts) / (counts - 1)
+    else: # pragma: no cover
+        raise ValueError('invalid reduction %s' % how)
+
+    result[counts == 0] = np.NaN
+
+    return result
+
+
 class LongPanelIndex(object):
     """
     Parameters
@@ -1793,10 +2381,8 @@ class Factor(object):
 
     @classmethod
     def fromarray(cls, values):
-        levels = np.array(sorted(set(values)), dtype=object)
-        labels = levels.searchsorted(values)
-
-        return Factor(labels, levels=levels)
+        labels, levels = _factorize(values)
+        return Factor(labels, levels=np.asarray(levels, dtype=object))
 
     def asarray(self):
         return self.levels[self.labels]
@@ -1833,7 +2419,20 @@ def factor_agg(factor, vec, func):
     Returns
     -------
     ndarray corresponding to Factor levels
+
+    Notes
+    -----
+    np.sum, np.mean, np.min and np.max of numeric data are computed in a
+    single pass over the labels instead of calling func per level
     """
+    vec = np.asarray(vec)
+    kernel = _labeled_kernels.get(func)
+
+    if (kernel is not None and vec.ndim == 1
+        and issubclass(vec.dtype.type, (np.number, np.bool_))):
+        labels = np.asarray(factor.labels, dtype=np.int32)
+        return kernel(vec.astype(float), labels, len(factor.levels))
+
     indexer = np.argsort(factor.labels)
     unique_labels = np.arange(len(factor.levels))
 
@@ -1843,6 +2442,39 @@ def factor_agg(factor, vec, func):
 
     return group_agg(ordered_vec, bounds, func)
 
+def _labeled_mean(values, labels, ngroups):
+    sums = tseries.labeled_sum(values, labels, ngroups)
+    counts = _group_counts(labels, ngroups)
+
+    result = np.empty(ngroups)
+    result.fill(np.NaN)
+    have = counts > 0
+    result[have] = sums[have] / counts[have]
+    return result
+
+_labeled_kernels = {
+    np.sum : tseries.labeled_sum,
+    np.mean : _labeled_mean,
+    np.max : tseries.labeled_max,
+    np.min : tseries.labeled_min,
+}
+
+def _factorize(values):
+    """
+    Returns integer labels and the sorted distinct values (levels) of the
+    passed array-like
+    """
+    values = np.asarray(values)
+
+    if issubclass(values.dtype.type, (np.number, np.bool_)):
+        levels, labels = np.unique(values, return_inverse=True)
+        return labels.astype(np.int32), levels
+
+    if values.dtype != np.object_:
+        values = values.astype(object)
+
+    return tseries.factorize(values.ravel(), sort=True)
+
 def group_agg(values, bounds, f):
     """
     R-style aggregator
@@ -1885,67 +2517,96 @@ def _prefix_item(item, prefix=None):
     template = '%s%s'
     return template % (prefix, item)
 
-def _homogenize(frames, intersect=True):
+def _homogenize(frames, intersect=True, dtype=float):
     """
     Conform set of DataFrame-like objects to either an intersection
-    of indices / columns or a union.
+    of indices / columns or a union, stacking their values
 
     Parameters
     ----------
-    frames : dict
+    frames : list of DataFrame / DataMatrix / dict
     intersect : boolean, default True
+    dtype : numpy dtype, default float
 
     Returns
     -------
-    dict of aligned frames, index, columns
+    (values, index, columns) : ndarray (frames x index x columns), Index,
+        Index
     """
-    result = {}
-
-    index = None
-    columns = None
+    frames = [DataMatrix(v) if isinstance(v, dict) else v for v in frames]
 
-    adj_frames = {}
-    for k, v in frames.iteritems():
-        if isinstance(v, dict):
-            adj_frames[k] = DataMatrix(v)
-        elif not isinstance(v, DataMatrix):
-            adj_frames[k] = v.toDataMatrix()
-        else:
-            adj_frames[k] = v
+    index = _combine_indexes([frame.index for frame in frames], intersect)
 
+    column_sets = [set(frame.cols()) for frame in frames]
     if intersect:
-        for key, frame in adj_frames.iteritems():
-            if index is None:
-                index = frame.index
-            elif index is not frame.index:
-                index = index.intersection(frame.index)
-
-            if columns is None:
-                columns = set(frame.cols())
-            else:
-                columns &= set(frame.cols())
+        columns = set.intersection(*column_sets)
     else:
-        for key, frame in adj_frames.iteritems():
-            if index is None:
-                index = frame.index
-            elif index is not frame.index:
-                index = index.union(frame.index)
-
-            if columns is None:
-                columns = set(frame.cols())
-            else:
-                columns |= set(frame.cols())
+        columns = set.union(*column_sets)
+    columns = Index(sorted(columns))
+
+    values = np.empty((len(frames), len(index), len(columns)), dtype=dtype)
+    values.fill(np.NaN)
+
+    # write each frame into its slot through take indexers, instead of
+    # reindexing them all and stacking the copies
+    for i, frame in enumerate(frames):
+        if (isinstance(frame, DataMatrix) and
+            len(frame.cols()) == len(frame.columns)):
+            frame_columns = frame.columns
+            frame_values = frame.values
+        else:
+            frame_columns = Index([c for c in columns if c in column_sets[i]])
+            frame_values = frame.asMatrix(list(frame_columns))
+
+        if frame.index is index:
+            row_indexer = row_mask = None
+        else:
+            row_indexer, row_mask = common.get_indexer(frame.index, index,
+                                                       None)
+            frame_values = frame_values.take(row_indexer[row_mask], axis=0)
+
+        if frame_columns is columns or frame_columns.equals(columns):
+            col_mask = None
+        else:
+            col_indexer, col_mask = common.get_indexer(frame_columns,
+                                                       columns, None)
+            frame_values = frame_values.take(col_indexer[col_mask], axis=1)
+
+        if row_mask is None and col_mask is None:
+            values[i] = frame_values
+        elif col_mask is None:
+            values[i][row_mask] = frame_values
+        elif row_mask is None:
+            values[i][:, col_mask] = frame_values
+        else:
+            values[i][np.ix_(row_mask, col_mask)] = frame_values
 
-    columns = sorted(columns)
+    return values, index, columns
+
+def _combine_indexes(indexes, intersect=True):
+    """
+    Union or intersection of a list of Index objects in one pass, sorted
+    if possible
+    """
+    first = indexes[0]
+    others = [idx for idx in indexes
+              if idx is not first and not first.equals(idx)]
+
+    if not others:
+        return first
 
     if intersect:
-        for key, frame in adj_frames.iteritems():
-            result[key] = frame.filter(columns).reindex(index)
-    else:
-        for key, frame in adj_frames.iteritems():
-            result[key] = frame.reindex(index=index, columns=columns)
+        return Index(sorted(set(first).intersection(*others)))
 
-    return result, index, columns
+    union = set(first).union(*others)
+    try:
+        return Index(sorted(union))
+    except Exception:
+        # Not sortable / multiple types
+        seen = set()
+        unique = [x for x in np.concatenate([first] + others)
+                  if not (x in seen or seen.add(x))]
+        return Index(unique)
 
 def pivot(index, columns, values):
     """
@@ -1975,11 +2636,11 @@ def pivot(index, columns, values):
         return DataMatrix(index=[])
 
     try:
-        major_axis = Index(sorted(set(index)))
-        minor_axis = Index(sorted(set(columns)))
+        major_labels, major_axis = _factorize(index)
+        minor_labels, minor_axis = _factorize(columns)
 
-        major_labels, _ = tseries.getMergeVec(index, major_axis.indexMap)
-        minor_labels, _ = tseries.getMergeVec(columns, minor_axis.indexMap)
+        major_axis = Index(major_axis)
+        minor_axis = Index(minor_axis)
 
         valueMat = values.view(np.ndarray).reshape(len(values), 1)
 
@@ -13,7 +13,7 @@ from numpy import NaN, ndarray
 import numpy as np
 
 from pandas.core.common import isnull, notnull
-from pandas.core.daterange import DateRange
+from pandas.core.daterange import DateRange, _resample, _OHLC
 from pandas.core.index import Index, NULL_INDEX
 from pandas.core.mixins import Picklable, Groupable
 import pandas.core.datetools as datetools
@@ -1195,8 +1195,48 @@ class Series(np.ndarray, Picklable, Groupable):
         else:
             dateRange = DateRange(self.index[0], self.index[-1], timeRule=freq)
 
+        if datetools.conformsToRule(self.index, freq):
+            # already at freq, nothing to fill
+            result = self.copy()
+            result.index = dateRange
+            return result
+
         return self.reindex(dateRange, method=method, fillMethod=fillMethod)
 
+    def resample(self, rule, how='mean', closed=None, label=None):
+        """
+        Convert this TimeSeries to a lower frequency, aggregating the values
+        between consecutive dates of the provided rule
+
+        Parameters
+        ----------
+        rule : DateOffset object, or time rule string (e.g. 'EOM')
+        how : {'mean', 'sum', 'ohlc', 'first', 'last', 'min', 'max', 'count',
+               'std', 'var'} or function, default 'mean'
+            Aggregation of the (non-NaN) values of each bin. A function is
+            called on the values of each nonempty bin
+        closed : {'left', 'right'}, optional
+            Side of each bin including its edge. Defaults to 'left' for
+            Ticks and daily offsets, 'right' for the others
+        label : {'left', 'right'}, optional
+            Edge labeling each bin, defaults to closed
+
+        Returns
+        -------
+        TimeSeries, or DataFrame with columns open, high, low and close for
+        how='ohlc'
+        """
+        values = self.values.reshape((len(self), 1))
+        labels, result = _resample(values, self.index, rule, how=how,
+                                   closed=closed, label=label)
+
+        if how == 'ohlc':
+            from pandas.core.frame import DataFrame
+            return DataFrame(dict(zip(_OHLC, result[:, :, 0])), index=labels,
+                             columns=_OHLC)
+
+        return Series(result[:, 0], index=labels)
+
     def interpolate(self, method='linear'):
         """
         Interpolate missing values (after the first valid value)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import pickle
 import unittest
 
@@ -37,6 +37,66 @@ class TestGeneration(unittest.TestCase):
                           end = datetime(2008, 1, 6)),
                      [])
 
+    def test_vectorized(self):
+        offsets = [datetools.BDay(), datetools.BDay(3), datetools.MonthEnd(),
+                   datetools.BMonthEnd(2), datetools.Week(),
+                   datetools.Week(2, weekday=4),
+                   datetools.BQuarterEnd(startingMonth=2),
+                   datetools.BYearEnd(month=6), datetools.Minute(7),
+                   datetools.Second(90)]
+
+        start = datetime(1968, 2, 29, 10, 30)
+
+        for offset in offsets:
+            self.assert_(offset._vectorized)
+
+            if isinstance(offset, datetools.Tick):
+                last = datetime(1968, 3, 2)
+            else:
+                last = datetime(1974, 3, 1)
+
+            ends = [start + timedelta(hours=7),
+                    datetime(1968, 2, 27), last]
+
+            for end in ends:
+                rng = list(generate_range(start, end, offset=offset))
+                self.assertEqual(rng, _slow_range(start, end, offset))
+
+            rng = list(generate_range(start, periods=20, offset=offset))
+            self.assertEqual(rng, _slow_range(start, None, offset, 20))
+
+            rng = list(generate_range(end=ends[-1], periods=20,
+                                      offset=offset))
+            self.assertEqual(rng, _slow_range(None, ends[-1], offset, 20))
+
+def _slow_range(start, end, offset, periods=None):
+    # reference implementation, applying the offset date by date
+    if start and not offset.onOffset(start):
+        start = offset.rollforward(start)
+
+    if end and not offset.onOffset(end):
+        end = offset.rollback(end)
+
+        if periods is None and end < start:
+            return []
+
+    if end is None:
+        end = start + (periods - 1) * offset
+
+    if start is None:
+        start = end - (periods - 1) * offset
+
+    cur = start
+    if offset._normalizeFirst:
+        cur = datetools.normalize_date(cur)
+
+    result = []
+    while cur <= end:
+        result.append(cur)
+        cur = offset.apply(cur)
+
+    return result
+
 class TestDateRange(unittest.TestCase):
 
     def setUp(self):
@@ -70,6 +130,103 @@ class TestDateRange(unittest.TestCase):
         self.assertEquals(len(rng), 50)
         self.assertEquals(rng[0], datetime(2010, 9, 1, 5))
 
+    def test_cache_extension(self):
+        DateRange.clearCache()
+
+        rng = DateRange(START, END, offset=datetools.bmonthEnd)
+        stats = DateRange.cacheStats()
+        self.assertEquals(stats['misses'], 1)
+        self.assertEquals(stats['size'], 1)
+
+        # outside of the initial window, on both sides
+        early = DateRange(datetime(1900, 1, 1), periods=30,
+                          offset=datetools.bmonthEnd)
+        late = DateRange(end=datetime(2100, 1, 1), periods=30,
+                         offset=datetools.bmonthEnd)
+
+        self.assert_(np.array_equal(rng, _slow_range(
+            START, END, datetools.bmonthEnd)))
+        self.assert_(np.array_equal(early, _slow_range(
+            datetime(1900, 1, 1), None, datetools.bmonthEnd, periods=30)))
+        self.assertEquals(late[-1], datetime(2099, 12, 31))
+        self.assertEquals(len(late), 30)
+        self.assertEquals(late.offset, datetools.bmonthEnd)
+
+        stats = DateRange.cacheStats()
+        self.assertEquals(stats['hits'], 2)
+        self.assertEquals(stats['extensions'], 2)
+
+        DateRange(datetime(1920, 1, 1), datetime(2050, 1, 1),
+                  offset=datetools.bmonthEnd)
+        self.assertEquals(DateRange.cacheStats()['extensions'], 2)
+
+    def test_cache_ticks(self):
+        DateRange.clearCache()
+
+        start = datetime(2010, 1, 1, 10, 30)
+        rng = DateRange(start, periods=100, offset=datetools.Minute())
+        self.assertEquals(len(rng), 100)
+        self.assertEquals(rng[-1], start + timedelta(minutes=99))
+
+        # the cached window only spans the requested dates
+        self.assertEquals(DateRange.cacheStats()['dates'], 100)
+
+        # different phase
+        rng = DateRange(start + timedelta(seconds=1), periods=5,
+                        offset=datetools.Minute())
+        self.assertEquals(rng[0], start + timedelta(seconds=1))
+        self.assertEquals(DateRange.cacheStats()['size'], 2)
+
+        # too long to be cached
+        rng = DateRange(start, start + timedelta(days=365),
+                        offset=datetools.Minute())
+        self.assertEquals(len(rng), 365 * 1440 + 1)
+        self.assert_(DateRange.cacheStats()['dates'] < 1000)
+
+    def test_cache_eviction(self):
+        cache = DateRange._cache
+        maxsize = cache.maxsize
+        try:
+            DateRange.clearCache()
+            cache.maxsize = 2
+
+            for weekday in range(3):
+                DateRange(START, END, offset=datetools.Week(weekday=weekday))
+
+            stats = DateRange.cacheStats()
+            self.assertEquals(stats['size'], 2)
+            self.assertEquals(stats['evictions'], 1)
+        finally:
+            cache.maxsize = maxsize
+
+    def test_cache_threads(self):
+        import threading
+        DateRange.clearCache()
+
+        offsets = [datetools.bday, datetools.bmonthEnd, datetools.Hour()]
+        errors = []
+
+        def worker(seed):
+            prng = np.random.RandomState(seed)
+            for i in range(50):
+                offset = offsets[prng.randint(len(offsets))]
+                start = datetime(1900, 1, 1) + timedelta(prng.randint(70000))
+                rng = DateRange(start, periods=20, offset=offset)
+
+                expected = _slow_range(start, None, offset, periods=20)
+                if not np.array_equal(rng, expected):
+                    errors.append((offset, start))
+
+        threads = [threading.Thread(target=worker, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(errors, [])
+        self.assertEquals(DateRange.cacheStats()['size'], 3)
+
     def test_comparison(self):
         d = self.rng[10]
 
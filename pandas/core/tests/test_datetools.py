@@ -5,10 +5,17 @@ from pandas.core.datetools import (
     bday, BDay, BQuarterEnd, BMonthEnd, BYearEnd, MonthEnd,
     DateOffset, Week, YearBegin, YearEnd, Hour, Minute, Second,
     WeekOfMonth, format, ole2datetime, to_datetime, normalize_date,
-    getOffset, getOffsetName, inferTimeRule, hasOffsetName)
+    getOffset, getOffsetName, inferTimeRule, hasOffsetName,
+    conformsToRule, _offsetMap)
+from pandas.core.daterange import DateRange
+from pandas.core.index import Index
 
 from nose.tools import assert_raises
 
+import numpy as np
+
+import pandas.lib.tseries as tseries
+
 ####
 ## Misc function tests
 ####
@@ -768,6 +775,47 @@ def test_Second():
     assert (Second(3) + Second(2)) == Second(5)
     assert (Second(3) - Second(2)) == Second()
 
+def test_apply_index():
+    dates = [datetime(2007, 12, 28) + timedelta(i) for i in range(70)]
+    dates += [datetime(2008, 2, 29, 13, 5), datetime(2008, 3, 31, 8),
+              datetime(2008, 12, 31, 1), datetime(2009, 1, 1, 1),
+              datetime(2009, 5, 30, 12), datetime(2009, 6, 6, 23, 59)]
+
+    offsets = [DateOffset(), DateOffset(months=2), Hour(3), Second(-2)]
+    for n in [-2, -1, 0, 1, 3]:
+        offsets.extend([BDay(n), BDay(n, normalize=False),
+                        BDay(n, offset=timedelta(hours=2)),
+                        MonthEnd(n), BMonthEnd(n), Week(n),
+                        Week(n, weekday=3), BQuarterEnd(n),
+                        BQuarterEnd(n, startingMonth=1), BYearEnd(n),
+                        BYearEnd(n, month=3), YearEnd(n), YearBegin(n)])
+
+    for n in [-1, 1]:
+        offsets.append(WeekOfMonth(n, week=1, weekday=2))
+        offsets.append(WeekOfMonth(n, week=0, weekday=6))
+
+    for offset in offsets:
+        result = offset.apply_index(dates)
+        assert list(result) == [d + offset for d in dates]
+
+        result = offset.onOffset_index(dates)
+        assert result.dtype == np.bool_
+        assert list(result) == [offset.onOffset(d) for d in dates]
+
+        result = offset.rollback_index(dates)
+        assert list(result) == [offset.rollback(d) for d in dates]
+
+        result = offset.rollforward_index(dates)
+        assert list(result) == [offset.rollforward(d) for d in dates]
+
+    # the kernels themselves, without the fallback to apply
+    micros = tseries.dates_to_micros(np.array(dates, dtype=object))
+    for offset in [YearEnd(), YearEnd(-1), YearBegin(), YearBegin(-1)]:
+        result = tseries.micros_to_dates(offset._apply_micros(micros))
+        assert list(result) == [d + offset for d in dates]
+
+    assert len(BDay().apply_index([])) == 0
+
 def test_inferTimeRule():
     index1 = [datetime(2010, 1, 29, 0, 0),
               datetime(2010, 2, 26, 0, 0),
@@ -787,6 +835,46 @@ def test_inferTimeRule():
     assert_raises(Exception, inferTimeRule, index1[:2])
     assert_raises(Exception, inferTimeRule, index3)
 
+    # whole index is checked
+    index4 = index2 + [datetime(2010, 4, 2, 0, 0)]
+    assert_raises(Exception, inferTimeRule, index4)
+
+    for rule, offset in _offsetMap.iteritems():
+        dates = [offset.rollforward(datetime(2000, 1, 1))]
+        for i in range(19):
+            dates.append(dates[-1] + offset)
+
+        assert inferTimeRule(dates) == rule
+        assert inferTimeRule(Index(dates)) == rule
+
+    # cached on the index
+    index = Index(index2)
+    assert inferTimeRule(index) == 'WEEKDAY'
+    assert index._cache_timeRule == 'WEEKDAY'
+
+    index = Index(index3)
+    assert_raises(Exception, inferTimeRule, index)
+    assert index._cache_timeRule is None
+
+    dr = DateRange(datetime(2010, 1, 1), periods=10, offset=BMonthEnd())
+    assert inferTimeRule(dr) == 'EOM'
+
+    assert_raises(Exception, inferTimeRule, Index(['a', 'b', 'c']))
+
+def test_conformsToRule():
+    dr = DateRange(datetime(2010, 1, 1), periods=10, offset=BDay())
+    index = Index(list(dr))
+
+    assert conformsToRule(index, 'WEEKDAY')
+    assert conformsToRule(index, BDay())
+    assert not conformsToRule(index, 'EOM')
+    assert not conformsToRule(index, BDay(2))
+    assert not conformsToRule(index[:2], 'WEEKDAY')
+
+    # evenly spaced but not on offset
+    index = Index([d + timedelta(hours=1) for d in dr])
+    assert not conformsToRule(index, 'WEEKDAY')
+
 def test_hasOffsetName():
     assert hasOffsetName(BDay())
     assert not hasOffsetName(BDay(2))
@@ -790,6 +790,27 @@ class TestDataFrame(unittest.TestCase):
         result = zero_length.asfreq('EOM')
         self.assert_(result is not zero_length)
 
+    def test_resample(self):
+        tsframe = self.tsframe.copy()
+        tsframe['foo'] = 'bar'
+
+        result = tsframe.resample('EOM', how='mean')
+        self.assert_(isinstance(result, self.klass))
+        self.assertEquals(sorted(result.columns), ['A', 'B', 'C', 'D'])
+
+        for col in ['A', 'B', 'C', 'D']:
+            expected = self.tsframe[col].resample('EOM', how='mean')
+            assert_almost_equal(result[col], expected)
+            self.assert_(result.index.equals(expected.index))
+
+        ohlc = self.tsframe.resample('EOM', how='ohlc')
+        assert_almost_equal(ohlc['close']['B'],
+                            self.tsframe['B'].resample('EOM', how='last'))
+
+        zero_length = self.tsframe.reindex([])
+        result = zero_length.resample('EOM')
+        self.assertEquals(len(result.index), 0)
+
     def test_asMatrix(self):
         frame = self.frame
         mat = frame.asMatrix()
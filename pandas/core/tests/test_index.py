@@ -1,5 +1,6 @@
 from datetime import timedelta
 from pandas.core.index import Index
+import pandas.core.datetools as datetools
 import pandas.util.testing as common
 import pandas.lib.tseries as tseries
 import numpy as np
@@ -133,6 +134,23 @@ class TestIndex(unittest.TestCase):
         shifted = self.dateIndex.shift(5, timedelta(1))
         self.assert_(np.array_equal(shifted, self.dateIndex + timedelta(5)))
 
+        shifted = self.dateIndex.shift(3, datetools.bday)
+        expected = [d + 3 * datetools.bday for d in self.dateIndex]
+        self.assert_(np.array_equal(shifted, expected))
+
+        # index conforming to the offset
+        for offset in (datetools.bday, datetools.bmonthEnd):
+            dates = [offset.rollforward(self.dateIndex[0])]
+            for i in range(19):
+                dates.append(dates[-1] + offset)
+
+            index = Index(dates)
+            for n in (3, -2):
+                shifted = index.shift(n, offset)
+                expected = [d + n * offset for d in index]
+                self.assert_(np.array_equal(shifted, expected))
+                self.assertEquals(shifted.offset, offset)
+
     def test_intersection(self):
         first = self.strIndex[:20]
         second = self.strIndex[:10]
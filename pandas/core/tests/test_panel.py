@@ -10,7 +10,7 @@ import numpy as np
 from pandas.core.api import DataFrame, Index, notnull
 from pandas.core.datetools import bday
 from pandas.core.panel import (WidePanel, LongPanelIndex, LongPanel,
-                               group_agg, pivot)
+                               SparseWidePanel, DummyPanel, group_agg, pivot)
 import pandas.core.panel as panelmod
 
 from pandas.util.testing import (assert_panel_equal,
@@ -227,6 +227,22 @@ class TestWidePanel(unittest.TestCase, PanelTests):
         wp = WidePanel.fromDict(d, intersect=True)
         self.assert_(wp.major_axis.equals(itemb.index[5:]))
 
+        # differing columns, mixed frame types
+        itemc = DataFrame(itemb.filter(['A', 'B'])._series)
+        itemc['E'] = 1.
+        d = {'A' : itema, 'B' : itemb[:-4], 'C' : itemc[3:]}
+
+        for intersect in (False, True):
+            wp = WidePanel.fromDict(d, intersect=intersect)
+            for item, frame in d.iteritems():
+                expected = frame.reindex(index=wp.major_axis,
+                                         columns=wp.minor_axis)
+                assert_frame_equal(wp[item], expected)
+
+        wp = WidePanel.fromDict(d, intersect=True)
+        self.assertEqual(list(wp.minor_axis), ['A', 'B'])
+        self.assert_(wp.major_axis.equals(itema.index[3:-4]))
+
     def test_keys(self):
         common.equalContents(self.panel.keys(), self.panel.items)
 
@@ -488,6 +504,15 @@ class TestWidePanel(unittest.TestCase, PanelTests):
         assert_series_equal(compounded['ItemA'],
                             (1 + self.panel['ItemA']).product(0) - 1)
 
+    def test_resample(self):
+        result = self.panel.resample('EOM', how='sum')
+
+        for item in self.panel.items:
+            expected = self.panel[item].resample('EOM', how='sum')
+            assert_frame_equal(result[item], expected)
+
+        self.assertRaises(Exception, self.panel.resample, 'EOM', how='ohlc')
+
     def test_shift(self):
         # major
         idx = self.panel.major_axis[0]
@@ -717,6 +742,42 @@ class TestLongPanel(unittest.TestCase):
         result = self.panel.add(wp['ItemA'])
         assert_frame_equal(result.toWide()['ItemA'], wp['ItemA'] * 2)
 
+        def check_op(op, name):
+            func = getattr(self.panel, name)
+
+            frames = {'items' : wp['ItemA'],
+                      'major' : wp.major_xs(wp.major_axis[0]),
+                      'minor' : wp.minor_xs(wp.minor_axis[0])}
+
+            for axis, df in frames.iteritems():
+                # only observed rows
+                result = func(df, axis=axis)
+                self.assert_(result.index is self.panel.index)
+                assert_panel_equal(result.toWide(),
+                                   wp._combineFrame(df, op, axis=axis))
+
+        check_op(operator.add, 'add')
+        check_op(operator.sub, 'subtract')
+        check_op(operator.mul, 'multiply')
+        check_op(operator.div, 'divide')
+
+    def test_combineSeries(self):
+        wp = self.panel.toWide()
+
+        s = wp['ItemA'].xs(wp.major_axis[0])
+        result = self.panel.add(s, axis='minor').toWide()
+        assert_frame_equal(result['ItemB'], wp['ItemB'] + s)
+
+        s = wp['ItemA'][wp.minor_axis[0]]
+        result = self.panel.multiply(s, axis='major').toWide()
+        assert_frame_equal(result['ItemB'],
+                           (wp['ItemB'].T * s).T)
+
+        s = wp.major_xs(wp.major_axis[0]).xs(wp.minor_axis[0])
+        result = self.panel.subtract(s).toWide()
+        for item in wp.items:
+            assert_frame_equal(result[item], wp[item] - s[item])
+
     def test_combinePanel(self):
         wp = self.panel.toWide()
         result = self.panel.add(self.panel)
@@ -741,6 +802,16 @@ class TestLongPanel(unittest.TestCase):
         sorted_major = sorted_minor.sort(axis='major')
         self.assert_(is_sorted(sorted_major.index.major_labels))
 
+        index = sorted_minor.index
+        indexer = np.lexsort((index.minor_labels, index.major_labels))
+        assert_almost_equal(sorted_major.values,
+                            sorted_minor.values[indexer])
+
+        # already sorted
+        resorted = sorted_major.sort(axis='major')
+        self.assert_(resorted.values is not sorted_major.values)
+        assert_almost_equal(resorted.values, sorted_major.values)
+
     def test_toWide(self):
         pass
 
@@ -821,7 +892,15 @@ class TestLongPanel(unittest.TestCase):
         self.assertEqual(len(transformed.items), 2)
         self.assert_(np.array_equal(transformed.items, ['one', 'two']))
 
-        # TODO: test correctness
+        labels = self.panel.index.minor_labels
+        expected = np.eye(len(self.panel.minor_axis)).take(labels, axis=0)
+        assert_almost_equal(minor_dummies.values, expected)
+
+        expected = np.eye(2).take([0, 0, 1, 1], axis=0).take(labels, axis=0)
+        assert_almost_equal(transformed.values, expected)
+
+        prefixed = self.panel.get_axis_dummies('minor', prefix='FE_')
+        self.assertEqual(prefixed.items[0], 'FE_A')
 
     def test_get_dummies(self):
         self.panel['Label'] = self.panel.index.minor_labels
@@ -831,6 +910,31 @@ class TestLongPanel(unittest.TestCase):
 
         self.assert_(np.array_equal(dummies.values, minor_dummies.values))
 
+    def test_dummy_panel(self):
+        dummies = self.panel.get_axis_dummies('minor')
+        labels = self.panel.index.minor_labels
+
+        self.assert_(isinstance(dummies, DummyPanel))
+        self.assert_(dummies.index is self.panel.index)
+        self.assertEqual(len(dummies), len(self.panel))
+
+        item = dummies['C']
+        self.assert_(isinstance(item, LongPanel))
+        assert_almost_equal(item.values[:, 0], labels == 2)
+
+        # rows of dropped values are all 0
+        filtered = dummies.filter(['A', 'C'])
+        self.assert_(np.array_equal(filtered.items, ['A', 'C']))
+        assert_almost_equal(filtered.values,
+                            dummies.values.take([0, 2], axis=1))
+
+        lp = filtered.toLong()
+        self.assert_(isinstance(lp, LongPanel))
+        assert_almost_equal(lp.values, filtered.values)
+
+        self.assertRaises(ValueError, DummyPanel, labels[:-1],
+                          dummies.items, dummies.index)
+
     def test_apply(self):
         # ufunc
         applied = self.panel.apply(np.sqrt)
@@ -877,6 +981,12 @@ class TestLongPanel(unittest.TestCase):
 
         self.assertEqual(len(joined.items), 3)
 
+        dummies = self.panel.get_axis_dummies('minor').filter(['B', 'D'])
+        joined = lp1.leftJoin(dummies)
+        assert_almost_equal(joined.values,
+                            np.column_stack((lp1.values, dummies.values)))
+        self.assertEqual(list(joined.items), ['ItemA', 'ItemB', 'B', 'D'])
+
         self.assertRaises(Exception, lp1.leftJoin,
                           self.panel.filter(['ItemB', 'ItemC']))
 
@@ -931,6 +1041,82 @@ def test_monotonic():
 
     assert not panelm._monotonic(neg2)
 
+class TestSparseWidePanel(unittest.TestCase):
+
+    def setUp(self):
+        self.wide = common.makeWidePanel()
+        common.add_nans(self.wide)
+
+        # unobserved cell
+        self.wide.values[:, 3, 2] = np.NaN
+
+        self.panel = self.wide.toSparse()
+
+    def test_constructor(self):
+        self.assertEqual(self.panel.nobs,
+                         np.isfinite(self.wide.values).any(0).sum())
+        self.assertRaises(ValueError, SparseWidePanel,
+                          self.panel.values[:-1], self.panel.items,
+                          self.panel.index)
+
+    def test_pickle(self):
+        import cPickle
+
+        unpickled = cPickle.loads(cPickle.dumps(self.panel))
+        assert_panel_equal(unpickled.toWide(), self.wide)
+
+    def test_toWide(self):
+        assert_panel_equal(self.panel.toWide(), self.wide)
+
+        lp = self.wide.toLong()
+        sparse = lp.toSparse()
+        assert_panel_equal(sparse.toWide(), lp.toWide())
+
+        # unsorted
+        sparse = lp.sort(axis='minor').toSparse()
+        assert_panel_equal(sparse.toWide(), lp.toWide())
+
+    def test_toLong(self):
+        lp = self.panel.toLong()
+        expected = self.wide.toLong()
+        assert_almost_equal(lp.values, expected.values)
+        assert_almost_equal(lp.index.major_labels,
+                            expected.index.major_labels)
+        assert_almost_equal(lp.index.minor_labels,
+                            expected.index.minor_labels)
+
+        lp = self.panel.toLong(filter_observations=False)
+        self.assertEqual(len(lp), self.panel.nobs)
+
+    def test_getitem(self):
+        for item in self.wide.items:
+            assert_frame_equal(self.panel[item], self.wide[item])
+
+    def test_major_xs(self):
+        for key in self.wide.major_axis:
+            assert_frame_equal(self.panel.major_xs(key),
+                               self.wide.major_xs(key))
+
+        self.assertRaises(KeyError, self.panel.major_xs, 'foo')
+
+    def test_minor_xs(self):
+        for key in self.wide.minor_axis:
+            assert_frame_equal(self.panel.minor_xs(key),
+                               self.wide.minor_xs(key))
+
+        self.assertRaises(KeyError, self.panel.minor_xs, 'foo')
+
+    def test_reductions(self):
+        for name in ['count', 'sum', 'mean', 'var', 'std', 'max', 'min']:
+            for axis in ['major', 'minor', 'items']:
+                result = getattr(self.panel, name)(axis=axis)
+                expected = getattr(self.wide, name)(axis=axis)
+                assert_frame_equal(result, expected)
+
+    def test_arith(self):
+        assert_panel_equal((self.panel * 2).toWide(), self.wide * 2)
+        assert_panel_equal((1 - self.panel).toWide(), 1 - self.wide)
+
 class TestFactor(unittest.TestCase):
 
     def setUp(self):
@@ -950,8 +1136,18 @@ class TestFactor(unittest.TestCase):
     def test_factor_agg(self):
         arr = np.arange(len(self.factor))
 
-        f = np.sum
-        agged = panelmod.factor_agg(self.factor, arr, f)
         labels = self.factor.labels
-        for i, idx in enumerate(self.factor.levels):
-            self.assertEqual(f(arr[labels == i]), agged[i])
+        for f in [np.sum, np.mean, np.max, np.min, np.median]:
+            agged = panelmod.factor_agg(self.factor, arr, f)
+            for i, idx in enumerate(self.factor.levels):
+                self.assertEqual(f(arr[labels == i]), agged[i])
+
+    def test_fromarray(self):
+        values = np.array(['b', 'c', 'a', 'b'], dtype=object)
+        factor = panelmod.Factor.fromarray(values)
+        common.assert_almost_equal(factor.levels, ['a', 'b', 'c'])
+        common.assert_almost_equal(factor.labels, [1, 2, 0, 1])
+
+        factor = panelmod.Factor.fromarray(np.array([3, 1, 3, 2]))
+        common.assert_almost_equal(factor.levels, [1, 2, 3])
+        common.assert_almost_equal(factor.asarray(), [3, 1, 3, 2])
@@ -7,7 +7,8 @@ import unittest
 
 import numpy as np
 
-from pandas.core.api import (Index, Series, TimeSeries, DataFrame, isnull)
+from pandas.core.api import (Index, Series, TimeSeries, DataFrame, DateRange,
+                             isnull)
 import pandas.core.datetools as datetools
 from pandas.util.testing import assert_series_equal
 import pandas.util.testing as common
@@ -766,6 +767,66 @@ class TestSeries(unittest.TestCase):
         monthly_ts = daily_ts.asfreq(datetools.bmonthEnd)
         self.assert_(np.array_equal(monthly_ts, ts))
 
+        # already at the frequency
+        result = ts.asfreq('EOM')
+        self.assert_(isinstance(result.index, DateRange))
+        self.assert_(np.array_equal(result.index, ts.index))
+        self.assert_(np.array_equal(result, ts))
+        self.assert_(result is not ts)
+
+        result = ts.asfreq(datetools.bmonthEnd)
+        self.assert_(isinstance(result.index, DateRange))
+
+    def test_resample(self):
+        ts = self.ts.copy()
+        ts[5:10] = np.NaN
+
+        result = ts.resample('W@FRI', how='sum')
+        self.assertEquals(result.index.offset, datetools.Week(weekday=4))
+
+        for i, date in enumerate(result.index):
+            start = date - datetools.Week(weekday=4)
+            chunk = ts[(ts.index > start) & (ts.index <= date)]
+            if isnull(chunk).all():
+                self.assert_(np.isnan(result[i]))
+            else:
+                self.assertAlmostEqual(result[i], chunk.sum())
+
+        result = ts.resample(datetools.bmonthEnd, how='last')
+        self.assertEquals(result.index[0], datetime(2000, 1, 31))
+        self.assertEquals(result[0], ts[datetime(2000, 1, 31)])
+        self.assertEquals(result[-1], ts[-1])
+
+        # labeled by the first date of each bin
+        result = ts.resample('EOM', how='count', label='left')
+        self.assertEquals(result.index[0], datetime(1999, 12, 31))
+        self.assertEquals(result.sum(), ts.count())
+
+        ohlc = ts.resample('EOM', how='ohlc')
+        self.assertEqual(list(ohlc.columns), ['open', 'high', 'low', 'close'])
+        self.assert_(np.array_equal(ohlc['high'],
+                                    ts.resample('EOM', how='max')))
+        self.assert_(np.array_equal(ohlc['open'],
+                                    ts.resample('EOM', how='first')))
+
+        # intraday, bins aligned to whole hours
+        rng = DateRange(datetime(2010, 1, 1, 10, 30), periods=100,
+                        offset=datetools.Minute(7))
+        ts = Series(np.arange(100.), index=rng)
+
+        result = ts.resample(datetools.Hour(), how='last')
+        self.assertEquals(result.index[0], datetime(2010, 1, 1, 10))
+        self.assertEquals(result[0], 4)
+
+        result = ts.resample(datetools.Hour(), how=np.median, closed='right')
+        self.assertEquals(result.index[0], datetime(2010, 1, 1, 11))
+        self.assertEquals(result[0], 2)
+
+        # unsorted
+        shuffled = ts[np.random.permutation(len(ts))]
+        assert_series_equal(shuffled.resample(datetools.Hour(), how='mean'),
+                            ts.resample(datetools.Hour(), how='mean'))
+
     def test_interpolate(self):
         ts = Series(np.arange(len(self.ts), dtype=float), self.ts.index)
 
@@ -174,3 +174,24 @@ def bench_groupby():
 
 def bench_map_indices():
     pass
+
+def bench_roll_max_min():
+    N = 100000
+    K = 2520
+
+    arr = np.random.randn(N)
+    arr[::10] = np.NaN
+
+    for name in ('max', 'min'):
+        deque_f = getattr(tseries, 'roll_%s' % name)
+        skiplist_f = getattr(tseries, 'roll_%s_skiplist' % name)
+
+        f = lambda: deque_f(arr, K, K // 2)
+        print ('roll_%s (deque): %.2f ms per iteration'
+               % (name, _timeit(f, n=10) * 1000))
+
+        f2 = lambda: skiplist_f(arr, K, K // 2)
+        print ('roll_%s (skiplist): %.2f ms per iteration'
+               % (name, _timeit(f2, n=10) * 1000))
+
+        assert_almost_equal(f(), f2())
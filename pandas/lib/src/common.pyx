@@ -77,6 +77,8 @@ cdef extern from "datetime.h":
     int PyDateTime_TIME_GET_SECOND(datetime o)
     int PyDateTime_TIME_GET_MICROSECOND(datetime o)
     bint PyDateTime_Check(object o)
+    object PyDateTime_FromDateAndTime(int year, int month, int day, int hour,
+                                      int minute, int second, int us)
     void PyDateTime_IMPORT()
 
 # import datetime C API
@@ -0,0 +1,160 @@
+#-------------------------------------------------------------------------------
+# Vectorized date arithmetic on int64 ordinals
+#
+# Dates are represented as microseconds since 1970-01-01 (proleptic
+# Gregorian calendar, no time zones) so that windows, deltas and
+# comparisons can be computed on plain int64 arrays
+
+cdef int64_t US_PER_SECOND = 1000000
+cdef int64_t US_PER_DAY = 86400 * US_PER_SECOND
+
+cdef inline int64_t days_from_civil(int y, int m, int d):
+    '''
+    Days since 1970-01-01 of the given date
+    '''
+    cdef int era, yoe, doy, doe
+
+    if m <= 2:
+        y -= 1
+
+    # y >= 0 for all dates representable by datetime
+    era = y / 400
+    yoe = y - era * 400
+
+    if m > 2:
+        doy = (153 * (m - 3) + 2) / 5 + d - 1
+    else:
+        doy = (153 * (m + 9) + 2) / 5 + d - 1
+
+    doe = yoe * 365 + yoe / 4 - yoe / 100 + doy
+
+    return <int64_t> era * 146097 + doe - 719468
+
+def dates_to_micros(ndarray[object, ndim=1] arr):
+    '''
+    Convert array of datetime objects to int64 microseconds since the epoch
+    '''
+    cdef int i, n = len(arr)
+    cdef datetime val
+    cdef ndarray[int64_t, ndim=1] result = np.empty(n, dtype=np.int64)
+
+    for i from 0 <= i < n:
+        val = arr[i]
+
+        result[i] = (days_from_civil(PyDateTime_GET_YEAR(val),
+                                     PyDateTime_GET_MONTH(val),
+                                     PyDateTime_GET_DAY(val)) * US_PER_DAY
+                     + (PyDateTime_DATE_GET_HOUR(val) * 3600
+                        + PyDateTime_DATE_GET_MINUTE(val) * 60
+                        + PyDateTime_DATE_GET_SECOND(val)) * US_PER_SECOND
+                     + PyDateTime_DATE_GET_MICROSECOND(val))
+
+    return result
+
+cdef inline void civil_from_days(int64_t z, int *y, int *m, int *d):
+    '''
+    Inverse of days_from_civil
+    '''
+    cdef int64_t era, doe, yoe, doy, mp
+
+    z += 719468
+
+    if z >= 0:
+        era = z / 146097
+    else:
+        era = (z - 146096) / 146097
+
+    doe = z - era * 146097
+    yoe = (doe - doe / 1460 + doe / 36524 - doe / 146096) / 365
+    doy = doe - (365 * yoe + yoe / 4 - yoe / 100)
+    mp = (5 * doy + 2) / 153
+
+    d[0] = doy - (153 * mp + 2) / 5 + 1
+
+    if mp < 10:
+        m[0] = mp + 3
+    else:
+        m[0] = mp - 9
+
+    y[0] = yoe + era * 400 + (m[0] <= 2)
+
+def micros_to_dates(ndarray[int64_t, ndim=1] arr):
+    '''
+    Convert int64 microseconds since the epoch to array of datetime objects
+    '''
+    cdef int i, n = len(arr)
+    cdef int y, m, d
+    cdef int64_t val, days
+    cdef ndarray[object, ndim=1] result = np.empty(n, dtype=object)
+
+    for i from 0 <= i < n:
+        val = arr[i]
+
+        days = val / US_PER_DAY
+        if days * US_PER_DAY > val:
+            days -= 1
+
+        val -= days * US_PER_DAY
+        civil_from_days(days, &y, &m, &d)
+
+        result[i] = PyDateTime_FromDateAndTime(
+            y, m, d, val / (3600 * US_PER_SECOND),
+            (val / (60 * US_PER_SECOND)) % 60,
+            (val / US_PER_SECOND) % 60, val % US_PER_SECOND)
+
+    return result
+
+def month_end_days(ndarray[int64_t, ndim=1] months, bint business=False):
+    '''
+    Days since the epoch of the last (business) day of each month, given as
+    year * 12 + month - 1
+    '''
+    cdef int i, n = len(months)
+    cdef int y, m
+    cdef int64_t day, weekday
+    cdef ndarray[int64_t, ndim=1] result = np.empty(n, dtype=np.int64)
+
+    for i from 0 <= i < n:
+        y = months[i] / 12
+        m = months[i] - y * 12 + 1
+
+        # day before the first of the next month
+        if m == 12:
+            day = days_from_civil(y + 1, 1, 1) - 1
+        else:
+            day = days_from_civil(y, m + 1, 1) - 1
+
+        if business:
+            # 1970-01-01 was a Thursday
+            weekday = (day + 3) % 7
+            if weekday < 0:
+                weekday += 7
+
+            if weekday > 4:
+                day -= weekday - 4
+
+        result[i] = day
+
+    return result
+
+def days_to_civil(ndarray[int64_t, ndim=1] days):
+    '''
+    Year, month and day of month of each of an array of days since the epoch
+
+    Returns
+    -------
+    (years, months, days) : int64 ndarrays
+    '''
+    cdef int i, n = len(days)
+    cdef int y, m, d
+    cdef ndarray[int64_t, ndim=1] years = np.empty(n, dtype=np.int64)
+    cdef ndarray[int64_t, ndim=1] months = np.empty(n, dtype=np.int64)
+    cdef ndarray[int64_t, ndim=1] mdays = np.empty(n, dtype=np.int64)
+
+    for i from 0 <= i < n:
+        civil_from_days(days[i], &y, &m, &d)
+        years[i] = y
+        months[i] = m
+        mdays[i] = d
+
+    return years, months, mdays
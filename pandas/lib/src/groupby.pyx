@@ -86,3 +86,298 @@ def groupby_indices(object index, object mapper):
             result[key] = [i]
 
     return result
+
+@cython.boundscheck(False)
+def factorize(ndarray[object, ndim=1] values, sort=False):
+    '''
+    Encode values as integer labels into the array of their distinct values
+    (levels), in a single pass with a hash table
+
+    Parameters
+    ----------
+    values : object ndarray
+    sort : boolean, default False
+        Sort the levels afterwards, renumbering the labels. Otherwise the
+        levels are in order of first appearance
+
+    Returns
+    -------
+    (labels, levels) : int32 ndarray, object ndarray
+    '''
+    cdef int i, n, count = 0
+    cdef dict table = {}
+    cdef list uniques = []
+    cdef object val
+    cdef ndarray[int32_t, ndim=1] labels, mapping
+    cdef ndarray[object, ndim=1] levels
+    cdef ndarray order
+
+    n = len(values)
+    labels = np.empty(n, dtype=np.int32)
+
+    for i from 0 <= i < n:
+        val = values[i]
+        if val in table:
+            labels[i] = table[val]
+        else:
+            table[val] = count
+            uniques.append(val)
+            labels[i] = count
+            count += 1
+
+    # filled one by one, np.array would unpack tuples
+    levels = np.empty(count, dtype=object)
+    for i from 0 <= i < count:
+        levels[i] = uniques[i]
+
+    if sort and count > 0:
+        order = levels.argsort(kind='mergesort')
+        levels = levels.take(order)
+
+        mapping = np.empty(count, dtype=np.int32)
+        mapping[order] = np.arange(count, dtype=np.int32)
+
+        for i from 0 <= i < n:
+            labels[i] = mapping[labels[i]]
+
+    return labels, levels
+
+@cython.boundscheck(False)
+def labeled_sum(ndarray[double_t, ndim=1] values,
+                ndarray[int32_t, ndim=1] labels, int ngroups):
+    '''
+    Sum of the values with each label 0, ..., ngroups - 1
+    '''
+    cdef int i, lab, n = len(values)
+    cdef ndarray[double_t, ndim=1] result = np.zeros(ngroups)
+
+    for i from 0 <= i < n:
+        lab = labels[i]
+        if lab < 0 or lab >= ngroups:
+            raise ValueError('Label out of range: %d' % lab)
+
+        result[lab] += values[i]
+
+    return result
+
+@cython.boundscheck(False)
+def labeled_max(ndarray[double_t, ndim=1] values,
+                ndarray[int32_t, ndim=1] labels, int ngroups):
+    '''
+    Maximum of the values with each label 0, ..., ngroups - 1, NaN if there
+    are none or one of them is NaN
+    '''
+    return _labeled_extreme(values, labels, ngroups, 1)
+
+@cython.boundscheck(False)
+def labeled_min(ndarray[double_t, ndim=1] values,
+                ndarray[int32_t, ndim=1] labels, int ngroups):
+    '''
+    Minimum of the values with each label 0, ..., ngroups - 1, NaN if there
+    are none or one of them is NaN
+    '''
+    return _labeled_extreme(values, labels, ngroups, 0)
+
+@cython.boundscheck(False)
+cdef _labeled_extreme(ndarray[double_t, ndim=1] values,
+                      ndarray[int32_t, ndim=1] labels, int ngroups,
+                      bint is_max):
+    cdef int i, lab, n = len(values)
+    cdef double_t val, cur
+    cdef ndarray[double_t, ndim=1] result = np.empty(ngroups)
+    cdef ndarray[uint8_t, ndim=1] seen = np.zeros(ngroups, dtype=np.uint8)
+
+    result.fill(NaN)
+
+    for i from 0 <= i < n:
+        lab = labels[i]
+        if lab < 0 or lab >= ngroups:
+            raise ValueError('Label out of range: %d' % lab)
+
+        val = values[i]
+
+        if not seen[lab]:
+            result[lab] = val
+            seen[lab] = 1
+            continue
+
+        cur = result[lab]
+
+        # NaN sticks, as with np.max / np.min
+        if cur != cur:
+            continue
+
+        if val != val or (is_max and val > cur) or (not is_max and val < cur):
+            result[lab] = val
+
+    return result
+
+@cython.boundscheck(False)
+def groupsort_indexer(ndarray[int32_t, ndim=1] labels, int ngroups):
+    '''
+    Indexer sorting the labels 0, ..., ngroups - 1 by counting sort, in
+    O(n + ngroups). The sort is stable, i.e. ties keep their order
+
+    Returns
+    -------
+    (indexer, counts) : int32 ndarray, int32 ndarray
+    '''
+    cdef int i, lab, n = len(labels)
+    cdef ndarray[int32_t, ndim=1] indexer, where, counts
+
+    counts = np.zeros(ngroups, dtype=np.int32)
+    where = np.zeros(ngroups, dtype=np.int32)
+    indexer = np.empty(n, dtype=np.int32)
+
+    for i from 0 <= i < n:
+        lab = labels[i]
+        if lab < 0 or lab >= ngroups:
+            raise ValueError('Label out of range: %d' % lab)
+
+        counts[lab] += 1
+
+    # start of each group in the result
+    for i from 1 <= i < ngroups:
+        where[i] = where[i - 1] + counts[i - 1]
+
+    for i from 0 <= i < n:
+        lab = labels[i]
+        indexer[where[lab]] = i
+        where[lab] += 1
+
+    return indexer, counts
+
+@cython.boundscheck(False)
+def is_lexsorted(ndarray[int32_t, ndim=1] first,
+                 ndarray[int32_t, ndim=1] second):
+    '''
+    Whether the pairs (first[i], second[i]) are in (non-strictly) increasing
+    order
+    '''
+    cdef int i, n = len(first)
+
+    for i from 1 <= i < n:
+        if first[i] < first[i - 1]:
+            return False
+        elif first[i] == first[i - 1] and second[i] < second[i - 1]:
+            return False
+
+    return True
+
+@cython.boundscheck(False)
+def lexsort_indexer(ndarray[int32_t, ndim=1] first,
+                    ndarray[int32_t, ndim=1] second,
+                    int nfirst, int nsecond):
+    '''
+    Indexer sorting the pairs (first[i], second[i]) of labels in
+    0, ..., nfirst - 1 and 0, ..., nsecond - 1, equivalent to
+    np.lexsort((second, first)) but in O(n + nfirst + nsecond) by a two pass
+    radix sort
+    '''
+    cdef int i, n = len(first)
+    cdef ndarray[int32_t, ndim=1] indexer, by_second, sorted_first
+
+    if len(second) != n:
+        raise ValueError('Label arrays must have the same length')
+
+    by_second, _ = groupsort_indexer(second, nsecond)
+
+    sorted_first = np.empty(n, dtype=np.int32)
+    for i from 0 <= i < n:
+        sorted_first[i] = first[by_second[i]]
+
+    # stable, so ties in first stay ordered by second
+    indexer, _ = groupsort_indexer(sorted_first, nfirst)
+
+    for i from 0 <= i < n:
+        indexer[i] = by_second[indexer[i]]
+
+    return indexer
+
+@cython.boundscheck(False)
+def bin_reduce(ndarray[double_t, ndim=2] values,
+               ndarray[int32_t, ndim=1] bins, object how):
+    '''
+    Reduce each column of the rows bins[k]:bins[k + 1] of values, k = 0, ...,
+    len(bins) - 2, skipping NaN. how is one of count, sum, mean, var, std,
+    min, max, first or last. Bins without observations are NaN (0 for count)
+
+    Returns
+    -------
+    ndarray (len(bins) - 1 x K)
+    '''
+    cdef:
+        int i, j, k, start, end, nobs, code
+        int N = values.shape[0], K = values.shape[1], nbins = len(bins) - 1
+        double_t val, total, mean, delta, ssqdm, lo, hi, first, last, out
+        ndarray[double_t, ndim=2] result
+
+    hows = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max', 'first',
+            'last']
+    if how not in hows:
+        raise ValueError('Unknown aggregation: %s' % how)
+    code = hows.index(how)
+
+    result = np.empty((max(nbins, 0), K), dtype=np.float64)
+
+    for k from 0 <= k < nbins:
+        start = bins[k]
+        end = bins[k + 1]
+        if start < 0 or end > N or start > end:
+            raise ValueError('Bad bin boundaries: %d, %d' % (start, end))
+
+        for j from 0 <= j < K:
+            nobs = 0
+            total = mean = ssqdm = 0
+            lo = hi = first = last = NaN
+
+            for i from start <= i < end:
+                val = values[i, j]
+
+                # NaN
+                if val != val:
+                    continue
+
+                if nobs == 0:
+                    first = lo = hi = val
+                elif val < lo:
+                    lo = val
+                elif val > hi:
+                    hi = val
+
+                last = val
+                nobs += 1
+                total += val
+
+                # Welford's update of the sum of squared deviations
+                delta = val - mean
+                mean += delta / nobs
+                ssqdm += delta * (val - mean)
+
+            if code == 0:
+                out = nobs
+            elif nobs == 0:
+                out = NaN
+            elif code == 1:
+                out = total
+            elif code == 2:
+                out = total / nobs
+            elif code == 3 or code == 4:
+                if nobs < 2:
+                    out = NaN
+                else:
+                    out = ssqdm / (nobs - 1)
+                    if code == 4:
+                        out = sqrt(out)
+            elif code == 5:
+                out = lo
+            elif code == 6:
+                out = hi
+            elif code == 7:
+                out = first
+            else:
+                out = last
+
+            result[k, j] = out
+
+    return result
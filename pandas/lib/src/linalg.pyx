@@ -0,0 +1,301 @@
+#-------------------------------------------------------------------------------
+# Batched dense linear algebra on stacks of small matrices
+#
+# Moving regressions solve one small K x K system per date. Doing these in a
+# single pass over a contiguous N x K x K array avoids N round trips through
+# numpy.linalg
+
+@cython.cdivision(True)
+cdef inline bint _cholesky(double_t *a, double_t *L, int K, double_t tol):
+    '''
+    Lower triangular Cholesky factor of the symmetric K x K matrix a, written
+    into L. Returns False if some squared pivot is not larger than tol times
+    the corresponding diagonal element, i.e. a is (nearly) singular
+    '''
+    cdef int i, j, k
+    cdef double_t s, d
+
+    for j from 0 <= j < K:
+        s = a[j * K + j]
+        for k from 0 <= k < j:
+            s -= L[j * K + k] * L[j * K + k]
+
+        # also catches NaN
+        if not s > tol * a[j * K + j]:
+            return 0
+
+        d = sqrt(s)
+        L[j * K + j] = d
+
+        for i from j < i < K:
+            s = a[i * K + j]
+            for k from 0 <= k < j:
+                s -= L[i * K + k] * L[j * K + k]
+            L[i * K + j] = s / d
+
+    return 1
+
+@cython.cdivision(True)
+cdef inline void _cho_solve(double_t *L, double_t *x, int K, int M):
+    '''
+    Overwrites the K x M matrix x with the solution of L L' X = x
+    '''
+    cdef int i, j, m
+    cdef double_t s
+
+    for m from 0 <= m < M:
+        for j from 0 <= j < K:
+            s = x[j * M + m]
+            for i from 0 <= i < j:
+                s -= L[j * K + i] * x[i * M + m]
+            x[j * M + m] = s / L[j * K + j]
+
+        for j from K > j >= 0:
+            s = x[j * M + m]
+            for i from j < i < K:
+                s -= L[i * K + j] * x[i * M + m]
+            x[j * M + m] = s / L[j * K + j]
+
+def cholesky_solve_batch(ndarray[double_t, ndim=3] a,
+                         ndarray[double_t, ndim=3] b,
+                         double_t tol=1e-10):
+    '''
+    Solve a[i] x[i] = b[i] for a stack of symmetric positive definite
+    matrices a (N x K x K) and right hand sides b (N x K x M)
+
+    Returns
+    -------
+    (x, posdef) : N x K x M ndarray, boolean ndarray
+        Solutions, and which matrices were positive definite. Solutions for
+        the others are left equal to b
+    '''
+    cdef:
+        int n, N, K, M
+        double_t *a_data, *x_data, *L
+        ndarray[double_t, ndim=3] x
+        ndarray[uint8_t, ndim=1] posdef
+        ndarray factor
+
+    N, K, M = a.shape[0], a.shape[1], b.shape[2]
+
+    if b.shape[0] != N or b.shape[1] != K:
+        raise ValueError('a and b have incompatible shapes')
+
+    a = np.ascontiguousarray(a)
+    x = np.array(b, dtype=np.float64, order='C')
+    posdef = np.zeros(N, dtype=np.uint8)
+    factor = np.zeros((K, K), dtype=np.float64)
+
+    a_data = get_double_ptr(a)
+    x_data = get_double_ptr(x)
+    L = get_double_ptr(factor)
+
+    for n from 0 <= n < N:
+        if _cholesky(a_data + n * K * K, L, K, tol):
+            posdef[n] = 1
+            _cho_solve(L, x_data + n * K * M, K, M)
+
+    return x, posdef.view(np.bool_)
+
+@cython.cdivision(True)
+cdef inline void _cho_inverse(double_t *L, double_t *W, double_t *out, int K):
+    '''
+    Writes (L L')^-1 into the K x K matrix out, using W as scratch space for
+    the inverse of L
+    '''
+    cdef int i, j, k
+    cdef double_t s
+
+    for j from 0 <= j < K:
+        W[j * K + j] = 1. / L[j * K + j]
+        for i from j < i < K:
+            s = 0
+            for k from j <= k < i:
+                s -= L[i * K + k] * W[k * K + j]
+            W[i * K + j] = s / L[i * K + i]
+
+    # (L L')^-1 = W' W
+    for i from 0 <= i < K:
+        for j from 0 <= j <= i:
+            s = 0
+            for k from i <= k < K:
+                s += W[k * K + i] * W[k * K + j]
+            out[i * K + j] = s
+            out[j * K + i] = s
+
+def cholesky_inv_batch(ndarray[double_t, ndim=3] a, double_t tol=1e-10):
+    '''
+    Invert a stack of symmetric positive definite matrices a (N x K x K)
+
+    Returns
+    -------
+    (inv, posdef) : N x K x K ndarray, boolean ndarray
+        Inverses, and which matrices were positive definite. The inverses of
+        the others are left as NaN
+    '''
+    cdef:
+        int n, N, K
+        double_t *a_data, *out_data, *L, *W
+        ndarray[double_t, ndim=3] out
+        ndarray[uint8_t, ndim=1] posdef
+        ndarray factor, scratch
+
+    N, K = a.shape[0], a.shape[1]
+
+    a = np.ascontiguousarray(a)
+    out = np.empty((N, K, K), dtype=np.float64)
+    out.fill(NaN)
+    posdef = np.zeros(N, dtype=np.uint8)
+    factor = np.zeros((K, K), dtype=np.float64)
+    scratch = np.zeros((K, K), dtype=np.float64)
+
+    a_data = get_double_ptr(a)
+    out_data = get_double_ptr(out)
+    L = get_double_ptr(factor)
+    W = get_double_ptr(scratch)
+
+    for n from 0 <= n < N:
+        if _cholesky(a_data + n * K * K, L, K, tol):
+            posdef[n] = 1
+            _cho_inverse(L, W, out_data + n * K * K, K)
+
+    return out, posdef.view(np.bool_)
+
+def newey_west_batch(ndarray[double_t, ndim=2] x,
+                     ndarray[double_t, ndim=2] w,
+                     ndarray[double_t, ndim=2] coefs,
+                     ndarray[int32_t, ndim=1] starts,
+                     ndarray[int32_t, ndim=1] ends,
+                     int max_lags, bint overlap,
+                     ndarray[int32_t, ndim=1] clusters, int nclusters):
+    '''
+    Bartlett weighted sums of the lagged cross products of the moment
+    conditions e_t = x[t] * dot(w[t], coefs[n]) (x is T x K, w is T x P) of
+    each window n, the rows starts[n] up to (not including) ends[n]. With
+    overlap, every lag gets full weight
+
+    If nclusters > 0, the moment conditions of each window are first summed
+    by clusters[t] (in 0, ..., nclusters - 1), and the lags are ignored
+
+    Returns
+    -------
+    N x K x K ndarray, not yet scaled by nobs / (nobs - df)
+    '''
+    cdef:
+        int n, N, T, K, P, t, i, j, p, c, lag, nrows, length, maxlen = 0
+        double_t r, s, weight
+        double_t *x_data, *w_data, *coef, *out, *e, *row, *later, *cross
+        ndarray[double_t, ndim=3] result
+        ndarray scratch, cross_arr, later_arr
+        ndarray[int32_t, ndim=1] stamp, touched
+
+    N = len(coefs)
+    T, K, P = x.shape[0], x.shape[1], w.shape[1]
+
+    if len(w) != T or coefs.shape[1] != P:
+        raise ValueError('x, w and coefs have incompatible shapes')
+
+    x = np.ascontiguousarray(x)
+    w = np.ascontiguousarray(w)
+    coefs = np.ascontiguousarray(coefs)
+    result = np.zeros((N, K, K), dtype=np.float64)
+
+    for n from 0 <= n < N:
+        if starts[n] < 0 or ends[n] > T or starts[n] > ends[n]:
+            raise ValueError('Window %d out of bounds' % n)
+        maxlen = max(maxlen, ends[n] - starts[n])
+
+    if nclusters > 0:
+        if len(clusters) != T:
+            raise ValueError('Need one cluster label per row')
+
+        scratch = np.zeros((nclusters, K), dtype=np.float64)
+        stamp = np.empty(nclusters, dtype=np.int32)
+        stamp.fill(-1)
+        touched = np.empty(nclusters, dtype=np.int32)
+    else:
+        scratch = np.zeros((max(maxlen, 1), K), dtype=np.float64)
+
+    cross_arr = np.zeros((K, K), dtype=np.float64)
+    later_arr = np.zeros(K, dtype=np.float64)
+
+    x_data = get_double_ptr(x)
+    w_data = get_double_ptr(w)
+    e = get_double_ptr(scratch)
+    cross = get_double_ptr(cross_arr)
+    later = get_double_ptr(later_arr)
+
+    for n from 0 <= n < N:
+        coef = get_double_ptr(coefs) + n * P
+        out = get_double_ptr(result) + n * K * K
+        length = ends[n] - starts[n]
+
+        # moment conditions of the window, one row per observation or
+        # cluster
+        nrows = 0
+        for t from starts[n] <= t < ends[n]:
+            if nclusters > 0:
+                c = clusters[t]
+                if c < 0 or c >= nclusters:
+                    raise ValueError('Cluster label out of bounds')
+
+                if stamp[c] != n:
+                    stamp[c] = n
+                    touched[nrows] = c
+                    nrows += 1
+                    for i from 0 <= i < K:
+                        e[c * K + i] = 0
+            else:
+                c = nrows
+                nrows += 1
+                for i from 0 <= i < K:
+                    e[c * K + i] = 0
+
+            # residual
+            r = 0
+            for p from 0 <= p < P:
+                r += w_data[t * P + p] * coef[p]
+
+            row = x_data + t * K
+            for i from 0 <= i < K:
+                e[c * K + i] += row[i] * r
+
+        # with later_t = e_t / 2 + sum of the weighted e_{t + lag}, the
+        # result is C + C' for C = sum of e_t later_t', one outer product
+        # per row whatever the number of lags
+        for i from 0 <= i < K * K:
+            cross[i] = 0
+
+        for t from 0 <= t < nrows:
+            if nclusters > 0:
+                row = e + touched[t] * K
+            else:
+                row = e + t * K
+
+            for j from 0 <= j < K:
+                later[j] = 0.5 * row[j]
+
+            if nclusters == 0:
+                for lag from 1 <= lag <= max_lags:
+                    if t + lag >= length:
+                        break
+
+                    if overlap:
+                        weight = 1
+                    else:
+                        weight = 1 - lag / (max_lags + 1.)
+
+                    for j from 0 <= j < K:
+                        later[j] += weight * e[(t + lag) * K + j]
+
+            for i from 0 <= i < K:
+                s = row[i]
+                for j from 0 <= j < K:
+                    cross[i * K + j] += s * later[j]
+
+        for i from 0 <= i < K:
+            for j from 0 <= j <= i:
+                out[i * K + j] = cross[i * K + j] + cross[j * K + i]
+                out[j * K + i] = out[i * K + j]
+
+    return result
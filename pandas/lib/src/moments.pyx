@@ -186,7 +186,7 @@ def ewma(ndarray[double_t, ndim=1] input, double_t com):
 
     neww = 1. / (1. + com)
     oldw = 1. - neww
-    adj = oldw
+    adj = 1.
 
     output[0] = neww * input[0]
 
@@ -202,13 +202,177 @@ def ewma(ndarray[double_t, ndim=1] input, double_t com):
         else:
             output[i] = prev
 
+    # adj is oldw ** (number of observations so far), so that missing
+    # observations carry the previous value forward exactly
     for i from 0 <= i < N:
         cur = input[i]
-        output[i] = output[i] / (1. - adj)
 
         if cur == cur:
             adj *= oldw
 
+        if adj < 1:
+            output[i] = output[i] / (1. - adj)
+        else:
+            output[i] = NaN
+
+    return output
+
+#-------------------------------------------------------------------------------
+# Exponentially weighted moving covariance / correlation
+#
+# Fused single pass versions of ewma-based variance, covariance and
+# correlation. Each of the EW means of x, y, x*y, x*x and y*y is kept as a
+# weighted sum S and sum of weights W, updated by S = oldw * S + z and
+# W = oldw * W + 1 only when both x and y are observed, so S / W equals the
+# bias-adjusted ewma of the jointly observed data. As in ewma, missing
+# observations neither decay the weights nor change the output.
+
+DEF EWM_COV = 0
+DEF EWM_CORR = 1
+
+@cython.cdivision(True)
+cdef inline double_t _ewm_stat(double_t sx, double_t sy, double_t sxy,
+                               double_t sxx, double_t syy, double_t w,
+                               double_t bias_adj, int stat):
+    cdef double_t mx = sx / w, my = sy / w, vx, vy, denom
+
+    if stat == EWM_COV:
+        return (sxy / w - mx * my) * bias_adj
+
+    vx = sxx / w - mx * mx
+    vy = syy / w - my * my
+    denom = sqrt(vx * vy)
+
+    if denom > 0:
+        return (sxy / w - mx * my) / denom
+    else:
+        return NaN
+
+cdef _ewm_binary(ndarray[double_t, ndim=1] input_x,
+                 ndarray[double_t, ndim=1] input_y,
+                 double_t com, int minp, bint bias, int stat):
+    cdef double_t x, y, oldw, bias_adj
+    cdef double_t sx = 0, sy = 0, sxy = 0, sxx = 0, syy = 0, w = 0
+    cdef int i, first = -1
+    cdef int N = len(input_x)
+
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+
+    if len(input_y) != N:
+        raise ValueError('Input arrays must be the same length')
+
+    oldw = com / (1. + com)
+
+    if bias:
+        bias_adj = 1.
+    else:
+        bias_adj = (1. + 2. * com) / (2. * com)
+
+    for i from 0 <= i < N:
+        x = input_x[i]
+        y = input_y[i]
+
+        if x == x and y == y:
+            if first < 0:
+                first = i
+
+            sx = oldw * sx + x
+            sy = oldw * sy + y
+            sxy = oldw * sxy + x * y
+            sxx = oldw * sxx + x * x
+            syy = oldw * syy + y * y
+            w = oldw * w + 1
+
+        if first < 0 or i < first + minp:
+            output[i] = NaN
+        else:
+            output[i] = _ewm_stat(sx, sy, sxy, sxx, syy, w, bias_adj, stat)
+
+    return output
+
+def ewmcov(ndarray input_x, ndarray input_y, double_t com, int minp,
+           bint bias):
+    '''
+    Single pass exponentially weighted covariance using center-of-mass,
+    or variance when input_x is input_y
+    '''
+    return _ewm_binary(input_x, input_y, com, minp, bias, EWM_COV)
+
+def ewmcorr(ndarray input_x, ndarray input_y, double_t com, int minp):
+    '''
+    Single pass exponentially weighted correlation using center-of-mass
+    '''
+    return _ewm_binary(input_x, input_y, com, minp, 1, EWM_CORR)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def ewmcov_matrix(ndarray[double_t, ndim=2] values, double_t com, int minp,
+                  bint bias, bint corr):
+    '''
+    EW covariance (or correlation) matrix of the columns of values at each
+    row, each pair using the observations where both columns are present
+
+    Returns
+    -------
+    y : ndarray (N x K x K)
+    '''
+    cdef double_t x, y, oldw, bias_adj, val
+    cdef int i, a, b, stat
+    cdef int N = values.shape[0], K = values.shape[1]
+
+    cdef ndarray[double_t, ndim=3] output = np.empty((N, K, K), dtype=float)
+
+    # pairwise state, only the upper triangle is used
+    cdef ndarray[double_t, ndim=2] sx = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sy = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sxy = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sxx = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] syy = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] w = np.zeros((K, K), dtype=float)
+    cdef ndarray[int32_t, ndim=2] first = np.empty((K, K), dtype=np.int32)
+
+    first.fill(-1)
+
+    oldw = com / (1. + com)
+
+    if bias or corr:
+        bias_adj = 1.
+    else:
+        bias_adj = (1. + 2. * com) / (2. * com)
+
+    if corr:
+        stat = EWM_CORR
+    else:
+        stat = EWM_COV
+
+    for i from 0 <= i < N:
+        for a from 0 <= a < K:
+            x = values[i, a]
+
+            for b from a <= b < K:
+                y = values[i, b]
+
+                if x == x and y == y:
+                    if first[a, b] < 0:
+                        first[a, b] = i
+
+                    sx[a, b] = oldw * sx[a, b] + x
+                    sy[a, b] = oldw * sy[a, b] + y
+                    sxy[a, b] = oldw * sxy[a, b] + x * y
+                    sxx[a, b] = oldw * sxx[a, b] + x * x
+                    syy[a, b] = oldw * syy[a, b] + y * y
+                    w[a, b] = oldw * w[a, b] + 1
+
+                if first[a, b] < 0 or i < first[a, b] + minp:
+                    val = NaN
+                else:
+                    val = _ewm_stat(sx[a, b], sy[a, b], sxy[a, b],
+                                    sxx[a, b], syy[a, b], w[a, b],
+                                    bias_adj, stat)
+
+                output[i, a, b] = val
+                output[i, b, a] = val
+
     return output
 
 #-------------------------------------------------------------------------------
@@ -258,6 +422,89 @@ def roll_var(ndarray[double_t, ndim=1] input,
 
     return output
 
+#-------------------------------------------------------------------------------
+# Rolling covariance / correlation matrix
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def roll_cov_matrix(ndarray[double_t, ndim=2] values, int win, int minp,
+                    bint corr):
+    '''
+    Unbiased moving covariance (or correlation) matrix of the columns of
+    values at each row, each pair using the observations in the window where
+    both columns are present. Running cross-product sums are updated as rows
+    enter and leave the window, O(N * K^2) overall
+
+    Returns
+    -------
+    y : ndarray (N x K x K)
+    '''
+    cdef double_t x, y, nobs, cov, denom, val
+    cdef int i, a, b
+    cdef int N = values.shape[0], K = values.shape[1]
+
+    cdef ndarray[double_t, ndim=3] output = np.empty((N, K, K), dtype=float)
+
+    # pairwise state, only the upper triangle is used
+    cdef ndarray[double_t, ndim=2] n = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sx = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sy = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sxy = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] sxx = np.zeros((K, K), dtype=float)
+    cdef ndarray[double_t, ndim=2] syy = np.zeros((K, K), dtype=float)
+
+    if minp < 2:
+        minp = 2
+
+    for i from 0 <= i < N:
+        for a from 0 <= a < K:
+            for b from a <= b < K:
+                x = values[i, a]
+                y = values[i, b]
+
+                if x == x and y == y:
+                    n[a, b] += 1
+                    sx[a, b] += x
+                    sy[a, b] += y
+                    sxy[a, b] += x * y
+                    sxx[a, b] += x * x
+                    syy[a, b] += y * y
+
+                if i > win - 1:
+                    x = values[i - win, a]
+                    y = values[i - win, b]
+
+                    if x == x and y == y:
+                        n[a, b] -= 1
+                        sx[a, b] -= x
+                        sy[a, b] -= y
+                        sxy[a, b] -= x * y
+                        sxx[a, b] -= x * x
+                        syy[a, b] -= y * y
+
+                nobs = n[a, b]
+
+                if nobs < minp:
+                    val = NaN
+                else:
+                    cov = sxy[a, b] - sx[a, b] * sy[a, b] / nobs
+
+                    if corr:
+                        denom = sqrt((sxx[a, b] - sx[a, b] * sx[a, b] / nobs) *
+                                     (syy[a, b] - sy[a, b] * sy[a, b] / nobs))
+                        if denom > 0:
+                            val = cov / denom
+                        else:
+                            val = NaN
+                    else:
+                        val = cov / (nobs - 1)
+
+                output[i, a, b] = val
+                output[i, b, a] = val
+
+    return output
+
 #-------------------------------------------------------------------------------
 # Rolling skewness
 
@@ -395,9 +642,13 @@ def roll_kurt(ndarray[double_t, ndim=1] input,
 #-------------------------------------------------------------------------------
 # Rolling median, min, max
 
-ctypedef double_t (* skiplist_f)(object sl, int n, int p)
+# op gets the skip list of the window, the number of observations in it,
+# min_periods, the current value, and an extra statistic-specific parameter
+ctypedef double_t (* skiplist_f)(object sl, int n, int p, double_t val,
+                                 double_t param)
 
-cdef _roll_skiplist_op(ndarray arg, int win, int minp, skiplist_f op):
+cdef _roll_skiplist_op(ndarray arg, int win, int minp, skiplist_f op,
+                       double_t param=0):
     cdef ndarray[double_t, ndim=1] input = arg
     cdef double val, prev, midpoint
     cdef IndexableSkiplist skiplist
@@ -435,7 +686,7 @@ cdef _roll_skiplist_op(ndarray arg, int win, int minp, skiplist_f op):
             nobs += 1
             skiplist.insert(val)
 
-        output[i] = op(skiplist, nobs, minp)
+        output[i] = op(skiplist, nobs, minp, input[i], param)
 
     return output
 
@@ -445,22 +696,87 @@ def roll_median(ndarray input, int win, int minp):
     '''
     return _roll_skiplist_op(input, win, minp, _get_median)
 
-def roll_max(ndarray input, int win, int minp):
+def roll_max_skiplist(ndarray input, int win, int minp):
     '''
     O(N log(window)) implementation using skip list
     '''
     return _roll_skiplist_op(input, win, minp, _get_max)
 
-def roll_min(ndarray input, int win, int minp):
+def roll_min_skiplist(ndarray input, int win, int minp):
     '''
     O(N log(window)) implementation using skip list
     '''
     return _roll_skiplist_op(input, win, minp, _get_min)
 
+def roll_max(ndarray input, int win, int minp):
+    '''
+    O(N) implementation using monotonic deque (ascending maxima)
+    '''
+    return _roll_max_min(input, win, minp, 1)
+
+def roll_min(ndarray input, int win, int minp):
+    '''
+    O(N) implementation using monotonic deque (ascending minima)
+    '''
+    return _roll_max_min(input, win, minp, 0)
+
+cdef _roll_max_min(ndarray arg, int win, int minp, bint is_max):
+    '''
+    Keep the positions of the candidate extrema in a deque whose values are
+    monotonic; each observation is pushed and popped at most once, so the
+    cost is amortized O(1) per element regardless of the window size. NaNs
+    are never pushed and only count against min_periods.
+    '''
+    cdef ndarray[double_t, ndim=1] input = arg
+    cdef double val, prev
+    cdef int nobs = 0, i, head = 0, tail = 0
+
+    cdef int N = len(input)
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+
+    # positions only ever increase, so a flat buffer works as the deque
+    cdef ndarray[int32_t, ndim=1] deque = np.empty(N, dtype=np.int32)
+
+    if minp > N:
+        minp = N + 1
+
+    for i from 0 <= i < N:
+        val = input[i]
+
+        if i > win - 1:
+            prev = input[i - win]
+            if prev == prev:
+                nobs -= 1
+
+            # expire the front of the window
+            while head < tail and deque[head] <= i - win:
+                head += 1
+
+        if val == val:
+            nobs += 1
+
+            if is_max:
+                while head < tail and input[deque[tail - 1]] <= val:
+                    tail -= 1
+            else:
+                while head < tail and input[deque[tail - 1]] >= val:
+                    tail -= 1
+
+            deque[tail] = i
+            tail += 1
+
+        if nobs >= minp and i >= minp - 1 and head < tail:
+            output[i] = input[deque[head]]
+        else:
+            output[i] = NaN
+
+    return output
+
 # Unfortunately had to resort to some hackery here, would like for
 # Cython to be able to get this right.
 
-cdef double_t _get_median(object sl, int nobs, int minp):
+cdef double_t _get_median(object sl, int nobs, int minp, double_t val,
+                          double_t param):
     cdef int midpoint
     cdef IndexableSkiplist skiplist = <IndexableSkiplist> sl
     if nobs >= minp:
@@ -473,14 +789,439 @@ cdef double_t _get_median(object sl, int nobs, int minp):
     else:
         return NaN
 
-cdef double_t _get_max(object skiplist, int nobs, int minp):
+cdef double_t _get_max(object skiplist, int nobs, int minp, double_t val,
+                       double_t param):
     if nobs >= minp:
         return <IndexableSkiplist> skiplist.get(nobs - 1)
     else:
         return NaN
 
-cdef double_t _get_min(object skiplist, int nobs, int minp):
+cdef double_t _get_min(object skiplist, int nobs, int minp, double_t val,
+                       double_t param):
     if nobs >= minp:
         return <IndexableSkiplist> skiplist.get(0)
     else:
         return NaN
+
+cdef double_t _get_quantile(object sl, int nobs, int minp, double_t val,
+                            double_t quantile):
+    # linear interpolation between order statistics, as scoreatpercentile
+    cdef int lo
+    cdef double_t idx, frac, lo_val
+    cdef IndexableSkiplist skiplist = <IndexableSkiplist> sl
+
+    if nobs >= minp and nobs > 0:
+        idx = quantile * (nobs - 1)
+        lo = <int> idx
+        frac = idx - lo
+        lo_val = skiplist.get(lo)
+
+        if frac == 0:
+            return lo_val
+        else:
+            return lo_val + (<double_t> skiplist.get(lo + 1) - lo_val) * frac
+    else:
+        return NaN
+
+DEF RANK_STRICT = 0
+DEF RANK_WEAK = 1
+DEF RANK_MEAN = 2
+DEF RANK_RANK = 3
+
+cdef double_t _get_rank(object sl, int nobs, int minp, double_t val,
+                        double_t kind):
+    # percentile rank (0-100) of the current value within its window, with
+    # the same interpretations as scipy.stats.percentileofscore
+    cdef int less, less_equal
+    cdef IndexableSkiplist skiplist = <IndexableSkiplist> sl
+
+    if nobs < minp or nobs == 0 or val != val:
+        return NaN
+
+    less = skiplist.count_less(val)
+    less_equal = skiplist.count_less_equal(val)
+
+    if kind == RANK_STRICT:
+        return 100. * less / nobs
+    elif kind == RANK_WEAK:
+        return 100. * less_equal / nobs
+    elif kind == RANK_MEAN:
+        return 50. * (less + less_equal) / nobs
+    else:
+        # average of the 1-based ranks of the matching values
+        return 50. * (less + less_equal + 1) / nobs
+
+def roll_quantile(ndarray input, int win, int minp, double_t quantile):
+    '''
+    O(N log(window)) implementation using skip list
+    '''
+    return _roll_skiplist_op(input, win, minp, _get_quantile, quantile)
+
+def roll_rank(ndarray input, int win, int minp, int kind):
+    '''
+    O(N log(window)) implementation using skip list. kind is 0 (strict),
+    1 (weak), 2 (mean) or 3 (rank)
+    '''
+    return _roll_skiplist_op(input, win, minp, _get_rank, kind)
+
+#-------------------------------------------------------------------------------
+# Rolling window applying arbitrary function
+
+def roll_generic(ndarray[double_t, ndim=1] input, int win, int minp,
+                 object func):
+    '''
+    Apply func to each window of input. The windows handed to func are
+    ndarray views into input (no copies), and may contain NaN
+    '''
+    cdef ndarray[double_t, ndim=1] output, counts
+    cdef int i, N = len(input)
+
+    output = np.empty(N, dtype=float)
+
+    if minp > N:
+        minp = N + 1
+
+    # number of non-NaN observations in each window
+    counts = roll_sum((input == input).astype(float), win, 1)
+
+    for i from 0 <= i < N:
+        if counts[i] >= minp:
+            output[i] = func(input[int_max(i - win + 1, 0) : i + 1])
+        else:
+            output[i] = NaN
+
+    return output
+
+#-------------------------------------------------------------------------------
+# Rolling moments over variable-length (e.g. time-based) windows
+#
+# start[i] is the position of the first observation in the window ending at
+# observation i, as computed by window_starts. Observations are added as the
+# window end moves forward and removed as the window start catches up, so
+# each kernel is a single pass no matter how the window length varies
+
+def window_starts(ndarray[int64_t, ndim=1] stamps,
+                  ndarray[int64_t, ndim=1] edges):
+    '''
+    For each i, position of the first stamp strictly greater than edges[i],
+    i.e. the window (edges[i], stamps[i]]. stamps must be sorted; edges are
+    expected to be (nearly) sorted, in which case this is a two-pointer scan
+    '''
+    cdef int i, j = 0, N = len(stamps)
+    cdef ndarray[int32_t, ndim=1] start = np.empty(N, dtype=np.int32)
+
+    for i from 0 <= i < N:
+        while j > 0 and stamps[j - 1] > edges[i]:
+            j -= 1
+        while j <= i and stamps[j] <= edges[i]:
+            j += 1
+
+        start[i] = j
+
+    return start
+
+DEF STAT_SUM = 0
+DEF STAT_MEAN = 1
+DEF STAT_VAR = 2
+DEF STAT_SKEW = 3
+DEF STAT_KURT = 4
+
+@cython.cdivision(True)
+cdef _roll_moment_variable(ndarray arg, ndarray start_arr, int minp,
+                           int stat):
+    cdef ndarray[double_t, ndim=1] input = arg
+    cdef ndarray[int32_t, ndim=1] start = start_arr
+    cdef double val, x = 0, xx = 0, xxx = 0, xxxx = 0
+    cdef double A, B, C, D, R, K
+    cdef int nobs = 0, i, j = 0
+    cdef int N = len(input)
+
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+
+    for i from 0 <= i < N:
+        val = input[i]
+
+        if val == val:
+            nobs += 1
+            x += val
+            xx += val * val
+            xxx += val * val * val
+            xxxx += val * val * val * val
+
+        while j < start[i]:
+            val = input[j]
+
+            if val == val:
+                nobs -= 1
+                x -= val
+                xx -= val * val
+                xxx -= val * val * val
+                xxxx -= val * val * val * val
+
+            j += 1
+
+        if nobs < minp or nobs == 0:
+            output[i] = NaN
+        elif stat == STAT_SUM:
+            output[i] = x
+        elif stat == STAT_MEAN:
+            output[i] = x / nobs
+        elif stat == STAT_VAR:
+            if nobs < 2:
+                output[i] = NaN
+            else:
+                output[i] = (nobs * xx - x * x) / (nobs * nobs - nobs)
+        elif stat == STAT_SKEW:
+            if nobs < 3:
+                output[i] = NaN
+            else:
+                A = x / nobs
+                B = xx / nobs - A * A
+                C = xxx / nobs - A * A * A - 3 * A * B
+
+                R = sqrt(B)
+
+                output[i] = ((sqrt(nobs * (nobs - 1.)) * C) /
+                             ((nobs-2) * R * R * R))
+        elif stat == STAT_KURT:
+            if nobs < 4:
+                output[i] = NaN
+            else:
+                A = x / nobs
+                R = A * A
+                B = xx / nobs - R
+                R = R * A
+                C = xxx / nobs - R - 3 * A * B
+                R = R * A
+                D = xxxx / nobs - R - 6*B*A*A - 4*C*A
+
+                K = (nobs * nobs - 1.)*D/(B*B) - 3*((nobs-1.)**2)
+                K = K / ((nobs - 2.)*(nobs-3.))
+
+                output[i] = K
+
+    return output
+
+def roll_sum_variable(ndarray input, ndarray start, int minp):
+    return _roll_moment_variable(input, start, minp, STAT_SUM)
+
+def roll_mean_variable(ndarray input, ndarray start, int minp):
+    return _roll_moment_variable(input, start, minp, STAT_MEAN)
+
+def roll_var_variable(ndarray input, ndarray start, int minp):
+    return _roll_moment_variable(input, start, minp, STAT_VAR)
+
+def roll_skew_variable(ndarray input, ndarray start, int minp):
+    return _roll_moment_variable(input, start, minp, STAT_SKEW)
+
+def roll_kurt_variable(ndarray input, ndarray start, int minp):
+    return _roll_moment_variable(input, start, minp, STAT_KURT)
+
+def roll_max_variable(ndarray input, ndarray start, int minp):
+    return _roll_max_min_variable(input, start, minp, 1)
+
+def roll_min_variable(ndarray input, ndarray start, int minp):
+    return _roll_max_min_variable(input, start, minp, 0)
+
+cdef _roll_max_min_variable(ndarray arg, ndarray start_arr, int minp,
+                            bint is_max):
+    '''
+    Monotonic deque as in _roll_max_min, expiring positions before start[i]
+    '''
+    cdef ndarray[double_t, ndim=1] input = arg
+    cdef ndarray[int32_t, ndim=1] start = start_arr
+    cdef double val
+    cdef int nobs = 0, i, j = 0, head = 0, tail = 0
+
+    cdef int N = len(input)
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+    cdef ndarray[int32_t, ndim=1] deque = np.empty(N, dtype=np.int32)
+
+    for i from 0 <= i < N:
+        val = input[i]
+
+        if val == val:
+            nobs += 1
+
+            if is_max:
+                while head < tail and input[deque[tail - 1]] <= val:
+                    tail -= 1
+            else:
+                while head < tail and input[deque[tail - 1]] >= val:
+                    tail -= 1
+
+            deque[tail] = i
+            tail += 1
+
+        while j < start[i]:
+            if input[j] == input[j]:
+                nobs -= 1
+            j += 1
+
+        while head < tail and deque[head] < start[i]:
+            head += 1
+
+        if nobs >= minp and head < tail:
+            output[i] = input[deque[head]]
+        else:
+            output[i] = NaN
+
+    return output
+
+def roll_median_variable(ndarray input, ndarray start, int minp):
+    return _roll_skiplist_op_variable(input, start, minp, _get_median, 0)
+
+def roll_quantile_variable(ndarray input, ndarray start, int minp,
+                           double_t quantile):
+    return _roll_skiplist_op_variable(input, start, minp, _get_quantile,
+                                      quantile)
+
+def roll_rank_variable(ndarray input, ndarray start, int minp, int kind):
+    return _roll_skiplist_op_variable(input, start, minp, _get_rank, kind)
+
+cdef _roll_skiplist_op_variable(ndarray arg, ndarray start_arr, int minp,
+                                skiplist_f op, double_t param):
+    cdef ndarray[double_t, ndim=1] input = arg
+    cdef ndarray[int32_t, ndim=1] start = start_arr
+    cdef double val
+    cdef IndexableSkiplist skiplist
+    cdef int nobs = 0, i, j = 0
+
+    cdef int N = len(input)
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+
+    if N == 0:
+        return output
+
+    # size the skip list for the longest window
+    skiplist = IndexableSkiplist((np.arange(1, N + 1) - start).max())
+
+    for i from 0 <= i < N:
+        val = input[i]
+
+        if val == val:
+            nobs += 1
+            skiplist.insert(val)
+
+        while j < start[i]:
+            val = input[j]
+
+            if val == val:
+                skiplist.remove(val)
+                nobs -= 1
+
+            j += 1
+
+        if nobs > 0:
+            output[i] = op(skiplist, nobs, minp, input[i], param)
+        else:
+            output[i] = NaN
+
+    return output
+
+def roll_generic_variable(ndarray[double_t, ndim=1] input,
+                          ndarray[int32_t, ndim=1] start, int minp,
+                          object func):
+    '''
+    Like roll_generic, func gets the ndarray view input[start[i] : i + 1]
+    '''
+    cdef ndarray[double_t, ndim=1] output, counts
+    cdef int i, N = len(input)
+
+    output = np.empty(N, dtype=float)
+    counts = roll_sum_variable((input == input).astype(float), start, 0)
+
+    for i from 0 <= i < N:
+        if counts[i] >= minp and counts[i] > 0:
+            output[i] = func(input[start[i] : i + 1])
+        else:
+            output[i] = NaN
+
+    return output
+
+#-------------------------------------------------------------------------------
+# Expanding median
+#
+# Running median with two heaps: a max-heap holding the lower half of the
+# observations (stored negated in a min-heap) and a min-heap holding the upper
+# half, so each update is O(log N) and no sorted copy of the data is kept
+
+cdef inline void _heap_push(double_t *heap, int n, double_t val):
+    # min-heap holding n elements before the push
+    cdef int i = n, parent
+
+    while i > 0:
+        parent = (i - 1) / 2
+        if heap[parent] <= val:
+            break
+        heap[i] = heap[parent]
+        i = parent
+
+    heap[i] = val
+
+cdef inline double_t _heap_pop(double_t *heap, int n):
+    # min-heap holding n > 0 elements before the pop
+    cdef double_t top = heap[0], last = heap[n - 1]
+    cdef int i = 0, child
+
+    n -= 1
+    while 1:
+        child = 2 * i + 1
+        if child >= n:
+            break
+        if child + 1 < n and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[child] >= last:
+            break
+        heap[i] = heap[child]
+        i = child
+
+    heap[i] = last
+    return top
+
+def expanding_median(ndarray[double_t, ndim=1] input, int minp):
+    '''
+    O(N log N) expanding median using two heaps
+    '''
+    cdef double_t val
+    cdef int i, nlow = 0, nhigh = 0, nobs
+    cdef int N = len(input)
+
+    cdef ndarray[double_t, ndim=1] output = np.empty(N, dtype=float)
+    cdef ndarray low_arr = np.empty(N, dtype=float)
+    cdef ndarray high_arr = np.empty(N, dtype=float)
+    cdef double_t *low = <double_t *> low_arr.data
+    cdef double_t *high = <double_t *> high_arr.data
+
+    for i from 0 <= i < N:
+        val = input[i]
+
+        if val == val:
+            if nlow == 0 or val <= -low[0]:
+                _heap_push(low, nlow, -val)
+                nlow += 1
+            else:
+                _heap_push(high, nhigh, val)
+                nhigh += 1
+
+            # keep nhigh <= nlow <= nhigh + 1
+            if nlow > nhigh + 1:
+                _heap_push(high, nhigh, -_heap_pop(low, nlow))
+                nlow -= 1
+                nhigh += 1
+            elif nhigh > nlow:
+                _heap_push(low, nlow, -_heap_pop(high, nhigh))
+                nhigh -= 1
+                nlow += 1
+
+        nobs = nlow + nhigh
+
+        if nobs >= minp and nobs > 0:
+            if nobs % 2:
+                output[i] = -low[0]
+            else:
+                output[i] = (high[0] - low[0]) / 2
+        else:
+            output[i] = NaN
+
+    return output
@@ -77,6 +77,36 @@ cdef class IndexableSkiplist:
 
         return node.value
 
+    cpdef int count_less(self, double value):
+        '''
+        Number of elements strictly less than value
+        '''
+        return self._count_below(value, 0)
+
+    cpdef int count_less_equal(self, double value):
+        '''
+        Number of elements less than or equal to value
+        '''
+        return self._count_below(value, 1)
+
+    cdef int _count_below(self, double value, bint inclusive):
+        cdef int level, rank = 0
+        cdef Node node, next_at_level
+
+        # same descent as get, summing the widths of the links skipped
+        node = self.head
+
+        for level in range(self.maxlevels - 1, -1, -1):
+            next_at_level = node.next[level]
+
+            while (next_at_level.value < value or
+                   (inclusive and next_at_level.value == value)):
+                rank += node.width[level]
+                node = next_at_level
+                next_at_level = node.next[level]
+
+        return rank
+
     cpdef insert(self, double value):
         cdef int level, steps, d
         cdef Node node, prevnode, newnode, next_at_level, tmp
@@ -6,3 +6,5 @@ include "moments.pyx"
 include "reindex.pyx"
 include "operators.pyx"
 include "io.pyx"
+include "dates.pyx"
+include "linalg.pyx"
@@ -1,3 +1,4 @@
+from datetime import datetime
 import unittest
 
 import numpy as np
@@ -97,5 +98,184 @@ class TestTseriesUtil(unittest.TestCase):
         self.assert_(np.array_equal(filler, expect_filler))
         self.assert_(np.array_equal(mask, expect_mask))
 
+    def test_dates_to_micros(self):
+        dates = [datetime(1950, 1, 1), datetime(1969, 12, 31, 23, 59, 59),
+                 datetime(1970, 1, 1), datetime(2000, 2, 29, 12, 30, 1, 5),
+                 datetime(2011, 3, 1)]
+        epoch = datetime(1970, 1, 1)
+
+        def _micros(d):
+            delta = d - epoch
+            return ((delta.days * 86400 + delta.seconds) * 1000000
+                    + delta.microseconds)
+
+        result = tseries.dates_to_micros(np.array(dates, dtype=object))
+        self.assert_(np.array_equal(result, [_micros(d) for d in dates]))
+
+    def test_micros_to_dates(self):
+        dates = [datetime(1, 1, 1), datetime(1950, 1, 1),
+                 datetime(1969, 12, 31, 23, 59, 59, 999999),
+                 datetime(1970, 1, 1), datetime(2000, 2, 29, 12, 30, 1, 5),
+                 datetime(9999, 12, 31)]
+
+        micros = tseries.dates_to_micros(np.array(dates, dtype=object))
+        result = tseries.micros_to_dates(micros)
+        self.assert_(np.array_equal(result, dates))
+
+    def test_month_end_days(self):
+        # Jan 2000 - Dec 2001
+        months = np.arange(2000 * 12, 2002 * 12, dtype=np.int64)
+        epoch = datetime(1970, 1, 1).toordinal()
+
+        result = tseries.month_end_days(months)
+        expected = [datetime(2000 + (m + 1) // 12, (m + 1) % 12 + 1, 1)
+                    .toordinal() - epoch - 1 for m in xrange(24)]
+        self.assert_(np.array_equal(result, expected))
+
+        result = tseries.month_end_days(months, business=True)
+        self.assertEqual(result[3], datetime(2000, 4, 28).toordinal() - epoch)
+        self.assertEqual(result[5], datetime(2000, 6, 30).toordinal() - epoch)
+        self.assertEqual(result[11],
+                         datetime(2000, 12, 29).toordinal() - epoch)
+
+    def test_window_starts(self):
+        stamps = np.array([0, 1, 2, 5, 6, 10, 20], dtype=np.int64)
+        result = tseries.window_starts(stamps, stamps - 3)
+        self.assert_(np.array_equal(result, [0, 0, 0, 3, 3, 5, 6]))
+
+    def test_cholesky_batch(self):
+        x = np.random.randn(4, 20, 3)
+        a = np.array([np.dot(m.T, m) for m in x])
+
+        # collinear columns
+        a[2] = np.dot(x[2][:, [0, 1, 1]].T, x[2][:, [0, 1, 1]])
+        b = np.random.randn(4, 3, 2)
+
+        result, posdef = tseries.cholesky_solve_batch(a, b)
+        self.assert_(np.array_equal(posdef, [True, True, False, True]))
+        for i in [0, 1, 3]:
+            common.assert_almost_equal(result[i], np.linalg.solve(a[i], b[i]))
+
+        result, posdef = tseries.cholesky_inv_batch(a)
+        self.assert_(np.array_equal(posdef, [True, True, False, True]))
+        self.assert_(np.isnan(result[2]).all())
+        for i in [0, 1, 3]:
+            common.assert_almost_equal(result[i], np.linalg.inv(a[i]))
+
+    def test_newey_west_batch(self):
+        x = np.random.randn(30, 3)
+        w = np.random.randn(30, 4)
+        coefs = np.random.randn(5, 4)
+        starts = np.array([0, 0, 5, 10, 28], dtype=np.int32)
+        ends = np.array([30, 10, 15, 12, 30], dtype=np.int32)
+        empty = np.empty(0, dtype=np.int32)
+
+        def moments(i):
+            rows = slice(starts[i], ends[i])
+            return x[rows] * np.dot(w[rows], coefs[i])[:, None]
+
+        for overlap in [False, True]:
+            result = tseries.newey_west_batch(x, w, coefs, starts, ends, 3,
+                                              overlap, empty, 0)
+            for i in range(5):
+                window = moments(i)
+                expected = np.dot(window.T, window)
+                for lag in range(1, 4):
+                    weight = 1 if overlap else 1 - lag / 4.
+                    auto_cov = np.dot(window[:-lag].T, window[lag:])
+                    expected += weight * (auto_cov + auto_cov.T)
+                common.assert_almost_equal(result[i], expected)
+
+        clusters = np.random.randint(0, 4, 30).astype(np.int32)
+        result = tseries.newey_west_batch(x, w, coefs, starts, ends, 3, False,
+                                          clusters, 4)
+        for i in range(5):
+            sums = np.zeros((4, 3))
+            for label, row in zip(clusters[starts[i]:ends[i]], moments(i)):
+                sums[label] += row
+            common.assert_almost_equal(result[i], np.dot(sums.T, sums))
+
+        self.assertRaises(ValueError, tseries.newey_west_batch, x, w, coefs,
+                          starts, ends + 1, 3, False, empty, 0)
+
+    def test_factorize(self):
+        values = np.array(['b', 'a', 'c', 'b', 'a'], dtype=object)
+
+        labels, levels = tseries.factorize(values)
+        self.assert_(np.array_equal(labels, [0, 1, 2, 0, 1]))
+        self.assert_(np.array_equal(levels, ['b', 'a', 'c']))
+
+        labels, levels = tseries.factorize(values, sort=True)
+        self.assert_(np.array_equal(labels, [1, 0, 2, 1, 0]))
+        self.assert_(np.array_equal(levels, ['a', 'b', 'c']))
+
+        labels, levels = tseries.factorize(np.array([], dtype=object))
+        self.assertEqual(len(labels), 0)
+        self.assertEqual(len(levels), 0)
+
+    def test_labeled_reductions(self):
+        values = np.array([1., 5., np.NaN, 2., 4., 3.])
+        labels = np.array([0, 0, 1, 1, 3, 3], dtype=np.int32)
+
+        result = tseries.labeled_sum(values, labels, 4)
+        common.assert_almost_equal(result, [6., np.NaN, 0., 7.])
+
+        result = tseries.labeled_max(values, labels, 4)
+        common.assert_almost_equal(result, [5., np.NaN, np.NaN, 4.])
+
+        result = tseries.labeled_min(values, labels, 4)
+        common.assert_almost_equal(result, [1., np.NaN, np.NaN, 3.])
+
+        self.assertRaises(ValueError, tseries.labeled_sum, values, labels, 3)
+
+    def test_lexsort_indexer(self):
+        first = np.random.randint(0, 10, 1000).astype(np.int32)
+        second = np.random.randint(0, 20, 1000).astype(np.int32)
+
+        result = tseries.lexsort_indexer(first, second, 10, 20)
+        expected = np.lexsort((second, first))
+        self.assert_(np.array_equal(result, expected))
+
+        self.assert_(not tseries.is_lexsorted(first, second))
+        self.assert_(tseries.is_lexsorted(first.take(result),
+                                          second.take(result)))
+
+        indexer, counts = tseries.groupsort_indexer(first, 12)
+        self.assert_(np.array_equal(indexer, first.argsort(kind='mergesort')))
+        binned = np.bincount(first)
+        expected = np.zeros(12, dtype=int)
+        expected[:len(binned)] = binned
+        self.assert_(np.array_equal(counts, expected))
+
+        self.assertRaises(ValueError, tseries.groupsort_indexer, first, 5)
+
+    def test_bin_reduce(self):
+        values = np.array([[1., 2.],
+                           [np.NaN, 4.],
+                           [3., 6.],
+                           [5., 1.],
+                           [np.NaN, np.NaN]])
+        bins = np.array([0, 3, 3, 5], dtype=np.int32)
+
+        def _check(how, expected):
+            result = tseries.bin_reduce(values, bins, how)
+            common.assert_almost_equal(result, expected)
+
+        _check('count', [[2, 3], [0, 0], [1, 1]])
+        _check('sum', [[4, 12], [np.NaN, np.NaN], [5, 1]])
+        _check('mean', [[2, 4], [np.NaN, np.NaN], [5, 1]])
+        _check('var', [[2, 4], [np.NaN, np.NaN], [np.NaN, np.NaN]])
+        _check('std', [[np.sqrt(2), 2], [np.NaN, np.NaN],
+                       [np.NaN, np.NaN]])
+        _check('min', [[1, 2], [np.NaN, np.NaN], [5, 1]])
+        _check('max', [[3, 6], [np.NaN, np.NaN], [5, 1]])
+        _check('first', [[1, 2], [np.NaN, np.NaN], [5, 1]])
+        _check('last', [[3, 6], [np.NaN, np.NaN], [5, 1]])
+
+        self.assertRaises(ValueError, tseries.bin_reduce, values, bins,
+                          'foo')
+        self.assertRaises(ValueError, tseries.bin_reduce, values,
+                          np.array([0, 6], dtype=np.int32), 'sum')
+
 class TestMoments(unittest.TestCase):
     pass
@@ -5,5 +5,6 @@ Common namespace of statistical functions
 # pylint: disable-msg=W0611,W0614,W0401
 
 from pandas.stats.moments import *
+from pandas.stats.streaming import EWMState, RollingState
 from pandas.stats.interface import ols
 from pandas.stats.fama_macbeth import fama_macbeth
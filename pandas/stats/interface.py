@@ -1,16 +1,20 @@
-from pandas.core.api import Series
+from pandas.core.api import DataFrame, Series
 
-from pandas.stats.ols import OLS, MovingOLS
+from pandas.stats.ols import OLS, MovingOLS, MultiOLS
 from pandas.stats.plm import PanelOLS, MovingPanelOLS, NonPooledPanelOLS
 import pandas.stats.common as common
 
+_multi_ols_fields = ('y', 'x', 'intercept', 'window_type', 'window',
+                     'min_periods')
+
 def ols(**kwargs):
     """Returns the appropriate OLS object depending on whether you need
     simple or panel OLS, and a full-sample or rolling/expanding OLS.
 
     Parameters
     ----------
-    y: Series for simple OLS.  DataFrame for panel OLS.
+    y: Series for simple OLS.  DataFrame for panel OLS, or for regressing
+       each of its columns on the same x if x is a Series or DataFrame.
     x: Series, DataFrame, or dict of Series for simple OLS.
        Dict of DataFrame for panel OLS.
     intercept: bool
@@ -28,6 +32,9 @@ def ols(**kwargs):
     Panel OLS options:
         pool: bool
             Whether to run pooled panel regression.  Defaults to true.
+        n_jobs: int
+            For non-pooled regressions, number of processes to spread the
+            per-entity regressions over.  Defaults to 1.
         weights: DataFrame
             Weight for each observation.  The weights are not normalized;
             they're multiplied directly by each observation.
@@ -72,6 +79,10 @@ def ols(**kwargs):
 
     # Run expanding panel OLS with window 10 and entity clustering.
     result = ols(y=y, x=x, cluster='entity', window_type='expanding', window=10)
+
+    # Regress every column of a DataMatrix of returns on the same factors
+    result = ols(y=returns, x=factors, window_type='rolling', window=250)
+    print result.beta['AAPL']
     """
     pool = kwargs.get('pool')
     if 'pool' in kwargs:
@@ -89,6 +100,30 @@ def ols(**kwargs):
         window_type = common._get_window_type(window_type)
 
     y = kwargs.get('y')
+    x = kwargs.get('x')
+
+    if isinstance(y, DataFrame) and isinstance(x, (Series, DataFrame)):
+        if window_type == common.FULL_SAMPLE:
+            for rolling_field in ('window', 'min_periods'):
+                if rolling_field in kwargs:
+                    del kwargs[rolling_field]
+
+        for field, value in kwargs.items():
+            if field in _multi_ols_fields:
+                continue
+
+            # options left at their defaults are harmless
+            if value is not None and value is not False:
+                raise Exception('%s is not supported when regressing the '
+                                'columns of a DataFrame on a common x'
+                                % field)
+
+            del kwargs[field]
+
+        kwargs['window_type'] = window_type
+
+        return MultiOLS(**kwargs)
+
     if window_type == common.FULL_SAMPLE:
         for rolling_field in ('window_type', 'window', 'min_periods'):
             if rolling_field in kwargs:
@@ -6,6 +6,8 @@ from __future__ import division
 import numpy as np
 import numpy.linalg as linalg
 
+import pandas.lib.tseries as tseries
+
 def rank(X, cond=1.0e-12):
     """
     Return the rank of a matrix X based on its generalized inverse,
@@ -34,6 +36,56 @@ def inv(a):
     except linalg.LinAlgError:
         return np.linalg.pinv(a)
 
+def _solve_batch(a, b):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+
+    result, posdef = tseries.cholesky_solve_batch(a, b)
+
+    # (nearly) singular matrices
+    for i in (~posdef).nonzero()[0]:
+        result[i] = solve(a[i], b[i])
+
+    return result
+
+def solve_batch(a, b):
+    """
+    Returns the solutions of A[i] X[i] = B[i] for a stack of symmetric
+    positive definite matrices A (N x K x K), e.g. the X'X of a moving
+    regression, and B (N x K or N x K x M). Matrices which are not
+    numerically positive definite are handed to solve.
+    """
+    b = np.asarray(b, dtype=float)
+
+    if b.ndim == 2:
+        return _solve_batch(a, b[:, :, None])[:, :, 0]
+
+    return _solve_batch(a, b)
+
+def inv_batch(a):
+    """Returns the inverses of a stack of symmetric positive definite
+    matrices (N x K x K)."""
+    a = np.asarray(a, dtype=float)
+
+    result, posdef = tseries.cholesky_inv_batch(a)
+
+    for i in (~posdef).nonzero()[0]:
+        result[i] = inv(a[i])
+
+    return result
+
+def posdef_batch(a):
+    """
+    Returns a boolean array indicating which matrices of the stack A
+    (N x K x K) are numerically positive definite, i.e. for A = X'X, for
+    which X has full column rank.
+    """
+    a = np.asarray(a, dtype=float)
+    N, K = a.shape[:2]
+
+    _, posdef = tseries.cholesky_solve_batch(a, np.empty((N, K, 0)))
+    return posdef
+
 def is_psd(m):
     eigvals = linalg.eigvals(m)
     return np.isreal(eigvals).all() and (eigvals >= 0).all()
@@ -84,6 +136,90 @@ def newey_west(m, max_lags, nobs, df, nw_overlap=False):
 
     return Xeps
 
+def newey_west_batch(x, w, coefs, starts, ends, max_lags, nobs, df,
+                     nw_overlap=False, clusters=None):
+    """
+    Compute the Newey-West adjusted covariance matrices of many windows of a
+    sample at once, e.g. for each date of a moving regression
+
+    Parameters
+    ----------
+    x: (T x K)
+    w: (T x P)
+        The moment conditions of row t in window n are
+        x[t] * np.dot(w[t], coefs[n]), e.g. for a regression
+        x_t (y_t - x_t' beta_n) with w[t] = [y_t x_t'] and
+        coefs[n] = [1 -beta_n']
+    coefs: (N x P)
+    starts: int array (N)
+    ends: int array (N)
+        Window n consists of rows starts[n] up to (not including) ends[n]
+    max_lags: int
+    nobs: int or int array (N)
+        Number of observations in model
+    df: int or int array (N)
+        Degrees of freedom in explanatory variables
+    nw_overlap: boolean
+    clusters: int array (T), optional
+        Cluster label of each row. The moment conditions of each window are
+        summed by cluster, and max_lags is ignored
+
+    Returns
+    -------
+    ndarray (N x K x K), equal to calling newey_west on each window (on the
+    cluster sums if clusters are given)
+
+    Notes
+    -----
+    The residuals are formed explicitly for each window rather than
+    expanding the lagged cross-products of x_t (y_t - x_t' beta) in
+    cumulative sums, which loses most significant digits when the
+    regressions fit well
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    w = np.ascontiguousarray(w, dtype=float)
+    coefs = np.ascontiguousarray(coefs, dtype=float)
+    starts = np.asarray(starts, dtype=np.int32)
+    ends = np.asarray(ends, dtype=np.int32)
+
+    N = len(coefs)
+    nobs = np.asarray(nobs) * np.ones(N, dtype=int)
+    df = np.asarray(df) * np.ones(N, dtype=int)
+
+    if clusters is None:
+        clusters = np.empty(0, dtype=np.int32)
+        nclusters = 0
+    else:
+        clusters = np.asarray(clusters, dtype=np.int32)
+        nclusters = clusters.max() + 1 if len(clusters) else 0
+        max_lags = 0
+
+    Xeps = tseries.newey_west_batch(x, w, coefs, starts, ends, max_lags,
+                                    nw_overlap, clusters, nclusters)
+    Xeps *= (nobs / (nobs - df))[:, None, None]
+
+    if nw_overlap and max_lags > 0:
+        # positive definite matrices are fine, only check the others
+        for n in (~posdef_batch(Xeps)).nonzero()[0]:
+            if is_psd(Xeps[n]):
+                continue
+
+            rows = slice(starts[n], ends[n])
+            window = x[rows] * np.dot(w[rows], coefs[n])[:, None]
+            Xeps[n] = newey_west(window, max_lags, nobs[n], df[n],
+                                 nw_overlap)
+
+    return Xeps
+
+def dot_batch(a, b):
+    """Returns the matrix products a[i] b[i] of two stacks of matrices."""
+    result = np.empty((len(a), a.shape[1], b.shape[2]))
+
+    for i in xrange(len(a)):
+        result[i] = np.dot(a[i], b[i])
+
+    return result
+
 def calc_F(R, r, beta, var_beta, nobs, df):
     """
     Computes the standard F-test statistic for linear restriction
@@ -4,19 +4,28 @@ statistics implemented in Cython
 """
 from __future__ import division
 
+from datetime import timedelta
 from functools import wraps
 
 from numpy import NaN
 import numpy as np
 
-from pandas.core.api import (DataFrame, DataMatrix, Series, notnull)
+from pandas.core.api import (DataFrame, DataMatrix, Series, WidePanel,
+                             notnull)
+import pandas.core.datetools as datetools
 import pandas.lib.tseries as tseries
 
 __all__ = ['rolling_count', 'rolling_max', 'rolling_min',
            'rolling_sum', 'rolling_mean', 'rolling_std', 'rolling_cov',
-           'rolling_corr', 'rolling_var', 'rolling_skew', 'rolling_kurt',
-           'rolling_median', 'ewma', 'ewmvar', 'ewmstd', 'ewmvol',
-           'ewmcorr', 'ewmcov']
+           'rolling_corr', 'rolling_cov_pairwise', 'rolling_corr_pairwise',
+           'rolling_var', 'rolling_skew', 'rolling_kurt',
+           'rolling_median', 'rolling_quantile', 'rolling_rank',
+           'rolling_apply', 'ewma', 'ewmvar', 'ewmstd',
+           'ewmvol', 'ewmcorr', 'ewmcov', 'ewmcov_pairwise',
+           'ewmcorr_pairwise', 'expanding_count', 'expanding_max',
+           'expanding_min', 'expanding_sum', 'expanding_mean',
+           'expanding_std', 'expanding_cov', 'expanding_corr',
+           'expanding_var', 'expanding_median']
 
 def rolling_count(arg, window, time_rule=None):
     """
@@ -25,16 +34,24 @@ def rolling_count(arg, window, time_rule=None):
     Parameters
     ----------
     arg :  DataFrame or numpy ndarray-like
-    window : Number of observations used for calculating statistic
+    window : int or DateOffset / timedelta
+        Number of observations used for calculating statistic, or time span
+        of the window if arg has a date index
     """
     arg = _conv_timerule(arg, time_rule)
-    window = min(window, len(arg))
+
+    if _is_time_window(window):
+        window = _time_window_starts(arg, window)
+        roll_sum = tseries.roll_sum_variable
+    else:
+        window = min(window, len(arg))
+        roll_sum = tseries.roll_sum
 
     return_hook, values = _process_data_structure(arg, kill_inf=False)
 
     converted = np.isfinite(values).astype(float)
-    result = rolling_sum(converted, window, min_periods=1,
-                         time_rule=time_rule)
+    result = np.apply_along_axis(lambda x: roll_sum(x, window, 1), 0,
+                                 converted)
 
     # putmask here?
     result[np.isnan(result)] = 0
@@ -44,7 +61,14 @@ def rolling_count(arg, window, time_rule=None):
 def rolling_cov(arg1, arg2, window, min_periods=None, time_rule=None):
     X, Y = _prep_binary(arg1, arg2)
     mean = lambda x: rolling_mean(x, window, min_periods, time_rule)
-    bias_adj = window / (window - 1)
+
+    if _is_time_window(window):
+        # number of observations varies from window to window
+        count = rolling_count(X + Y, window, time_rule)
+        bias_adj = count / (count - 1)
+    else:
+        bias_adj = window / (window - 1)
+
     return (mean(X * Y) - mean(X) * mean(Y)) * bias_adj
 
 def rolling_corr(arg1, arg2, window, min_periods=None, time_rule=None):
@@ -54,6 +78,61 @@ def rolling_corr(arg1, arg2, window, min_periods=None, time_rule=None):
             rolling_std(Y, window, min_periods, time_rule))
     return num / den
 
+def rolling_cov_pairwise(frame, window, min_periods=None, time_rule=None):
+    """
+    Unbiased moving covariance matrix of the columns of a frame at each date
+
+    Parameters
+    ----------
+    frame : DataFrame or DataMatrix
+    window : Number of observations used for calculating statistic
+    min_periods : int
+        Minimum number of observations of a pair of columns in window
+        required to have a value
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+
+    Returns
+    -------
+    y : WidePanel
+        Items are the dates of frame, major and minor axes its columns. Each
+        pair of columns only uses the dates on which both are observed
+    """
+    return _rolling_pairwise(frame, window, min_periods, time_rule, False)
+
+def rolling_corr_pairwise(frame, window, min_periods=None, time_rule=None):
+    """
+    Moving sample correlation matrix of the columns of a frame at each date
+
+    Parameters
+    ----------
+    frame : DataFrame or DataMatrix
+    window : Number of observations used for calculating statistic
+    min_periods : int
+        Minimum number of observations of a pair of columns in window
+        required to have a value
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+
+    Returns
+    -------
+    y : WidePanel
+        Items are the dates of frame, major and minor axes its columns. Each
+        pair of columns only uses the dates on which both are observed
+    """
+    return _rolling_pairwise(frame, window, min_periods, time_rule, True)
+
+def _rolling_pairwise(frame, window, min_periods, time_rule, corr):
+    frame = _conv_timerule(frame, time_rule)
+    minp = _two_periods(min_periods, window)
+    _, values = _process_data_structure(frame)
+    output = tseries.roll_cov_matrix(values, window, minp, corr)
+    return _pairwise_panel(frame, output)
+
+def _pairwise_panel(frame, values):
+    return WidePanel(values, items=frame.index, major_axis=frame.columns,
+                     minor_axis=frame.columns)
+
 def _rolling_moment(arg, window, func, minp, axis=0, time_rule=None):
     """
     Rolling statistical measure using supplied function. Designed to be
@@ -62,7 +141,8 @@ def _rolling_moment(arg, window, func, minp, axis=0, time_rule=None):
     Parameters
     ----------
     arg :  DataFrame or numpy ndarray-like
-    window : Number of observations used for calculating statistic
+    window : Number of observations used for calculating statistic, or
+        window start positions for the variable window functions
     func : Cython function to compute rolling statistic on raw series
     minp : int
         Minimum number of observations required to have a value
@@ -147,14 +227,13 @@ def ewmvar(arg, com=None, span=None, min_periods=0, bias=False,
            time_rule=None):
     com = _get_center_of_mass(com, span)
     arg = _conv_timerule(arg, time_rule)
-    moment2nd = ewma(arg * arg, com=com, min_periods=min_periods)
-    moment1st = ewma(arg, com=com, min_periods=min_periods)
 
-    result = moment2nd - moment1st ** 2
-    if not bias:
-        result *= (1.0 + 2.0 * com) / (2.0 * com)
+    def _ewmvar(v):
+        return tseries.ewmcov(v, v, com, min_periods, bias)
 
-    return result
+    return_hook, values = _process_data_structure(arg)
+    output = np.apply_along_axis(_ewmvar, 0, values)
+    return return_hook(output)
 
 def ewmstd(arg, com=None, span=None, min_periods=0, bias=False,
            time_rule=None):
@@ -166,31 +245,107 @@ ewmvol = ewmstd
 
 def ewmcov(arg1, arg2, com=None, span=None, min_periods=0, bias=False,
            time_rule=None):
-    X, Y = _prep_binary(arg1, arg2)
+    com = _get_center_of_mass(com, span)
 
-    X = _conv_timerule(X, time_rule)
-    Y = _conv_timerule(Y, time_rule)
+    def _ewmcov(x, y):
+        return tseries.ewmcov(x, y, com, min_periods, bias)
 
-    mean = lambda x: ewma(x, com=com, span=span, min_periods=min_periods)
+    return _ewm_binary(arg1, arg2, _ewmcov, time_rule)
 
-    result = (mean(X*Y) - mean(X) * mean(Y))
+def ewmcorr(arg1, arg2, com=None, span=None, min_periods=0,
+            time_rule=None):
+    com = _get_center_of_mass(com, span)
 
-    if not bias:
-        result *= (1.0 + 2.0 * com) / (2.0 * com)
+    def _ewmcorr(x, y):
+        return tseries.ewmcorr(x, y, com, min_periods)
 
-    return result
+    return _ewm_binary(arg1, arg2, _ewmcorr, time_rule)
 
-def ewmcorr(arg1, arg2, com=None, span=None, min_periods=0,
-            time_rule=None):
-    X, Y = _prep_binary(arg1, arg2)
+def _ewm_binary(arg1, arg2, func, time_rule):
+    X, Y = _align_binary(arg1, arg2)
 
     X = _conv_timerule(X, time_rule)
     Y = _conv_timerule(Y, time_rule)
 
-    mean = lambda x: ewma(x, com=com, span=span, min_periods=min_periods)
-    var = lambda x: ewmvar(x, com=com, span=span, min_periods=min_periods,
-                           bias=True)
-    return (mean(X*Y) - mean(X)*mean(Y)) / np.sqrt(var(X) * var(Y))
+    return_hook, xvalues = _process_data_structure(X)
+    _, yvalues = _process_data_structure(Y)
+
+    if xvalues.ndim == 1:
+        output = func(xvalues, yvalues)
+    else:
+        output = np.empty(xvalues.shape, dtype=float)
+        for j in xrange(xvalues.shape[1]):
+            output[:, j] = func(xvalues[:, j], yvalues[:, j])
+
+    return return_hook(output)
+
+def ewmcov_pairwise(frame, com=None, span=None, min_periods=0, bias=False,
+                    time_rule=None):
+    """
+    Exponentially-weighted moving covariance matrix of the columns of a frame
+    at each date, computed in a single pass
+
+    Parameters
+    ----------
+    frame : DataFrame or DataMatrix
+    com, span, min_periods, bias, time_rule : see ewmcov
+
+    Returns
+    -------
+    y : WidePanel
+        Items are the dates of frame, major and minor axes its columns. Each
+        pair of columns only uses the dates on which both are observed
+    """
+    com = _get_center_of_mass(com, span)
+    return _ewm_pairwise(frame, com, min_periods, bias, False, time_rule)
+
+def ewmcorr_pairwise(frame, com=None, span=None, min_periods=0,
+                     time_rule=None):
+    """
+    Exponentially-weighted moving correlation matrix of the columns of a
+    frame at each date, computed in a single pass
+
+    Parameters
+    ----------
+    frame : DataFrame or DataMatrix
+    com, span, min_periods, time_rule : see ewmcorr
+
+    Returns
+    -------
+    y : WidePanel
+        Items are the dates of frame, major and minor axes its columns. Each
+        pair of columns only uses the dates on which both are observed
+    """
+    com = _get_center_of_mass(com, span)
+    return _ewm_pairwise(frame, com, min_periods, True, True, time_rule)
+
+def _ewm_pairwise(frame, com, min_periods, bias, corr, time_rule):
+    frame = _conv_timerule(frame, time_rule)
+    _, values = _process_data_structure(frame)
+    output = tseries.ewmcov_matrix(values, com, min_periods, bias, corr)
+    return _pairwise_panel(frame, output)
+
+def _align_binary(arg1, arg2):
+    """
+    Like _prep_binary, but skips the masking (the fused kernels only use
+    observations where both inputs are present) and the arithmetic if the
+    inputs are already aligned
+    """
+    if not isinstance(arg2, type(arg1)):
+        raise Exception('Input arrays must be of the same type!')
+
+    if isinstance(arg1, Series):
+        aligned = arg1.index.equals(arg2.index)
+    elif isinstance(arg1, DataFrame):
+        aligned = (arg1.index.equals(arg2.index) and
+                   arg1.columns.equals(arg2.columns))
+    else:
+        aligned = np.shape(arg1) == np.shape(arg2)
+
+    if aligned:
+        return arg1, arg2
+
+    return _prep_binary(arg1, arg2)
 
 def _prep_binary(arg1, arg2):
     if not isinstance(arg2, type(arg1)):
@@ -211,9 +366,14 @@ _doc_template = """
 Parameters
 ----------
 %s
-window : Number of observations used for calculating statistic
+window : int or DateOffset / timedelta
+    Number of observations used for calculating statistic. If arg has a
+    sorted date index, a DateOffset or timedelta (e.g. Minute(5)) gives
+    windows covering that time span instead, computed directly on the
+    irregular index
 min_periods : int
     Minimum number of observations in window required to have a value
+    (default: window, or 1 for time-based windows)
 time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
     Name of time rule to conform to before computing statistic
 
@@ -278,7 +438,7 @@ ewmvar.__doc__ = _ewm_doc % ("Exponentially-weighted moving variance",
 ewmcorr.__doc__ = _ewm_doc % ("Exponentially-weighted moving "
                               "correlation", _binary_arg, "")
 ewmcov.__doc__ = _ewm_doc % ("Exponentially-weighted moving covariance",
-                             _binary_arg, "")
+                             _binary_arg, _bias_doc)
 
 #-------------------------------------------------------------------------------
 # Python interface to Cython functions
@@ -286,11 +446,49 @@ ewmcov.__doc__ = _ewm_doc % ("Exponentially-weighted moving covariance",
 def _conv_timerule(arg, time_rule):
     types = (DataFrame, Series)
     if time_rule is not None and isinstance(arg, types):
+        if datetools.conformsToRule(arg.index, time_rule):
+            return arg
+
         # Conform to whatever frequency needed.
         arg = arg.asfreq(time_rule)
 
     return arg
 
+def _is_time_window(window):
+    return isinstance(window, (datetools.DateOffset, timedelta))
+
+def _to_micros(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def _time_window_starts(arg, window):
+    """
+    Position of the first observation in each time-based window, where the
+    window ending at date d covers (d - window, d]
+    """
+    if not isinstance(arg, (DataFrame, Series)):
+        raise Exception('Time-based windows require a Series or DataFrame '
+                        'with a date index')
+
+    index = np.asarray(arg.index, dtype=object)
+    stamps = tseries.dates_to_micros(index)
+
+    if (np.diff(stamps) < 0).any():
+        raise Exception('Index must be sorted to use time-based windows')
+
+    if isinstance(window, datetools.Tick):
+        window = window.delta
+    elif type(window) == datetools.DateOffset and not window.kwds:
+        window = timedelta(window.n)
+
+    if isinstance(window, timedelta):
+        edges = stamps - _to_micros(window)
+    else:
+        # depends on the date, e.g. BDay(5) or MonthEnd()
+        edges = tseries.dates_to_micros(np.array([d - window for d in index],
+                                                 dtype=object))
+
+    return tseries.window_starts(stamps, edges)
+
 def _two_periods(minp, window):
     if minp is None:
         return window
@@ -303,32 +501,319 @@ def _use_window(minp, window):
     else:
         return minp
 
-def _rolling_func(func, desc, check_minp=_use_window):
+def _rolling_dispatch(arg, window, func, variable_func, min_periods,
+                      time_rule, check_minp=_use_window, args=()):
+    """
+    Compute a rolling statistic with func for windows counted in observations
+    or with variable_func for time-based windows. args are passed through
+    to either after (values, window or start positions, minp)
+    """
+    if _is_time_window(window):
+        arg = _conv_timerule(arg, time_rule)
+        start = _time_window_starts(arg, window)
+
+        def call_cython(arg, start, minp):
+            minp = check_minp(minp, 1)
+            return variable_func(arg, start, minp, *args)
+
+        return _rolling_moment(arg, start, call_cython, min_periods)
+
+    def call_cython(arg, window, minp):
+        minp = check_minp(minp, window)
+        return func(arg, window, minp, *args)
+
+    return _rolling_moment(arg, window, call_cython, min_periods,
+                           time_rule=time_rule)
+
+def _rolling_func(func, desc, variable_func, check_minp=_use_window):
     @wraps(func)
     def f(arg, window, min_periods=None, time_rule=None):
-        def call_cython(arg, window, minp):
-            minp = check_minp(minp, window)
-            return func(arg, window, minp)
-        return _rolling_moment(arg, window, call_cython, min_periods,
-                               time_rule=time_rule)
+        return _rolling_dispatch(arg, window, func, variable_func,
+                                 min_periods, time_rule,
+                                 check_minp=check_minp)
 
     f.__doc__ = _doc_template % (desc, _unary_arg)
 
     return f
 
-rolling_max = _rolling_func(tseries.roll_max, 'Moving maximum')
-rolling_min = _rolling_func(tseries.roll_min, 'Moving minimum')
-rolling_sum = _rolling_func(tseries.roll_sum, 'Moving sum')
-rolling_mean = _rolling_func(tseries.roll_mean, 'Moving mean')
-rolling_median = _rolling_func(tseries.roll_median, 'Moving median')
+rolling_max = _rolling_func(tseries.roll_max, 'Moving maximum',
+                            tseries.roll_max_variable)
+rolling_min = _rolling_func(tseries.roll_min, 'Moving minimum',
+                            tseries.roll_min_variable)
+rolling_sum = _rolling_func(tseries.roll_sum, 'Moving sum',
+                            tseries.roll_sum_variable)
+rolling_mean = _rolling_func(tseries.roll_mean, 'Moving mean',
+                             tseries.roll_mean_variable)
+rolling_median = _rolling_func(tseries.roll_median, 'Moving median',
+                               tseries.roll_median_variable)
 
 _ts_std = lambda *a, **kw: np.sqrt(tseries.roll_var(*a, **kw))
+_ts_std_variable = lambda *a, **kw: np.sqrt(tseries.roll_var_variable(*a,
+                                                                      **kw))
 rolling_std = _rolling_func(_ts_std, 'Unbiased moving standard deviation',
-                            check_minp=_two_periods)
+                            _ts_std_variable, check_minp=_two_periods)
 rolling_var = _rolling_func(tseries.roll_var, 'Unbiased moving variance',
+                            tseries.roll_var_variable,
                             check_minp=_two_periods)
 rolling_skew = _rolling_func(tseries.roll_skew, 'Unbiased moving skewness',
+                             tseries.roll_skew_variable,
                              check_minp=_two_periods)
 rolling_kurt = _rolling_func(tseries.roll_kurt, 'Unbiased moving kurtosis',
+                             tseries.roll_kurt_variable,
                              check_minp=_two_periods)
 
+def rolling_quantile(arg, window, quantile, min_periods=None,
+                     time_rule=None):
+    """
+    Moving quantile, interpolating linearly between order statistics
+
+    Parameters
+    ----------
+    arg : Series, DataFrame, or DataMatrix
+    window : int or DateOffset / timedelta
+        Number of observations used for calculating statistic, or time span
+        of the window if arg has a date index
+    quantile : float
+        0 <= quantile <= 1
+    min_periods : int
+        Minimum number of observations in window required to have a value
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+
+    Returns
+    -------
+    y : type of input argument
+    """
+    if not 0 <= quantile <= 1:
+        raise Exception('quantile must be between 0 and 1, got %s'
+                        % quantile)
+
+    return _rolling_dispatch(arg, window, tseries.roll_quantile,
+                             tseries.roll_quantile_variable, min_periods,
+                             time_rule, args=(quantile,))
+
+_rank_kinds = {
+    'strict' : 0,
+    'weak' : 1,
+    'mean' : 2,
+    'rank' : 3
+}
+
+def rolling_rank(arg, window, min_periods=None, time_rule=None,
+                 kind='mean'):
+    """
+    Moving percentile rank (0-100) of each observation within its window
+
+    Parameters
+    ----------
+    arg : Series, DataFrame, or DataMatrix
+    window : int or DateOffset / timedelta
+        Number of observations used for calculating statistic, or time span
+        of the window if arg has a date index
+    min_periods : int
+        Minimum number of observations in window required to have a value
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+    kind : {'rank', 'weak', 'strict', 'mean'}, default 'mean'
+        Interpretation of the score, as in percentileRank and
+        scipy.stats.percentileofscore
+
+    Returns
+    -------
+    y : type of input argument
+    """
+    if kind not in _rank_kinds:
+        raise Exception('kind must be one of %s, got %s'
+                        % (sorted(_rank_kinds), kind))
+
+    return _rolling_dispatch(arg, window, tseries.roll_rank,
+                             tseries.roll_rank_variable, min_periods,
+                             time_rule, args=(_rank_kinds[kind],))
+
+def rolling_apply(arg, window, func, min_periods=None, time_rule=None,
+                  n_jobs=1):
+    """
+    Generic moving function application
+
+    Parameters
+    ----------
+    arg : Series, DataFrame, or DataMatrix
+    window : int or DateOffset / timedelta
+        Number of observations used for calculating statistic, or time span
+        of the window if arg has a date index
+    func : function
+        Must produce a single value from an ndarray input. Windows are passed
+        as ndarray views into the data (no copies, no index) and may contain
+        NaN
+    min_periods : int
+        Minimum number of observations in window required to have a value
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+    n_jobs : int, default 1
+        If greater than one, long series are split into overlapping chunks
+        which are computed in a pool of n_jobs processes. func must then be
+        picklable (e.g. a module-level function). Ignored for time-based
+        windows
+
+    Notes
+    -----
+    If func is one of numpy's sum, mean, median, min or max and every window
+    must be full (min_periods is None or equal to window), the equivalent
+    Cython moving window function is used instead, giving the same result
+
+    Returns
+    -------
+    y : type of input argument
+    """
+    # the Cython functions skip NaN, which only gives the same result as
+    # func when windows with any NaN are left out anyway
+    fast_func = _fast_rolling_funcs.get(func)
+    if (fast_func is not None and not _is_time_window(window) and
+        min_periods in (None, window)):
+        return fast_func(arg, window, min_periods=min_periods,
+                         time_rule=time_rule)
+
+    def roll_generic(arg, window, minp, func):
+        return _roll_generic(arg, window, minp, func, n_jobs=n_jobs)
+
+    return _rolling_dispatch(arg, window, roll_generic,
+                             tseries.roll_generic_variable, min_periods,
+                             time_rule, args=(func,))
+
+_fast_rolling_funcs = {
+    np.sum : rolling_sum,
+    np.mean : rolling_mean,
+    np.median : rolling_median,
+    np.max : rolling_max,
+    np.min : rolling_min,
+}
+
+# don't bother with a process pool for anything shorter than this
+_min_pool_length = 10000
+
+def _roll_generic(values, window, minp, func, n_jobs=1):
+    N = len(values)
+
+    if n_jobs is None or n_jobs <= 1 or N < _min_pool_length:
+        return tseries.roll_generic(values, window, minp, func)
+
+    from multiprocessing import Pool
+
+    # each chunk carries the window - 1 preceding observations so that its
+    # first output is computed exactly as in the serial case
+    bounds = np.linspace(0, N, n_jobs + 1).astype(int)
+    tasks = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        lead = max(start - window + 1, 0)
+        tasks.append((values[lead:end], window, minp, func, start - lead))
+
+    pool = Pool(n_jobs)
+    try:
+        pieces = pool.map(_roll_generic_chunk, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+    return np.concatenate(pieces)
+
+def _roll_generic_chunk(task):
+    values, window, minp, func, offset = task
+    return tseries.roll_generic(values, window, minp, func)[offset:]
+
+#-------------------------------------------------------------------------------
+# Expanding window moments
+#
+# The window always starts at the first observation, so these are the
+# variable window kernels with every start at 0: a single cumulative pass
+# without the skip lists a window of len(arg) would allocate
+
+_expanding_doc = """
+%s
+
+Parameters
+----------
+%s
+min_periods : int, default 1
+    Minimum number of observations in window required to have a value
+time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+    Name of time rule to conform to before computing statistic
+
+Returns
+-------
+y : type of input argument
+"""
+
+def _expanding_func(func, desc, check_minp=_use_window):
+    @wraps(func)
+    def f(arg, min_periods=1, time_rule=None):
+        def call_cython(arg, window, minp):
+            minp = check_minp(minp, window)
+            return func(arg, np.zeros(len(arg), dtype=np.int32), minp)
+
+        return _rolling_moment(arg, 1, call_cython, min_periods,
+                               time_rule=time_rule)
+
+    f.__doc__ = _expanding_doc % (desc, _unary_arg)
+
+    return f
+
+expanding_max = _expanding_func(tseries.roll_max_variable,
+                                'Expanding maximum')
+expanding_min = _expanding_func(tseries.roll_min_variable,
+                                'Expanding minimum')
+expanding_sum = _expanding_func(tseries.roll_sum_variable, 'Expanding sum')
+expanding_mean = _expanding_func(tseries.roll_mean_variable,
+                                 'Expanding mean')
+expanding_std = _expanding_func(_ts_std_variable,
+                                'Unbiased expanding standard deviation',
+                                check_minp=_two_periods)
+expanding_var = _expanding_func(tseries.roll_var_variable,
+                                'Unbiased expanding variance',
+                                check_minp=_two_periods)
+
+def expanding_median(arg, min_periods=1, time_rule=None):
+    def call_cython(arg, window, minp):
+        minp = _use_window(minp, window)
+        return tseries.expanding_median(arg, minp)
+
+    return _rolling_moment(arg, 1, call_cython, min_periods,
+                           time_rule=time_rule)
+
+def expanding_count(arg, time_rule=None):
+    """
+    Expanding count of number of non-NaN observations.
+
+    Parameters
+    ----------
+    arg :  DataFrame or numpy ndarray-like
+    time_rule : {None, 'WEEKDAY', 'EOM', 'W@MON', ...}, default=None
+        Name of time rule to conform to before computing statistic
+
+    Returns
+    -------
+    y : type of input argument
+    """
+    arg = _conv_timerule(arg, time_rule)
+    return_hook, values = _process_data_structure(arg, kill_inf=False)
+    result = np.isfinite(values).astype(float).cumsum(axis=0)
+    return return_hook(result)
+
+def expanding_cov(arg1, arg2, min_periods=1, time_rule=None):
+    X, Y = _prep_binary(arg1, arg2)
+    mean = lambda x: expanding_mean(x, min_periods, time_rule)
+    count = expanding_count(X + Y, time_rule)
+    bias_adj = count / (count - 1)
+    return (mean(X * Y) - mean(X) * mean(Y)) * bias_adj
+
+def expanding_corr(arg1, arg2, min_periods=1, time_rule=None):
+    X, Y = _prep_binary(arg1, arg2)
+    num = expanding_cov(X, Y, min_periods, time_rule)
+    den  = (expanding_std(X, min_periods, time_rule) *
+            expanding_std(Y, min_periods, time_rule))
+    return num / den
+
+expanding_median.__doc__ = _expanding_doc % ('Expanding median', _unary_arg)
+expanding_cov.__doc__ = _expanding_doc % ('Unbiased expanding covariance',
+                                          _binary_arg)
+expanding_corr.__doc__ = _expanding_doc % ('Expanding sample correlation',
+                                           _binary_arg)
@@ -11,7 +11,7 @@ import numpy as np
 
 from pandas.core.api import DataFrame, DataMatrix, Series
 from pandas.core.panel import WidePanel
-from pandas.util.decorators import cache_readonly
+from pandas.util.decorators import cache_readonly, resettable_cache
 import pandas.stats.common as common
 import pandas.stats.math as math
 import pandas.stats.moments as moments
@@ -32,11 +32,6 @@ class OLS(object):
         Number of Newey-West lags.
     """
     def __init__(self, y, x, intercept=True, nw_lags=None, nw_overlap=False):
-        try:
-            import scikits.statsmodels.api as sm
-        except ImportError:
-            import scikits.statsmodels as sm
-
         self._x_orig = x
         self._y_orig = y
         self._intercept = intercept
@@ -53,7 +48,34 @@ class OLS(object):
         self._x_raw = self._x.values
         self._y_raw = self._y.view(np.ndarray)
 
-        self.sm_ols = sm.OLS(self._y_raw, self._x.values).fit()
+    @cache_readonly
+    def sm_ols(self):
+        """Returns the fitted statsmodels OLS."""
+        try:
+            import scikits.statsmodels.api as sm
+        except ImportError:
+            import scikits.statsmodels as sm
+
+        return sm.OLS(self._y_raw, self._x.values).fit()
+
+    def __getstate__(self):
+        # the statsmodels results don't survive pickling; they are refit if
+        # needed, but the results computed from them are kept
+        state = self.__dict__.copy()
+
+        if '_cache' in state:
+            state['_cache'] = dict((k, v) for k, v in state['_cache'].items()
+                                   if k != 'sm_ols')
+
+        return state
+
+    def __setstate__(self, state):
+        cache = state.pop('_cache', None)
+        self.__dict__.update(state)
+
+        if cache is not None:
+            self._cache = resettable_cache()
+            self._cache.update(cache)
 
     def _prepare_data(self):
         """
@@ -141,7 +163,7 @@ class OLS(object):
         """Returns the raw f-stat value."""
         from scipy.stats import f
 
-        cols = self._x.columns
+        cols = self.beta.index
 
         if self._nw_lags is None:
             F = self._r2_raw / (self._r2_raw - self._r2_adj_raw)
@@ -687,25 +709,18 @@ class MovingOLS(OLS):
         betas = np.empty((N, K), dtype=float)
         betas[:] = np.NaN
 
-        valid = self._time_has_obs
-        enough = self._enough_obs
-        window = self._window
+        have_obs = self._time_has_obs & self._enough_obs
 
         # Use transformed (demeaned) Y, X variables
-        cum_xx = self._cum_xx(x)
-        cum_xy = self._cum_xy(x, y)
-
-        for i in xrange(N):
-            if not valid[i] or not enough[i]:
-                continue
-
-            xx = cum_xx[i]
-            xy = cum_xy[i]
-            if self._is_rolling and i >= window:
-                xx = xx - cum_xx[i - window]
-                xy = xy - cum_xy[i - window]
+        if x is self._x:
+            cum_xx = self._x_cross
+        else:
+            cum_xx = self._cum_xx(x)
 
-            betas[i] = math.solve(xx, xy)
+        indices = have_obs.nonzero()[0]
+        xx = self._window_sums(cum_xx, indices)
+        xy = self._window_sums(self._cum_xy(x, y), indices)
+        betas[indices] = math.solve_batch(xx, xy)
 
         mask = -np.isnan(betas).any(axis=1)
         have_betas = np.arange(N)[mask]
@@ -713,88 +728,124 @@ class MovingOLS(OLS):
         return betas, have_betas, mask
 
     def _rolling_rank(self):
-        dates = self._index
-        window = self._window
+        N = len(self._index)
+        K = len(self._x.cols())
 
-        ranks = np.empty(len(dates), dtype=float)
+        ranks = np.empty(N, dtype=float)
         ranks[:] = np.NaN
-        for i, date in enumerate(dates):
-            if self._is_rolling and i >= window:
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
 
-            x_slice = self._x.truncate(before=prior_date, after=date).values
+        indices = (self._nobs_raw > 0).nonzero()[0]
 
-            if len(x_slice) == 0:
-                continue
+        # X'X of a window is positive definite iff X has full column rank,
+        # only the (nearly) singular windows need an SVD of the window
+        xx = self._window_sums(self._x_cross, indices)
+        posdef = math.posdef_batch(xx)
+        ranks[indices] = K
+
+        singular = indices[~posdef]
+        starts, ends = self._window_rows(self._x, singular)
 
-            ranks[i] = math.rank(x_slice)
+        x_values = self._x.values
+        for i, left, right in zip(singular, starts, ends):
+            ranks[i] = math.rank(x_values[left:right])
 
         return ranks
 
-    def _cum_xx(self, x):
-        dates = self._index
-        K = len(x.cols())
-        valid = self._time_has_obs
-        cum_xx = []
-
-        if isinstance(x, DataFrame):
-            _indexMap = x.index.indexMap
-            def slicer(df, dt):
-                i = _indexMap[dt]
-                return df.values[i:i+1, :]
-        else:
-            slicer = lambda df, dt: df.truncate(dt, dt).values
+    def _window_rows(self, frame, indices):
+        """
+        Returns the (start, end) row locations in the passed DataFrame or
+        LongPanel of the regression windows ending at the passed date
+        locations
+        """
+        positions = self._row_positions(frame)
 
-        last = np.zeros((K, K))
-        for i, date in enumerate(dates):
-            if not valid[i]:
-                cum_xx.append(last)
-                continue
+        if self._is_rolling:
+            first = np.maximum(indices - self._window + 1, 0)
+        else:
+            first = np.zeros(len(indices), dtype=int)
 
-            x_slice = slicer(x, date)
-            xx = last = last + np.dot(x_slice.T, x_slice)
-            cum_xx.append(xx)
+        starts = positions.searchsorted(first, side='left')
+        ends = positions.searchsorted(indices, side='right')
 
-        return cum_xx
+        return starts, ends
 
-    def _cum_xy(self, x, y):
-        dates = self._index
-        valid = self._time_has_obs
-        cum_xy = []
-
-        if isinstance(x, DataFrame):
-            _x_indexMap = x.index.indexMap
-            def x_slicer(df, dt):
-                i = _x_indexMap[dt]
-                return df.values[i:i+1, :]
+    def _row_positions(self, frame):
+        """
+        Returns the location in the date index of each row of the passed
+        DataFrame or LongPanel
+        """
+        if isinstance(frame, DataFrame):
+            dates = frame.index
+            labels = None
         else:
-            x_slicer = lambda df, dt: df.truncate(dt, dt).values
+            dates = frame.index.major_axis
+            labels = frame.index.major_labels
 
+        indexMap = self._index.indexMap
+        positions = np.array([indexMap[date] for date in dates], dtype=int)
 
-        if isinstance(y, Series):
-            _y_indexMap = y.index.indexMap
-            _values = y.values
-            def y_slicer(df, dt):
-                i = _y_indexMap[dt]
-                return _values[i:i+1]
+        if labels is not None:
+            positions = positions[labels]
+
+        return positions
+
+    def _cumulate(self, frame, values, outer=False):
+        """
+        Sums the passed (N_rows x K) values, one row per row of frame, by
+        date and accumulates them over the date index. If outer is True,
+        the (K x K) cross products of the rows are summed instead, a block
+        of rows at a time. Dates without observations carry over the
+        previous total
+        """
+        N = len(self._index)
+        K = values.shape[1]
+        positions = self._row_positions(frame)
+
+        if len(positions) > 1 and (np.diff(positions) < 0).any():
+            order = positions.argsort(kind='mergesort')
+            positions = positions[order]
+            values = values[order]
+
+        if outer:
+            sums = np.zeros((N, K, K))
+            blocksize = max(_BLOCK_SIZE // (K * K), 1)
         else:
-            y_slicer = lambda s, dt: _y_converter(s.truncate(dt, dt))
+            sums = np.zeros((N, K))
+            blocksize = max(len(values), 1)
 
-        last = np.zeros(len(x.cols()))
-        for i, date in enumerate(dates):
-            if not valid[i]:
-                cum_xy.append(last)
-                continue
+        for start in xrange(0, len(values), blocksize):
+            block = values[start:start + blocksize]
+            block_positions = positions[start:start + blocksize]
 
-            x_slice = x_slicer(x, date)
-            y_slice = y_slicer(y, date)
+            if outer:
+                block = block[:, :, None] * block[:, None, :]
 
-            xy = last = last + np.dot(x_slice.T, y_slice)
-            cum_xy.append(xy)
+            # first row of each date within the block
+            firsts = np.r_[0, (np.diff(block_positions) != 0).nonzero()[0] + 1]
+            sums[block_positions[firsts]] += np.add.reduceat(block, firsts,
+                                                             axis=0)
 
-        return cum_xy
+        return sums.cumsum(0, out=sums)
+
+    def _window_sums(self, cum, indices):
+        """
+        Sums over the regression windows ending at the passed date
+        locations, from cumulative sums over the date index
+        """
+        window = self._window if self._is_rolling else None
+        return _window_sums(cum, indices, window)
+
+    def _cum_xx(self, x):
+        return self._cumulate(x, x.values, outer=True)
+
+    def _cum_xy(self, x, y):
+        values = x.values * _y_converter(y)[:, None]
+        return self._cumulate(x, values)
+
+    @cache_readonly
+    def _x_cross(self):
+        """Cumulative X'X (N x K x K) of the untransformed X"""
+        return self._cum_xx(self._x)
 
     @cache_readonly
     def _rank_raw(self):
@@ -953,47 +1004,20 @@ class MovingOLS(OLS):
     @cache_readonly
     def _var_beta_raw(self):
         """Returns the raw covariance of beta."""
-        x = self._x
-        y = self._y
-        dates = self._index
-        nobs = self._nobs
-        rmse = self._rmse_raw
-        beta = self._beta_raw
-        df = self._df_raw
-        window = self._window
-        cum_xx = self._cum_xx(self._x)
-
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            xx = cum_xx[i]
-            date = dates[i]
-
-            if self._is_rolling and i >= window:
-                xx = xx - cum_xx[i - window]
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
-
-            x_slice = x.truncate(before=prior_date, after=date)
-            y_slice = y.truncate(before=prior_date, after=date)
-            xv = x_slice.values
-            yv = np.asarray(y_slice)
-
-            if self._nw_lags is None:
-                result = math.inv(xx) * (rmse[n] ** 2)
-            else:
-                resid = yv - np.dot(xv, beta[n])
-                m = (xv.T * resid).T
+        xx = self._window_sums(self._x_cross, self._valid_indices)
+        xx_inv = math.inv_batch(xx)
 
-                xeps = math.newey_west(m, self._nw_lags, nobs[n], df[n],
-                                       self._nw_overlap)
+        if self._nw_lags is None:
+            return xx_inv * (self._rmse_raw ** 2)[:, None, None]
 
-                xx_inv = math.inv(xx)
-                result = np.dot(xx_inv, np.dot(xeps, xx_inv))
+        starts, ends = self._window_rows(self._x, self._valid_indices)
+        xv, w, coefs = _nw_moments(self._x, self._y, self._beta_raw)
 
-            results.append(result)
+        xeps = math.newey_west_batch(xv, w, coefs, starts, ends, self._nw_lags,
+                                     self._nobs, self._df_raw,
+                                     self._nw_overlap)
 
-        return np.array(results)
+        return math.dot_batch(xx_inv, math.dot_batch(xeps, xx_inv))
 
     @cache_readonly
     def _forecast_mean_raw(self):
@@ -1122,6 +1146,412 @@ class MovingOLS(OLS):
         return self._nobs_raw >= max(self._min_periods,
                                      len(self._x.columns) + 1)
 
+class MultiOLS(object):
+    """
+    Regresses each column of y on the same x, full-sample or
+    rolling/expanding.
+
+    Targets observed on the same dates are regressed together: X'X is
+    computed and factored once per group and window, and all the targets of
+    the group are solved for at once.
+
+    Parameters
+    ----------
+    y: DataFrame
+        One column per target
+    x: Series or DataFrame
+    intercept: bool
+        True if you want an intercept.
+    window_type: {'full sample', 'rolling', 'expanding'}
+        'full sample' by default
+    window: int
+        size of window (for rolling/expanding OLS)
+    min_periods: int
+        Minimum number of observations in the window
+
+    Notes
+    -----
+    Full-sample coefficients are DataMatrix objects of targets x regressors
+    and the other statistics Series indexed by target.
+
+    Rolling/expanding coefficients are WidePanel objects with one item per
+    target, result.beta[target] matching the beta of a MovingOLS on that
+    target, and the other statistics DataMatrix objects of dates x targets.
+    """
+    def __init__(self, y, x, intercept=True, window_type='full sample',
+                 window=None, min_periods=None):
+        if not isinstance(y, DataFrame):
+            raise Exception('y must be a DataFrame')
+
+        self._y_orig = y
+        self._x_orig = x
+        self._intercept = intercept
+
+        self._y, self._x, self._index = self._prepare_data()
+
+        self._set_window(window_type, window, min_periods)
+
+    def _prepare_data(self):
+        x = _combine_rhs(self._x_orig)
+        y = self._y_orig
+
+        index = y.index + x.index
+        if not index.equals(x.index):
+            x = x.reindex(index)
+        if not index.equals(y.index):
+            y = y.reindex(index)
+
+        if self._intercept:
+            x['intercept'] = 1.
+
+        return y, x, index
+
+    def _set_window(self, window_type, window, min_periods):
+        self._window_type = common._get_window_type(window_type)
+
+        if self._is_rolling:
+            if window is None:
+                raise Exception('Must pass window when doing rolling '
+                                'regression')
+
+            if min_periods is None:
+                min_periods = window
+        else:
+            window = len(self._index)
+            if min_periods is None:
+                min_periods = 1
+
+        self._window = int(window)
+        self._min_periods = min_periods
+
+    @property
+    def _is_rolling(self):
+        return self._window_type == common.ROLLING
+
+    @property
+    def _is_moving(self):
+        return self._window_type != common.FULL_SAMPLE
+
+    @property
+    def x(self):
+        """Returns the x used in the regressions."""
+        return self._x
+
+    @property
+    def y(self):
+        """Returns the y used in the regressions."""
+        return self._y
+
+    @cache_readonly
+    def _groups(self):
+        """
+        List of (dates mask, target locations), the targets being grouped by
+        the set of dates on which both they and x are observed
+        """
+        x_valid = np.isfinite(self._x.values).all(1)
+        valid = np.isfinite(self._y.values) & x_valid[:, None]
+
+        groups = {}
+        keys = []
+        for j in xrange(valid.shape[1]):
+            key = valid[:, j].tostring()
+            if key not in groups:
+                groups[key] = []
+                keys.append(key)
+
+            groups[key].append(j)
+
+        return [(valid[:, groups[key][0]], np.array(groups[key]))
+                for key in keys]
+
+#-------------------------------------------------------------------------------
+# Calculations
+
+    @cache_readonly
+    def _results_raw(self):
+        if self._is_moving:
+            return self._calc_moving()
+        else:
+            return self._calc_full_sample()
+
+    def _calc_full_sample(self):
+        x_values = self._x.values
+        y_values = self._y.values
+        K = x_values.shape[1]
+        M = y_values.shape[1]
+
+        beta = _nan_array((M, K))
+        xx_inv_diag = _nan_array((M, K))
+        nobs = _nan_array(M)
+        df = _nan_array(M)
+        sse = _nan_array(M)
+        tss = _nan_array(M)
+
+        for mask, locs in self._groups:
+            X = x_values[mask]
+            Y = y_values[mask][:, locs]
+
+            if len(X) == 0:
+                continue
+
+            xx = np.dot(X.T, X)
+            coefs = math.solve(xx, np.dot(X.T, Y))
+            resid = Y - np.dot(X, coefs)
+
+            beta[locs] = coefs.T
+            xx_inv_diag[locs] = np.diag(math.inv(xx))
+            nobs[locs] = len(X)
+            df[locs] = math.rank(X)
+            sse[locs] = (resid ** 2).sum(0)
+
+            if self._intercept:
+                tss[locs] = ((Y - Y.mean(0)) ** 2).sum(0)
+            else:
+                tss[locs] = (Y ** 2).sum(0)
+
+        return {'beta' : beta, 'xx_inv_diag' : xx_inv_diag, 'nobs' : nobs,
+                'df' : df, 'sse' : sse, 'tss' : tss}
+
+    def _calc_moving(self):
+        x_values = self._x.values
+        y_values = self._y.values
+        N, K = x_values.shape
+        M = y_values.shape[1]
+
+        window = self._window if self._is_rolling else None
+        min_obs = max(self._min_periods, K + 1)
+        block = max(1, _BLOCK_SIZE // (N * K))
+
+        # coefficients are targets x dates x regressors
+        beta = _nan_array((M, N, K))
+        xx_inv_diag = _nan_array((M, N, K))
+        nobs = _nan_array((N, M))
+        df = _nan_array((N, M))
+        sse = _nan_array((N, M))
+        tss = _nan_array((N, M))
+
+        for mask, locs in self._groups:
+            counts = _window_sums(mask.cumsum(), np.arange(N), window)
+            dates = (mask & (counts >= min_obs)).nonzero()[0]
+
+            if len(dates) == 0:
+                continue
+
+            X = np.where(mask[:, None], x_values, 0)
+            cross = X[:, :, None] * X[:, None, :]
+            xx = _window_sums(cross.cumsum(0, out=cross), dates, window)
+            n = counts[dates]
+
+            ranks = np.empty(len(dates))
+            ranks[:] = K
+            for i in (~math.posdef_batch(xx)).nonzero()[0]:
+                end = dates[i] + 1
+                start = 0 if window is None else max(end - window, 0)
+                ranks[i] = math.rank(x_values[start:end][mask[start:end]])
+
+            cells = np.ix_(dates, locs)
+            nobs[cells] = n[:, None]
+            df[cells] = ranks[:, None]
+
+            xx_inv = math.inv_batch(xx)
+            diag = xx_inv.reshape((len(dates), K * K))[:, ::K + 1]
+            xx_inv_diag[np.ix_(locs, dates)] = diag
+
+            for j in xrange(0, len(locs), block):
+                chunk = locs[j : j + block]
+                Y = np.where(mask[:, None], y_values[:, chunk], 0)
+
+                xy = (X[:, :, None] * Y[:, None, :]).cumsum(0)
+                xy = _window_sums(xy, dates, window)
+                sum_y = _window_sums(Y.cumsum(0), dates, window)
+                sum_yy = _window_sums((Y * Y).cumsum(0), dates, window)
+
+                # n_dates x K x n_targets
+                coefs = math.solve_batch(xx, xy)
+
+                cells = np.ix_(dates, chunk)
+                beta[np.ix_(chunk, dates)] = coefs.transpose((2, 0, 1))
+                sse[cells] = sum_yy - (coefs * xy).sum(1)
+
+                if self._intercept:
+                    tss[cells] = sum_yy - sum_y ** 2 / n[:, None]
+                else:
+                    tss[cells] = sum_yy
+
+        return {'beta' : beta, 'xx_inv_diag' : xx_inv_diag, 'nobs' : nobs,
+                'df' : df, 'sse' : sse, 'tss' : tss}
+
+    def _per_target(self, stat):
+        """Broadcasts a statistic against the coefficients"""
+        if self._is_moving:
+            return stat.T[:, :, None]
+        else:
+            return stat[:, None]
+
+    @cache_readonly
+    def _beta_raw(self):
+        return self._results_raw['beta']
+
+    @cache_readonly
+    def _nobs_raw(self):
+        return self._results_raw['nobs']
+
+    @cache_readonly
+    def _df_raw(self):
+        return self._results_raw['df']
+
+    @cache_readonly
+    def _df_resid_raw(self):
+        return self._nobs_raw - self._df_raw
+
+    @cache_readonly
+    def _rmse_raw(self):
+        return np.sqrt(self._results_raw['sse'] / self._df_resid_raw)
+
+    @cache_readonly
+    def _r2_raw(self):
+        return 1 - self._results_raw['sse'] / self._results_raw['tss']
+
+    @cache_readonly
+    def _r2_adj_raw(self):
+        factors = (self._nobs_raw - 1) / self._df_resid_raw
+        return 1 - (1 - self._r2_raw) * factors
+
+    @cache_readonly
+    def _std_err_raw(self):
+        var_resid = self._per_target(self._rmse_raw ** 2)
+        return np.sqrt(self._results_raw['xx_inv_diag'] * var_resid)
+
+    @cache_readonly
+    def _t_stat_raw(self):
+        return self._beta_raw / self._std_err_raw
+
+    @cache_readonly
+    def _p_value_raw(self):
+        from scipy.stats import t
+
+        df_resid = self._per_target(self._df_resid_raw)
+        return 2 * t.sf(np.fabs(self._t_stat_raw), df_resid)
+
+#-------------------------------------------------------------------------------
+# "Public" results
+
+    def _wrap_coefs(self, values):
+        if self._is_moving:
+            return WidePanel(values, self._y.columns, self._index,
+                             self._x.columns)
+        else:
+            return DataMatrix(values, index=self._y.columns,
+                              columns=self._x.columns)
+
+    def _wrap_stat(self, values):
+        if self._is_moving:
+            return DataMatrix(values, index=self._index,
+                              columns=self._y.columns)
+        else:
+            return Series(values, index=self._y.columns)
+
+    @cache_readonly
+    def beta(self):
+        """Returns the betas of each target."""
+        return self._wrap_coefs(self._beta_raw)
+
+    @cache_readonly
+    def std_err(self):
+        """Returns the standard errors of the betas."""
+        return self._wrap_coefs(self._std_err_raw)
+
+    @cache_readonly
+    def t_stat(self):
+        """Returns the t-stats of the betas."""
+        return self._wrap_coefs(self._t_stat_raw)
+
+    @cache_readonly
+    def p_value(self):
+        """Returns the p values of the betas."""
+        return self._wrap_coefs(self._p_value_raw)
+
+    @cache_readonly
+    def nobs(self):
+        """Returns the number of observations of each regression."""
+        return self._wrap_stat(self._nobs_raw)
+
+    @cache_readonly
+    def df(self):
+        """Returns the degrees of freedom (rank of X)."""
+        return self._wrap_stat(self._df_raw)
+
+    @cache_readonly
+    def df_resid(self):
+        """Returns the residual degrees of freedom."""
+        return self._wrap_stat(self._df_resid_raw)
+
+    @cache_readonly
+    def r2(self):
+        """Returns the r-squared values."""
+        return self._wrap_stat(self._r2_raw)
+
+    @cache_readonly
+    def r2_adj(self):
+        """Returns the adjusted r-squared values."""
+        return self._wrap_stat(self._r2_adj_raw)
+
+    @cache_readonly
+    def rmse(self):
+        """Returns the rmse values."""
+        return self._wrap_stat(self._rmse_raw)
+
+    @cache_readonly
+    def y_fitted(self):
+        """Returns the fitted y values (full-sample only)."""
+        if self._is_moving:
+            raise Exception('y_fitted not supported for rolling/expanding '
+                            'regressions')
+
+        values = np.dot(self._x.values, self._beta_raw.T)
+        values[np.isnan(self._y.values)] = np.NaN
+        return DataMatrix(values, index=self._index, columns=self._y.columns)
+
+    @cache_readonly
+    def resid(self):
+        """Returns the residuals (full-sample only)."""
+        return self._y - self.y_fitted
+
+_BLOCK_SIZE = 2 ** 22
+
+def _nan_array(shape):
+    result = np.empty(shape, dtype=float)
+    result.fill(np.NaN)
+    return result
+
+def _nw_moments(x, y, beta):
+    """
+    Returns the arguments for math.newey_west_batch for the residuals of the
+    regressions of y on x with coefficients beta (N x K), one row per window
+    """
+    xv = x.values
+    yv = _y_converter(y)
+
+    # x_t (y_t - x_t' b) = x_t ([y_t x_t'] [1 -b']')
+    w = np.column_stack((yv, xv))
+    coefs = np.column_stack((np.ones(len(beta)), -beta))
+
+    return xv, w, coefs
+
+def _window_sums(cum, indices, window=None):
+    """
+    Sums over the windows ending at the passed locations, from cumulative
+    sums along the first axis. window=None for expanding windows
+    """
+    result = cum[indices]
+
+    if window is not None:
+        prior = indices - window
+        have_prior = prior >= 0
+        result[have_prior] -= cum[prior[have_prior]]
+
+    return result
+
 def _safe_update(d, other):
     """
     Combine dictionaries with non-overlapping keys
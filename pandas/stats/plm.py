@@ -10,10 +10,11 @@ import warnings
 
 import numpy as np
 
-from pandas.core.panel import WidePanel, LongPanel
+from pandas.core.index import Index
+from pandas.core.panel import WidePanel, LongPanel, DummyPanel
 from pandas.core.matrix import DataFrame, DataMatrix
 from pandas.core.series import Series
-from pandas.stats.ols import OLS, MovingOLS
+from pandas.stats.ols import OLS, MovingOLS, _nw_moments
 from pandas.util.decorators import cache_readonly
 import pandas.stats.common as common
 import pandas.stats.math as math
@@ -110,6 +111,12 @@ class PanelOLS(OLS):
         (x, x_filtered, y, weights,
          weights_filt, cat_mapping) = self._filter_data()
 
+        self._entity_labels = None
+        if self._can_demean_entities:
+            result = self._demean_entities(x, x_filtered, y)
+            if result is not None:
+                return result
+
         self.log('Adding dummies to X variables')
         x = self._add_dummies(x, cat_mapping)
 
@@ -141,6 +148,76 @@ class PanelOLS(OLS):
 
         return x, x_regressor, x_filtered, y, y_regressor
 
+    @property
+    def _can_demean_entities(self):
+        """
+        Whether entity fixed effects can be obtained by within transformation
+        rather than by a dummy column per entity
+        """
+        return (self._entity_effects and not self._time_effects
+                and not self._x_effects and self._weights is None
+                and self._cluster is None and self._nw_lags is None)
+
+    def _demean_entities(self, x, x_filtered, y):
+        """
+        Entity fixed effects by within transformation: the entity-demeaned y
+        is regressed on the entity-demeaned x, and the coefficients of the
+        entity dummies (and intercept) are recovered from the entity means,
+        so that no dummy column is ever materialized.
+
+        Returns None if the dummies can't be avoided, i.e. if some entity has
+        no observations or the demeaned x is rank deficient
+        """
+        entities = x.minor_axis
+        labels = x.index.minor_labels
+
+        counts = np.bincount(labels)
+        if len(counts) < len(entities) or (counts == 0).any():
+            return None
+
+        x_values = x.values
+        y_values = y.values[:, 0]
+
+        x_means = np.empty((len(entities), len(x.items)))
+        for j in xrange(len(x.items)):
+            x_means[:, j] = np.bincount(labels, weights=x_values[:, j])
+        x_means /= counts[:, None]
+        y_means = np.bincount(labels, weights=y_values) / counts
+
+        x_demeaned = x_values - x_means.take(labels, axis=0)
+        y_demeaned = y_values - y_means.take(labels)
+
+        if math.rank(x_demeaned) < len(x.items):
+            return None
+
+        self.log('-- Demeaning entity fixed effects')
+
+        self._entity_labels = labels
+        self._entity_counts = counts
+        self._entity_x_means = x_means
+        self._entity_y_means = y_means
+
+        dummy_items = self._entity_dummy_items(entities)
+        self._entity_dummy_locs = np.array([entities.indexMap[item]
+                                            for item in dummy_items])
+
+        if self._use_all_dummies:
+            self._entity_ref = None
+        else:
+            self._entity_ref = entities.indexMap[
+                (entities - dummy_items)[0]]
+
+        self._coef_names = Index(list(x.items) +
+                                 ['FE_%s' % item for item in dummy_items])
+        if self._entity_ref is not None:
+            self._coef_names = Index(list(self._coef_names) + ['intercept'])
+
+        x_regressor = LongPanel(x_demeaned, x.items, x.index)
+        y_regressor = LongPanel(y_demeaned.reshape((len(y_demeaned), 1)),
+                                y.items, y.index)
+
+        return x, x_regressor, x_filtered, y, y_regressor
+
     def _filter_data(self):
         """
 
@@ -242,24 +319,32 @@ class PanelOLS(OLS):
         dummies = panel.get_axis_dummies(axis='minor')
 
         if not self._use_all_dummies:
-            if 'entity' in self._dropped_dummies:
-                to_exclude = str(self._dropped_dummies.get('entity'))
-            else:
-                to_exclude = dummies.items[0]
-
-            if to_exclude not in dummies.items:
-                raise Exception('%s not in %s' % (to_exclude,
-                                                  dummies.items))
-
-            self.log('-- Excluding dummy for entity: %s' % to_exclude)
-
-            dummies = dummies.filter(dummies.items - [to_exclude])
+            dummies = dummies.filter(self._entity_dummy_items(dummies.items))
 
         dummies = dummies.addPrefix('FE_')
         panel = panel.leftJoin(dummies)
 
         return panel
 
+    def _entity_dummy_items(self, entities):
+        """
+        Returns the entities getting a fixed effect dummy, in column order
+        """
+        if self._use_all_dummies:
+            return entities
+
+        if 'entity' in self._dropped_dummies:
+            to_exclude = str(self._dropped_dummies.get('entity'))
+        else:
+            to_exclude = entities[0]
+
+        if to_exclude not in entities:
+            raise Exception('%s not in %s' % (to_exclude, entities))
+
+        self.log('-- Excluding dummy for entity: %s' % to_exclude)
+
+        return entities.intersection(entities - [to_exclude])
+
     def _add_categorical_dummies(self, panel, cat_mappings):
         """
         Add categorical dummies to panel
@@ -323,10 +408,47 @@ class PanelOLS(OLS):
 
         beta, _, _, _ = np.linalg.lstsq(X, Y)
 
+        if self._entity_labels is not None:
+            effects = (self._entity_y_means -
+                       np.dot(self._entity_x_means, beta))
+            beta = self._add_entity_coefs(beta, effects)
+
         return beta
 
+    @cache_readonly
+    def _entity_effects_raw(self):
+        """
+        Returns the total fixed effect (intercept included) of each entity
+        """
+        beta = self._beta_raw[:len(self._x.items)]
+        return self._entity_y_means - np.dot(self._entity_x_means, beta)
+
+    def _add_entity_coefs(self, beta, effects):
+        """
+        Appends the dummy and intercept coefficients corresponding to the
+        entity effects to the beta of the demeaned regression
+        """
+        coefs = effects.take(self._entity_dummy_locs)
+        if self._entity_ref is None:
+            return np.concatenate((beta, coefs))
+
+        ref = effects[self._entity_ref]
+        return np.concatenate((beta, coefs - ref, [ref]))
+
+    def _fitted(self, x):
+        """Returns the fitted values for the passed x LongPanel."""
+        if self._entity_labels is None:
+            return np.dot(x.values, self._beta_raw)
+
+        K = len(x.items)
+        effects = self._entity_effects_raw.take(x.index.minor_labels)
+        return np.dot(x.values, self._beta_raw[:K]) + effects
+
     @cache_readonly
     def beta(self):
+        if self._entity_labels is not None:
+            return Series(self._beta_raw, index=self._coef_names)
+
         return Series(self._beta_raw, index=self._x.items)
 
     @cache_readonly
@@ -359,14 +481,16 @@ class PanelOLS(OLS):
         if self._time_effects:
             df += self._total_times
 
+        if self._entity_labels is not None:
+            df += len(self._entity_counts)
+
         return df
 
     @cache_readonly
     def _r2_raw(self):
         Y = self._y.values.squeeze()
-        X = self._x.values
 
-        resid = Y - np.dot(X, self._beta_raw)
+        resid = Y - self._fitted(self._x)
 
         SSE = (resid ** 2).sum()
         SST = ((Y - np.mean(Y)) ** 2).sum()
@@ -383,8 +507,7 @@ class PanelOLS(OLS):
     @cache_readonly
     def _resid_raw(self):
         Y = self._y.values.squeeze()
-        X = self._x.values
-        return Y - np.dot(X, self._beta_raw)
+        return Y - self._fitted(self._x)
 
     @cache_readonly
     def resid(self):
@@ -393,15 +516,17 @@ class PanelOLS(OLS):
     @cache_readonly
     def _rmse_raw(self):
         """Returns the raw rmse values."""
-        X = self._x.values
         Y = self._y.values.squeeze()
 
-        resid = Y - np.dot(X, self._beta_raw)
+        resid = Y - self._fitted(self._x)
         ss = (resid ** 2).sum()
         return np.sqrt(ss / (self._nobs - self._df_raw))
 
     @cache_readonly
     def _var_beta_raw(self):
+        if self._entity_labels is not None:
+            return self._var_beta_entity_effects()
+
         cluster_axis = None
         if self._cluster == common.TIME:
             cluster_axis = 0
@@ -420,10 +545,56 @@ class PanelOLS(OLS):
                                self._rmse_raw, cluster_axis, self._nw_lags,
                                self._nobs, self._df_raw, self._nw_overlap)
 
+    def _var_beta_entity_effects(self):
+        """
+        Covariance of all the coefficients, dummies included, when the entity
+        effects were demeaned. It is built blockwise from the inverse of the
+        demeaned X'X: writing a for the vector of the entity effects,
+
+        var(b) = s^2 (X'X)^-1
+        cov(a, b) = -xbar var(b)
+        var(a) = s^2 diag(1 / counts) + xbar var(b) xbar'
+
+        where xbar are the entity means of x
+        """
+        X = self._x_trans_raw
+        var_b = math.inv(np.dot(X.T, X)) * (self._rmse_raw ** 2)
+
+        x_means = self._entity_x_means
+        cov_ab = -np.dot(x_means, var_b)
+        var_a = -np.dot(cov_ab, x_means.T)
+        var_a.flat[::len(var_a) + 1] += self._rmse_raw ** 2 / self._entity_counts
+
+        locs = self._entity_dummy_locs
+        ref = self._entity_ref
+
+        if ref is None:
+            cov_coefs_b = cov_ab.take(locs, axis=0)
+            var_coefs = var_a.take(locs, axis=0).take(locs, axis=1)
+        else:
+            # the dummy coefficients are a - a[ref], the intercept a[ref]
+            locs = np.concatenate((locs, [ref]))
+            cov_coefs_b = cov_ab.take(locs, axis=0) - cov_ab[ref]
+            cov_coefs_b[-1] = cov_ab[ref]
+
+            var_coefs = var_a.take(locs, axis=0).take(locs, axis=1)
+            cov_ref = var_a[ref].take(locs)
+            var_coefs -= cov_ref[:, None]
+            var_coefs -= cov_ref[None, :]
+            var_coefs += var_a[ref, ref]
+
+            var_coefs[-1, :-1] = cov_ref[:-1] - var_a[ref, ref]
+            var_coefs[:-1, -1] = var_coefs[-1, :-1]
+            var_coefs[-1, -1] = var_a[ref, ref]
+
+        top = np.concatenate((var_b, cov_coefs_b.T), axis=1)
+        bottom = np.concatenate((cov_coefs_b, var_coefs), axis=1)
+        return np.concatenate((top, bottom), axis=0)
+
     @cache_readonly
     def _y_fitted_raw(self):
         """Returns the raw fitted y values."""
-        return np.dot(self._x_filtered.values, self._beta_raw)
+        return self._fitted(self._x_filtered)
 
     @cache_readonly
     def y_fitted(self):
@@ -447,7 +618,7 @@ class PanelOLS(OLS):
         o.f_test(['1*x1+2*x2=0','1*x3=0'])
         """
 
-        x_names = self._x.items
+        x_names = self.beta.index
 
         R = []
         r = []
@@ -520,7 +691,7 @@ def _convertDummies(dummies, mapping):
             # renames the dummies if a conversion dict is provided
             new_items.append(mapping[int(item)])
 
-    dummies = LongPanel(dummies.values, new_items, dummies.index)
+    dummies = DummyPanel(dummies.labels, new_items, dummies.index)
 
     return dummies
 
@@ -630,6 +801,10 @@ class MovingPanelOLS(MovingOLS, PanelOLS):
 
         self._min_obs = min_obs
 
+    @property
+    def _can_demean_entities(self):
+        return False
+
     @cache_readonly
     def resid(self):
         return self._unstack_y(self._resid_raw)
@@ -693,37 +868,44 @@ class MovingPanelOLS(MovingOLS, PanelOLS):
         beta = self._beta_raw
         df = self._df_raw
         window = self._window
+        indices = self._valid_indices
 
-        if not self._time_effects:
-            # Non-transformed X
-            cum_xx = self._cum_xx(x)
+        if self._time_effects:
+            xx = []
+            for i in indices:
+                if self._is_rolling and i >= window:
+                    prior_date = dates[i - window + 1]
+                else:
+                    prior_date = dates[0]
 
-        results = []
-        for n, i in enumerate(self._valid_indices):
-            if self._is_rolling and i >= window:
-                prior_date = dates[i - window + 1]
-            else:
-                prior_date = dates[0]
+                date = dates[i]
 
-            date = dates[i]
+                xx.append(_xx_time_effects(x.truncate(prior_date, date),
+                                           y.truncate(prior_date, date)))
 
-            x_slice = x.truncate(prior_date, date)
-            y_slice = y.truncate(prior_date, date)
+            xx = np.array(xx)
+        else:
+            # Non-transformed X
+            xx = self._window_sums(self._x_cross, indices)
 
-            if self._time_effects:
-                xx = _xx_time_effects(x_slice, y_slice)
-            else:
-                xx = cum_xx[i]
-                if self._is_rolling and i >= window:
-                    xx = xx - cum_xx[i - window]
+        xx_inv = math.inv_batch(xx)
 
-            result = _var_beta_panel(y_slice, x_slice, beta[n], xx, rmse[n],
-                                    cluster_axis, self._nw_lags,
-                                    nobs[n], df[n], self._nw_overlap)
+        if cluster_axis is None and self._nw_lags is None:
+            return xx_inv * (rmse ** 2)[:, None, None]
 
-            results.append(result)
+        xv, w, coefs = _nw_moments(x, y, beta)
+        starts, ends = self._window_rows(x, indices)
 
-        return np.array(results)
+        if cluster_axis is None:
+            xeps = math.newey_west_batch(xv, w, coefs, starts, ends,
+                                         self._nw_lags, nobs, df,
+                                         self._nw_overlap)
+        else:
+            clusters = _cluster_labels(x, cluster_axis)
+            xeps = math.newey_west_batch(xv, w, coefs, starts, ends, 0,
+                                         nobs, df, clusters=clusters)
+
+        return math.dot_batch(xx_inv, math.dot_batch(xeps, xx_inv))
 
     @cache_readonly
     def _resid_raw(self):
@@ -801,6 +983,9 @@ class NonPooledPanelOLS(object):
         FULL_SAMPLE, ROLLING, EXPANDING.  FULL_SAMPLE by default.
     window : int
         size of window (for rolling/expanding OLS)
+    n_jobs : int, default 1
+        If greater than one, the per-entity regressions are computed in a pool
+        of n_jobs processes. The results are identical to the serial ones
     """
 
     ATTRIBUTES = [
@@ -826,38 +1011,79 @@ class NonPooledPanelOLS(object):
 
     def __init__(self, y, x, window_type=common.FULL_SAMPLE, window=None,
                  min_periods=None, intercept=True, nw_lags=None,
-                 nw_overlap=False):
+                 nw_overlap=False, n_jobs=1):
 
         for attr in self.ATTRIBUTES:
             setattr(self.__class__, attr, create_ols_attr(attr))
 
-        results = {}
-
-        for entity in y:
-            entity_y = y[entity]
+        kwds = dict(window_type=window_type, window=window,
+                    min_periods=min_periods, intercept=intercept,
+                    nw_lags=nw_lags, nw_overlap=nw_overlap)
 
-            entity_x = {}
-            for x_var in x:
-                entity_x[x_var] = x[x_var][entity]
+        entities = list(y)
 
-            from pandas.stats.interface import ols
-            results[entity] = ols(y=entity_y,
-                                  x=entity_x,
-                                  window_type=window_type,
-                                  window=window,
-                                  min_periods=min_periods,
-                                  intercept=intercept,
-                                  nw_lags=nw_lags,
-                                  nw_overlap=nw_overlap)
+        if n_jobs is None or n_jobs <= 1 or len(entities) < 2:
+            results = dict(_entity_ols(y, x, entity, kwds)
+                           for entity in entities)
+        else:
+            results = _pool_entity_ols(y, x, entities, kwds, n_jobs)
 
         self.results = results
 
+def _entity_ols(y, x, entity, kwds):
+    from pandas.stats.interface import ols
 
-def _var_beta_panel(y, x, beta, xx, rmse, cluster_axis,
-                   nw_lags, nobs, df, nw_overlap):
+    entity_x = {}
+    for x_var in x:
+        entity_x[x_var] = x[x_var][entity]
+
+    return entity, ols(y=y[entity], x=entity_x, **kwds)
+
+# data shared by the workers of a pool, set once per process
+_pool_data = None
+
+def _init_pool_worker(y, x, kwds):
+    global _pool_data
+    _pool_data = y, x, kwds
+
+def _entity_ols_chunk(entities):
+    y, x, kwds = _pool_data
+
+    pieces = []
+    for entity in entities:
+        entity, result = _entity_ols(y, x, entity, kwds)
+        # compute the statistics here rather than in the parent
+        result._results
+        pieces.append((entity, result))
+
+    return pieces
+
+def _pool_entity_ols(y, x, entities, kwds, n_jobs):
+    from multiprocessing import Pool
+
+    # the data are handed to each worker once, at startup (where fork is
+    # available, the children simply share the parent's memory), so only the
+    # entity names and the fitted models go through the task queue
+    bounds = np.linspace(0, len(entities), n_jobs + 1).astype(int)
+    tasks = [entities[start:end]
+             for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
 
-    from pandas.core.panel import LongPanel, group_agg
+    pool = Pool(n_jobs, initializer=_init_pool_worker, initargs=(y, x, kwds))
+    try:
+        pieces = pool.map(_entity_ols_chunk, tasks)
+    finally:
+        pool.close()
+        pool.join()
 
+    results = {}
+    for piece in pieces:
+        results.update(piece)
+
+    return results
+
+
+def _var_beta_panel(y, x, beta, xx, rmse, cluster_axis,
+                   nw_lags, nobs, df, nw_overlap):
     xx_inv = math.inv(xx)
 
     if cluster_axis is None:
@@ -871,25 +1097,22 @@ def _var_beta_panel(y, x, beta, xx, rmse, cluster_axis,
 
             return np.dot(xx_inv, np.dot(xeps, xx_inv))
     else:
-        Xb = np.dot(x.values, beta).reshape((len(x.values), 1))
-        resid = LongPanel(y.values - Xb, ['resid'], y.index)
-
-        if cluster_axis == 1:
-            x = x.swapaxes()
-            resid = resid.swapaxes()
+        # the lags don't enter, the moment conditions of each cluster are
+        # summed into a single row
+        xv, w, coefs = _nw_moments(x, y, beta[None, :])
+        xox = math.newey_west_batch(xv, w, coefs, [0], [len(xv)], 0, nobs, df,
+                                    clusters=_cluster_labels(x, cluster_axis))
 
-        m = group_agg(x.values * resid.values, x.index._bounds,
-                      lambda x: np.sum(x, axis=0))
+        return np.dot(xx_inv, np.dot(xox[0], xx_inv))
 
-        if nw_lags is None:
-            nw_lags = 0
-
-        xox = 0
-        for i in range(len(x.major_axis)):
-            xox += math.newey_west(m[i : i + 1], nw_lags,
-                                   nobs, df, nw_overlap)
-
-        return np.dot(xx_inv, np.dot(xox, xx_inv))
+def _cluster_labels(x, cluster_axis):
+    """
+    Cluster of each row of the LongPanel x, by time (0) or entity (1)
+    """
+    if cluster_axis == 0:
+        return x.index.major_labels
+    else:
+        return x.index.minor_labels
 
 def _xx_time_effects(x, y):
     """
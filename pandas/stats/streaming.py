@@ -0,0 +1,309 @@
+"""
+Stateful accumulators for computing moving moments incrementally, one row
+(e.g. a cross-section of a DataMatrix) at a time, in O(K) per update
+"""
+from __future__ import division
+
+import numpy as np
+
+from pandas.core.api import DataFrame, Series
+from pandas.stats.moments import _get_center_of_mass
+
+__all__ = ['EWMState', 'RollingState']
+
+class _MomentState(object):
+    """
+    Common plumbing: the state is a set of length-K arrays, allocated on the
+    first update, and results are wrapped in a Series if columns are known
+    """
+    columns = None
+
+    def _prep_values(self, values):
+        if isinstance(values, Series):
+            if self.columns is None:
+                self.columns = values.index
+            elif not values.index.equals(self.columns):
+                values = values.reindex(self.columns)
+
+            values = values.values
+
+        values = np.asarray(values, dtype=float)
+
+        if values.ndim == 0:
+            values = values.reshape(1)
+
+        return values
+
+    def _prep_history(self, arg):
+        if isinstance(arg, DataFrame):
+            self.columns = arg.columns
+            values = arg.values
+        elif isinstance(arg, Series):
+            values = arg.values.reshape((len(arg), 1))
+        else:
+            values = np.asarray(arg, dtype=float)
+            if values.ndim == 1:
+                values = values.reshape((len(values), 1))
+
+        return np.asarray(values, dtype=float)
+
+    def _wrap(self, result):
+        if self.columns is not None:
+            return Series(result, index=self.columns)
+
+        return result
+
+    def std(self):
+        return self._wrap(np.sqrt(self._var()))
+
+    def var(self):
+        return self._wrap(self._var())
+
+    def mean(self):
+        return self._wrap(self._mean())
+
+class EWMState(_MomentState):
+    """
+    Exponentially weighted mean and variance of a stream of rows, matching
+    the results of ewma / ewmvar on the full history
+
+    Parameters
+    ----------
+    com : float, optional
+        Center of mass
+    span : float, optional
+        Specify decay in terms of span, com = (span - 1) / 2
+    min_periods : int, default 0
+        Number of rows after the first observation of a column before its
+        moments are reported
+    bias : boolean, default False
+        Use a standard estimation bias correction for the variance
+    columns : Index, optional
+        Labels of the values passed to update. Inferred from the first
+        Series or frame passed if not given
+
+    Notes
+    -----
+    The state is only a few arrays of length K, so it can be checkpointed
+    with pickle and restored later to resume the stream
+    """
+    def __init__(self, com=None, span=None, min_periods=0, bias=False,
+                 columns=None):
+        self.com = _get_center_of_mass(com, span)
+        self.min_periods = min_periods
+        self.bias = bias
+        self.columns = columns
+
+        # EW sums of x, x * x and of the weights, and number of rows since
+        # the first observation of each column
+        self._sum_x = None
+        self._sum_xx = None
+        self._sum_w = None
+        self._nrows = None
+
+    @classmethod
+    def from_history(cls, arg, com=None, span=None, min_periods=0,
+                     bias=False):
+        """
+        Initialize state from historical data in one vectorized pass
+
+        Parameters
+        ----------
+        arg : DataFrame, DataMatrix, Series or ndarray
+        """
+        state = cls(com=com, span=span, min_periods=min_periods, bias=bias)
+        state.seed(arg)
+        return state
+
+    @property
+    def _oldw(self):
+        return self.com / (1. + self.com)
+
+    def seed(self, arg):
+        """
+        Replace the state with that of the provided history
+        """
+        values = self._prep_history(arg)
+        N = len(values)
+
+        valid = np.isfinite(values)
+        values = np.where(valid, values, 0)
+
+        # each observation is discounted once per later observation
+        later = valid[::-1].cumsum(0)[::-1] - valid
+        weights = (self._oldw ** later) * valid
+
+        self._sum_x = (weights * values).sum(0)
+        self._sum_xx = (weights * values * values).sum(0)
+        self._sum_w = weights.sum(0)
+
+        has_obs = valid.any(0)
+        self._nrows = np.where(has_obs, N - valid.argmax(0), 0)
+
+    def update(self, values):
+        """
+        Add a row of observations (length-K ndarray or Series), NaN for
+        missing
+
+        Returns
+        -------
+        self, so the current moments are e.g. state.update(row).mean()
+        """
+        values = self._prep_values(values)
+
+        if self._sum_x is None:
+            self._sum_x = np.zeros(len(values))
+            self._sum_xx = np.zeros(len(values))
+            self._sum_w = np.zeros(len(values))
+            self._nrows = np.zeros(len(values), dtype=int)
+
+        valid = np.isfinite(values)
+        values = np.where(valid, values, 0)
+
+        # missing observations leave the sums untouched
+        oldw = np.where(valid, self._oldw, 1.)
+        self._sum_x = oldw * self._sum_x + values
+        self._sum_xx = oldw * self._sum_xx + values * values
+        self._sum_w = oldw * self._sum_w + valid
+
+        self._nrows += (self._nrows > 0) | valid
+
+        return self
+
+    def _mask(self, result):
+        return np.where(self._nrows > self.min_periods, result, np.NaN)
+
+    def _mean(self):
+        return self._mask(self._sum_x / self._sum_w)
+
+    def _var(self):
+        mean = self._sum_x / self._sum_w
+        result = self._sum_xx / self._sum_w - mean * mean
+
+        if not self.bias:
+            result *= (1. + 2. * self.com) / (2. * self.com)
+
+        return self._mask(result)
+
+class RollingState(_MomentState):
+    """
+    Moving sum, mean and variance over the last window rows of a stream,
+    matching rolling_sum / rolling_mean / rolling_var on the full history
+
+    Parameters
+    ----------
+    window : int
+        Number of rows in the moving window
+    min_periods : int, optional
+        Minimum number of observations in window required to have a value,
+        defaults to window
+    columns : Index, optional
+        Labels of the values passed to update. Inferred from the first
+        Series or frame passed if not given
+
+    Notes
+    -----
+    The last window rows are kept in a ring buffer, so each update costs
+    O(K) regardless of the window length. Can be checkpointed with pickle
+    """
+    def __init__(self, window, min_periods=None, columns=None):
+        self.window = window
+
+        if min_periods is None:
+            min_periods = window
+
+        self.min_periods = min_periods
+        self.columns = columns
+
+        self._buffer = None
+        self._pos = 0
+        self._sum_x = None
+        self._sum_xx = None
+        self._nobs = None
+
+    @classmethod
+    def from_history(cls, arg, window, min_periods=None):
+        """
+        Initialize state from the tail of historical data
+
+        Parameters
+        ----------
+        arg : DataFrame, DataMatrix, Series or ndarray
+        """
+        state = cls(window, min_periods=min_periods)
+        state.seed(arg)
+        return state
+
+    def _allocate(self, K):
+        self._buffer = np.empty((self.window, K), dtype=float)
+        self._buffer.fill(np.NaN)
+        self._pos = 0
+        self._sum_x = np.zeros(K)
+        self._sum_xx = np.zeros(K)
+        self._nobs = np.zeros(K, dtype=int)
+
+    def seed(self, arg):
+        """
+        Replace the state with that of the provided history
+        """
+        values = self._prep_history(arg)[-self.window:]
+        self._allocate(values.shape[1])
+
+        self._buffer[:len(values)] = values
+        self._pos = len(values) % self.window
+
+        valid = np.isfinite(values)
+        values = np.where(valid, values, 0)
+        self._sum_x = values.sum(0)
+        self._sum_xx = (values * values).sum(0)
+        self._nobs = valid.sum(0)
+
+    def update(self, values):
+        """
+        Add a row of observations (length-K ndarray or Series), NaN for
+        missing. The oldest row drops out of the window
+
+        Returns
+        -------
+        self, so the current moments are e.g. state.update(row).mean()
+        """
+        values = self._prep_values(values)
+
+        if self._buffer is None:
+            self._allocate(len(values))
+
+        prev = self._buffer[self._pos]
+        valid = np.isfinite(prev)
+        prev = np.where(valid, prev, 0)
+        self._sum_x -= prev
+        self._sum_xx -= prev * prev
+        self._nobs -= valid
+
+        self._buffer[self._pos] = values
+        self._pos = (self._pos + 1) % self.window
+
+        valid = np.isfinite(values)
+        values = np.where(valid, values, 0)
+        self._sum_x += values
+        self._sum_xx += values * values
+        self._nobs += valid
+
+        return self
+
+    def _mask(self, result):
+        return np.where(self._nobs >= self.min_periods, result, np.NaN)
+
+    def count(self):
+        return self._wrap(self._nobs.astype(float))
+
+    def sum(self):
+        return self._wrap(self._mask(self._sum_x))
+
+    def _mean(self):
+        return self._mask(self._sum_x / self._nobs)
+
+    def _var(self):
+        nobs = self._nobs
+        result = ((nobs * self._sum_xx - self._sum_x * self._sum_x) /
+                  (nobs * nobs - nobs))
+        return np.where(nobs >= max(2, self.min_periods), result, np.NaN)
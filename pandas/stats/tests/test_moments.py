@@ -1,17 +1,21 @@
 import unittest
 import nose
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from numpy.random import randn
 import numpy as np
 
-from pandas.core.api import Series, DataFrame, DataMatrix, DateRange
+from pandas.core.api import (Series, DataFrame, DataMatrix, DateRange,
+                             WidePanel)
 from pandas.util.testing import assert_almost_equal
 import pandas.core.datetools as datetools
 import pandas.stats.moments as moments
 
 N, K = 100, 10
 
+def _nanmean(x):
+    return x[np.isfinite(x)].mean()
+
 class TestMoments(unittest.TestCase):
 
     _nan_locs = np.arange(20, 40)
@@ -32,6 +36,17 @@ class TestMoments(unittest.TestCase):
         self.matrix = DataMatrix(randn(N, K), index=self.rng,
                                  columns=np.arange(K))
 
+    def test_conv_timerule(self):
+        # already at the frequency, left alone
+        for obj in (self.series, self.frame, self.matrix):
+            self.assert_(moments._conv_timerule(obj, 'WEEKDAY') is obj)
+
+        series = Series(self.arr, index=list(self.rng))
+        self.assert_(moments._conv_timerule(series, 'WEEKDAY') is series)
+
+        result = moments._conv_timerule(self.series[::2], 'WEEKDAY')
+        self.assertEquals(len(result), len(self.series) - 1)
+
     def test_rolling_sum(self):
         self._check_moment_func(moments.rolling_sum, np.sum)
 
@@ -53,6 +68,196 @@ class TestMoments(unittest.TestCase):
     def test_rolling_max(self):
         self._check_moment_func(moments.rolling_max, np.max)
 
+    def test_rolling_min_max_skiplist(self):
+        import pandas.lib.tseries as tseries
+
+        arr = randn(1000)
+        arr[::3] = np.NaN
+        arr[500:600] = np.NaN
+
+        for win, minp in [(1, 1), (10, 3), (50, 50), (2000, 10)]:
+            assert_almost_equal(tseries.roll_max(arr, win, minp),
+                                tseries.roll_max_skiplist(arr, win, minp))
+            assert_almost_equal(tseries.roll_min(arr, win, minp),
+                                tseries.roll_min_skiplist(arr, win, minp))
+
+    def test_rolling_apply(self):
+        def roll_mean(x, window, min_periods=None, time_rule=None):
+            return moments.rolling_apply(x, window,
+                                         lambda x: x[np.isfinite(x)].mean(),
+                                         min_periods=min_periods,
+                                         time_rule=time_rule)
+        self._check_moment_func(roll_mean, np.mean)
+
+    def test_rolling_apply_fast_path(self):
+        for minp in [None, 50]:
+            result = moments.rolling_apply(self.series, 50, np.median,
+                                           min_periods=minp)
+            expected = moments.rolling_median(self.series, 50)
+            assert_almost_equal(result, expected)
+
+        # the result does not depend on which callable is passed
+        for func in [np.sum, np.mean, np.median, np.max, np.min]:
+            for window, minp in [(50, None), (50, 50), (50, 25),
+                                 (datetools.BDay(10), 5)]:
+                result = moments.rolling_apply(self.series, window, func,
+                                               min_periods=minp)
+                expected = moments.rolling_apply(self.series, window,
+                                                 lambda x: func(x),
+                                                 min_periods=minp)
+                assert_almost_equal(result, expected)
+
+    def test_rolling_apply_pool(self):
+        arr = randn(moments._min_pool_length + 123)
+        arr[::7] = np.NaN
+
+        result = moments.rolling_apply(arr, 100, _nanmean, min_periods=10,
+                                       n_jobs=3)
+        expected = moments.rolling_apply(arr, 100, _nanmean, min_periods=10)
+        assert_almost_equal(result, expected)
+
+    def test_time_window(self):
+        # business day index: BDay(10) windows hold exactly 10 observations
+        for func in [moments.rolling_sum, moments.rolling_mean,
+                     moments.rolling_median, moments.rolling_max,
+                     moments.rolling_min, moments.rolling_std,
+                     moments.rolling_var, moments.rolling_skew,
+                     moments.rolling_kurt]:
+            result = func(self.series, datetools.BDay(10), min_periods=5)
+            expected = func(self.series, 10, min_periods=5)
+            assert_almost_equal(result, expected)
+
+            result = func(self.matrix, datetools.BDay(10))
+            self.assertEquals(type(result), DataMatrix)
+
+    def test_time_window_irregular(self):
+        seconds = np.cumsum(np.random.randint(1, 120, size=N))
+        dates = [datetime(2011, 1, 3, 9, 30) + timedelta(seconds=int(s))
+                 for s in seconds]
+        series = Series(self.arr, index=dates)
+
+        window = datetools.Minute(5)
+        result = moments.rolling_mean(series, window)
+        result2 = moments.rolling_apply(series, window, _nanmean)
+        count = moments.rolling_count(series, window)
+
+        for i, d in enumerate(dates):
+            chunk = series.truncate(d - timedelta(seconds=299), d).values
+            chunk = chunk[np.isfinite(chunk)]
+            self.assertEqual(count[i], len(chunk))
+
+            if len(chunk):
+                assert_almost_equal(result[i], chunk.mean())
+                assert_almost_equal(result2[i], chunk.mean())
+            else:
+                self.assert_(np.isnan(result[i]))
+
+        self.assertRaises(Exception, moments.rolling_mean, self.arr, window)
+
+    def test_expanding_funcs(self):
+        pairs = [(moments.expanding_sum, moments.rolling_sum),
+                 (moments.expanding_mean, moments.rolling_mean),
+                 (moments.expanding_median, moments.rolling_median),
+                 (moments.expanding_max, moments.rolling_max),
+                 (moments.expanding_min, moments.rolling_min),
+                 (moments.expanding_std, moments.rolling_std),
+                 (moments.expanding_var, moments.rolling_var)]
+
+        for exp_func, roll_func in pairs:
+            for minp in [1, 10]:
+                result = exp_func(self.arr, min_periods=minp)
+                expected = roll_func(self.arr, len(self.arr),
+                                     min_periods=minp)
+                assert_almost_equal(result, expected)
+
+            result = exp_func(self.arr, min_periods=None)
+            assert_almost_equal(result, exp_func(self.arr, min_periods=1))
+
+            series_result = exp_func(self.series)
+            self.assert_(isinstance(series_result, Series))
+            frame_result = exp_func(self.frame)
+            self.assertEquals(type(frame_result), DataFrame)
+            matrix_result = exp_func(self.matrix)
+            self.assertEquals(type(matrix_result), DataMatrix)
+
+        result = moments.expanding_count(self.series)
+        assert_almost_equal(result, moments.rolling_count(self.series, N))
+
+    def test_expanding_median_even_odd(self):
+        arr = randn(501)
+        arr[::4] = np.NaN
+        result = moments.expanding_median(arr)
+
+        for i in [0, 1, 2, 3, 10, 250, 499, 500]:
+            chunk = arr[:i + 1]
+            chunk = chunk[np.isfinite(chunk)]
+            if len(chunk):
+                assert_almost_equal(result[i], np.median(chunk))
+            else:
+                self.assert_(np.isnan(result[i]))
+
+    def test_expanding_cov_corr(self):
+        A = self.series
+        B = A + randn(len(A))
+
+        result = moments.expanding_cov(A, B)
+        assert_almost_equal(result[-1], np.cov(A[np.isfinite(A)],
+                                               B[np.isfinite(A)])[0, 1])
+
+        result = moments.expanding_corr(A, B)
+        assert_almost_equal(result[-1],
+                            np.corrcoef(A[np.isfinite(A)],
+                                        B[np.isfinite(A)])[0, 1])
+
+    def test_rolling_quantile(self):
+        try:
+            from scipy.stats import scoreatpercentile
+        except ImportError:
+            raise nose.SkipTest('no scipy')
+
+        for q in [0., .1, .5, .9, 1.]:
+            def scoreatquantile(x):
+                return scoreatpercentile(np.asarray(x), q * 100)
+
+            def roll_quantile(x, window, min_periods=None, time_rule=None):
+                return moments.rolling_quantile(x, window, q,
+                                                min_periods=min_periods,
+                                                time_rule=time_rule)
+
+            self._check_moment_func(roll_quantile, scoreatquantile)
+
+        self.assertRaises(Exception, moments.rolling_quantile, self.arr,
+                          50, 1.5)
+
+    def test_rolling_rank(self):
+        try:
+            from scipy.stats import percentileofscore
+        except ImportError:
+            raise nose.SkipTest('no scipy')
+
+        arr = np.round(randn(200) * 3)
+        arr[::7] = np.NaN
+
+        for kind in ['strict', 'weak', 'mean', 'rank']:
+            result = moments.rolling_rank(arr, 20, min_periods=5, kind=kind)
+
+            for i in range(30, 200):
+                chunk = arr[i - 19 : i + 1]
+                chunk = chunk[np.isfinite(chunk)]
+
+                if np.isnan(arr[i]):
+                    self.assert_(np.isnan(result[i]))
+                else:
+                    assert_almost_equal(result[i],
+                                        percentileofscore(chunk, arr[i],
+                                                          kind=kind))
+
+        frame_result = moments.rolling_rank(self.frame, 20)
+        self.assertEquals(type(frame_result), DataFrame)
+
+        self.assertRaises(Exception, moments.rolling_rank, arr, 20,
+                          kind='foo')
+
     def test_rolling_std(self):
         self._check_moment_func(moments.rolling_std,
                                 lambda x: np.std(x, ddof=1))
@@ -225,12 +430,94 @@ class TestMoments(unittest.TestCase):
         result = moments.rolling_corr(A, B, 50, min_periods=25)
         assert_almost_equal(result[-1], np.corrcoef(A[-50:], B[-50:])[0, 1])
 
+    def test_rolling_pairwise(self):
+        frame = self.frame.copy()
+        frame[0][:10] = np.NaN
+        frame[1][40:50] = np.NaN
+
+        cov = moments.rolling_cov_pairwise(frame, 20, min_periods=10)
+        corr = moments.rolling_corr_pairwise(frame, 20, min_periods=10)
+
+        self.assert_(isinstance(corr, WidePanel))
+        self.assertEqual(corr.values.shape, (N, K, K))
+
+        for i, j in [(0, 1), (1, 1), (3, 7)]:
+            for k in [5, 15, 45, 55, N - 1]:
+                x = frame[i].values[max(k - 19, 0) : k + 1]
+                y = frame[j].values[max(k - 19, 0) : k + 1]
+                mask = np.isfinite(x) & np.isfinite(y)
+
+                if mask.sum() < 10:
+                    self.assert_(np.isnan(cov.values[k, i, j]))
+                    continue
+
+                assert_almost_equal(cov.values[k, i, j],
+                                    np.cov(x[mask], y[mask])[0, 1])
+                assert_almost_equal(cov.values[k, j, i],
+                                    cov.values[k, i, j])
+                assert_almost_equal(corr.values[k, i, j],
+                                    np.corrcoef(x[mask], y[mask])[0, 1])
+
+        # no missing data: agrees with the binary functions
+        result = moments.rolling_corr_pairwise(self.frame, 20)
+        expected = moments.rolling_corr(self.frame[2], self.frame[5], 20)
+        assert_almost_equal(result.values[:, 2, 5], expected)
+
     def test_ewmcov(self):
         self._check_binary_ew(moments.ewmcov)
 
     def test_ewmcorr(self):
         self._check_binary_ew(moments.ewmcorr)
 
+    def test_ewm_fused_matches_ewma(self):
+        A = Series(randn(50), index=np.arange(50))
+        B = A[2:] + randn(48)
+
+        A[:10] = np.NaN
+        B[-10:] = np.NaN
+        B[20:25] = np.NaN
+
+        X = A + 0 * B
+        Y = B + 0 * A
+        mean = lambda x: moments.ewma(x, com=5, min_periods=3)
+        adj = 11. / 10.
+
+        result = moments.ewmcov(A, B, com=5, min_periods=3)
+        assert_almost_equal(result, (mean(X * Y) - mean(X) * mean(Y)) * adj)
+
+        result = moments.ewmvar(A, com=5, min_periods=3)
+        assert_almost_equal(result, (mean(A * A) - mean(A) ** 2) * adj)
+
+        var = lambda x: mean(x * x) - mean(x) ** 2
+        result = moments.ewmcorr(A, B, com=5, min_periods=3)
+        expected = (mean(X * Y) - mean(X) * mean(Y)) / np.sqrt(var(X) * var(Y))
+        assert_almost_equal(result, expected)
+
+        # span is accepted as well
+        assert_almost_equal(moments.ewmcov(A, B, span=11),
+                            moments.ewmcov(A, B, com=5))
+
+    def test_ewm_pairwise(self):
+        frame = self.frame.copy()
+        frame[0][:10] = np.NaN
+        frame[1][40:50] = np.NaN
+
+        cov = moments.ewmcov_pairwise(frame, com=10, min_periods=5)
+        corr = moments.ewmcorr_pairwise(frame, com=10, min_periods=5)
+
+        self.assert_(isinstance(cov, WidePanel))
+        self.assertEqual(cov.values.shape, (N, K, K))
+
+        for i, j in [(0, 1), (1, 1), (3, 7)]:
+            expected = moments.ewmcov(frame[i], frame[j], com=10,
+                                      min_periods=5)
+            assert_almost_equal(cov.values[:, i, j], expected)
+            assert_almost_equal(cov.values[:, j, i], expected)
+
+            expected = moments.ewmcorr(frame[i], frame[j], com=10,
+                                       min_periods=5)
+            assert_almost_equal(corr.values[:, i, j], expected)
+
     def _check_binary_ew(self, func):
         A = Series(randn(50), index=np.arange(50))
         B = A[2:] + randn(48)
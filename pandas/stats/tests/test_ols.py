@@ -151,6 +151,86 @@ class TestOLS(BaseTest):
 
             assert_almost_equal(ref, res)
 
+class TestMultiOLS(BaseTest):
+
+    def setUp(self):
+        BaseTest.setUp(self)
+
+        y = self.A.copy()
+        y['ColA'][:5] = np.NaN
+        y['ColB'][10:12] = np.NaN
+        y['ColD'][:5] = np.NaN
+
+        x = self.B.filter(['ColA', 'ColB'])
+        x['ColA'][50] = np.NaN
+
+        self.y = y
+        self.x = x
+
+    def testFullSample(self):
+        result = ols(y=self.y, x=self.x)
+
+        # ColA and ColD share a group
+        self.assertEqual(len(result._groups), 3)
+
+        for col in self.y.columns:
+            static = ols(y=self.y[col], x=self.x)
+
+            assert_almost_equal(static._beta_raw, result.beta.xs(col))
+            assert_almost_equal(static._std_err_raw, result.std_err.xs(col))
+            assert_almost_equal(static._t_stat_raw, result.t_stat.xs(col))
+            assert_almost_equal(static._p_value_raw, result.p_value.xs(col))
+            assert_almost_equal(static.r2, result.r2[col])
+            assert_almost_equal(static.r2_adj, result.r2_adj[col])
+            assert_almost_equal(static.rmse, result.rmse[col])
+            assert_almost_equal(static.nobs, result.nobs[col])
+            assert_almost_equal(static.df_resid, result.df_resid[col])
+
+            resid = result.resid[col].reindex(static.resid.index)
+            assert_almost_equal(static.resid, resid)
+
+    def testUnsupportedOptions(self):
+        for kwds in [dict(nw_lags=2), dict(cluster='time'),
+                     dict(weights=self.y)]:
+            self.assertRaises(Exception, ols, y=self.y, x=self.x, **kwds)
+
+        # defaults are fine
+        result = ols(y=self.y, x=self.x, nw_lags=None, nw_overlap=False)
+        self.assertEqual(len(result._groups), 3)
+
+    def testRolling(self):
+        self.checkMoving(window_type='rolling', window=20)
+        self.checkMoving(window_type='rolling', window=20, min_periods=10)
+
+    def testExpanding(self):
+        self.checkMoving(window_type='expanding')
+
+    def checkMoving(self, **kwds):
+        result = ols(y=self.y, x=self.x, **kwds)
+
+        for col in self.y.columns:
+            moving = ols(y=self.y[col], x=self.x, **kwds)
+            dates = moving.beta.index
+
+            def _check(ref, res):
+                assert_almost_equal(ref.values, res.reindex(dates).values)
+
+            _check(moving.beta, result.beta[col])
+            _check(moving.std_err, result.std_err[col])
+            _check(moving.t_stat, result.t_stat[col])
+            _check(moving.r2, result.r2[col])
+            _check(moving.r2_adj, result.r2_adj[col])
+            _check(moving.rmse, result.rmse[col])
+            _check(moving.nobs, result.nobs[col])
+
+            # no estimates on the other dates
+            others = result.r2.index - dates
+            self.assert_(np.isnan(result.r2[col].reindex(others)).all())
+            self.assert_(np.isnan(result.nobs[col].reindex(others)).all())
+
+            # so summaries match those of the target's own regression
+            assert_almost_equal(moving.nobs.mean(), result.nobs[col].mean())
+
 class TestPanelOLS(BaseTest):
 
 
@@ -256,6 +336,51 @@ class TestPanelOLS(BaseTest):
 
         # _check_non_raw_results(result)
 
+    def testEntityEffectsDemeaned(self):
+        self.checkEntityEffects()
+        self.checkEntityEffects(dropped='ColC')
+        self.checkEntityEffects(intercept=False)
+
+    def checkEntityEffects(self, dropped=None, intercept=True):
+        y = self.panel_y
+        entities = list(y.columns)
+
+        if dropped is not None:
+            kwds = {'dropped_dummies' : {'entity' : dropped}}
+        else:
+            kwds = {}
+            dropped = entities[0]
+
+        result = ols(y=y, x=self.panel_x, entity_effects=True,
+                     intercept=intercept, **kwds)
+
+        # no dummy columns were added
+        self.assert_(result._entity_labels is not None)
+        self.assertEqual(list(result._x.items), ['B', 'C'])
+
+        # same regression with explicit dummy regressors
+        x = dict(self.panel_x)
+        for entity in entities:
+            if intercept and entity == dropped:
+                continue
+
+            dummy = DataMatrix(np.zeros(y.values.shape), index=y.index,
+                               columns=y.columns)
+            dummy[entity] = 1.
+            x['FE_%s' % entity] = dummy
+
+        reference = ols(y=y, x=x, intercept=intercept)
+
+        names = reference.beta.index
+        self.assert_(result.beta.index.equals(names))
+
+        for field in ['beta', 'df', 'df_model', 'df_resid', 'f_stat',
+                      'p_value', 'r2', 'r2_adj', 'rmse', 'std_err', 't_stat',
+                      'var_beta', 'resid', 'y_fitted']:
+            attr = '_%s_raw' % field
+            assert_almost_equal(getattr(reference, attr),
+                                getattr(result, attr))
+
     def testWithEntityEffectsAndDroppedDummies(self):
         result = ols(y=self.panel_y2, x=self.panel_x2, entity_effects=True,
                      dropped_dummies={'entity' : 'B'})
@@ -391,6 +516,23 @@ class TestPanelOLS(BaseTest):
         for attr in NonPooledPanelOLS.ATTRIBUTES:
             _check_repr(getattr(result, attr))
 
+    def testNonPooledParallel(self):
+        for kwds in [{}, dict(window_type='rolling', window=25,
+                              min_periods=10)]:
+            serial = ols(y=self.panel_y, x=self.panel_x, pool=False, **kwds)
+            parallel = ols(y=self.panel_y, x=self.panel_x, pool=False,
+                           n_jobs=2, **kwds)
+
+            self.assertEqual(sorted(serial.results),
+                             sorted(parallel.results))
+
+            for entity, result in serial.results.iteritems():
+                other = parallel.results[entity]
+                assert_almost_equal(result.beta.values, other.beta.values)
+                assert_almost_equal(result.std_err.values,
+                                    other.std_err.values)
+                assert_almost_equal(result.resid.values, other.resid.values)
+
     def checkMovingOLS(self, x, y, window_type='rolling', **kwds):
         window = 25  # must be larger than rank of x
 
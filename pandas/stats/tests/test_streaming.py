@@ -0,0 +1,102 @@
+import cPickle as pickle
+import unittest
+
+from datetime import datetime
+from numpy.random import randn
+import numpy as np
+
+from pandas.core.api import Series, DataMatrix, DateRange
+from pandas.stats.streaming import EWMState, RollingState
+from pandas.util.testing import assert_almost_equal
+import pandas.stats.moments as moments
+
+N, K = 100, 5
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        values = randn(N, K)
+        values[:10, 0] = np.NaN
+        values[30:35, 1] = np.NaN
+        values[::7, 2] = np.NaN
+        values[:, 3] = np.NaN
+
+        self.matrix = DataMatrix(values,
+                                 index=DateRange(datetime(2009, 1, 1),
+                                                 periods=N),
+                                 columns=['a', 'b', 'c', 'd', 'e'])
+
+    def _stream(self, state, frame):
+        results = []
+        for date in frame.index:
+            m = state.update(frame.xs(date))
+            results.append((m.mean(), m.var(), m.std()))
+
+        return results
+
+    def test_ewm_state(self):
+        state = EWMState(com=5, min_periods=3)
+        results = self._stream(state, self.matrix)
+
+        mean = moments.ewma(self.matrix, com=5, min_periods=3)
+        var = moments.ewmvar(self.matrix, com=5, min_periods=3)
+
+        for i in [0, 5, 12, 33, N - 1]:
+            date = self.matrix.index[i]
+            assert_almost_equal(results[i][0], mean.xs(date))
+            assert_almost_equal(results[i][1], var.xs(date))
+            assert_almost_equal(results[i][2], np.sqrt(var.xs(date)))
+
+        self.assert_(isinstance(results[-1][0], Series))
+
+    def test_rolling_state(self):
+        state = RollingState(20, min_periods=10)
+        results = self._stream(state, self.matrix)
+
+        mean = moments.rolling_mean(self.matrix, 20, min_periods=10)
+        var = moments.rolling_var(self.matrix, 20, min_periods=10)
+
+        for i in [0, 5, 12, 19, 20, 33, N - 1]:
+            date = self.matrix.index[i]
+            assert_almost_equal(results[i][0], mean.xs(date))
+            assert_almost_equal(results[i][1], var.xs(date))
+
+        assert_almost_equal(state.sum(),
+                            moments.rolling_sum(self.matrix, 20,
+                                                min_periods=10).xs(date))
+        assert_almost_equal(state.count(),
+                            moments.rolling_count(self.matrix, 20).xs(date))
+
+    def test_seed_and_pickle(self):
+        head = self.matrix.truncate(after=self.matrix.index[59])
+        tail = self.matrix.truncate(before=self.matrix.index[60])
+
+        for cls, kwds in [(EWMState, dict(com=5, min_periods=3)),
+                          (RollingState, dict(window=20, min_periods=10))]:
+            full = cls(**kwds)
+            self._stream(full, self.matrix)
+
+            seeded = cls.from_history(head, **kwds)
+            seeded = pickle.loads(pickle.dumps(seeded))
+            self._stream(seeded, tail)
+
+            assert_almost_equal(seeded.mean(), full.mean())
+            assert_almost_equal(seeded.var(), full.var())
+
+    def test_update_returns_state(self):
+        row = self.matrix.xs(self.matrix.index[0])
+
+        for state in [EWMState(com=5), RollingState(20, min_periods=1)]:
+            self.assert_(state.update(row) is state)
+            assert_almost_equal(state.update(row).mean(), state.mean())
+
+    def test_ndarray(self):
+        arr = randn(N)
+        state = EWMState(span=10)
+        for x in arr:
+            state.update(x)
+
+        assert_almost_equal(state.mean(), moments.ewma(arr, span=10)[-1:])
+
+if __name__ == '__main__':
+    unittest.main()
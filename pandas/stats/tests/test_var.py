@@ -5,14 +5,17 @@ from pandas.util.testing import assert_almost_equal
 import nose
 import unittest
 
-raise nose.SkipTest('skipping this for now')
+import numpy as np
 
-import scikits.statsmodels.tsa.var as sm_var
-import scikits.statsmodels as sm
+from pandas.core.api import DataFrame, DateRange
+from pandas.stats.api import ols
+from pandas.stats.var import VAR, lag_select
 
-import pandas.stats.var as _pvar
-reload(_pvar)
-from pandas.stats.var import VAR
+try:
+    import scikits.statsmodels.tsa.var as sm_var
+    import scikits.statsmodels as sm
+except ImportError:
+    pass
 
 try:
     import rpy2.robjects as robj
@@ -30,6 +33,149 @@ DECIMAL_4 = 4
 DECIMAL_3 = 3
 DECIMAL_2 = 2
 
+def _simulate_var(nobs, lag_betas, alpha, seed=None):
+    """
+    Simulates nobs observations of the VAR y_t = alpha + B_1 y_(t-1) + ...
+    + B_p y_(t-p) + e_t, with standard normal e_t
+    """
+    if seed is not None:
+        np.random.seed(seed)
+
+    k = len(alpha)
+    p = len(lag_betas)
+
+    burn = 100
+    values = np.zeros((nobs + burn, k))
+    shocks = np.random.randn(nobs + burn, k)
+    for t in xrange(p, nobs + burn):
+        values[t] = alpha + shocks[t]
+        for i, b in enumerate(lag_betas):
+            values[t] += np.dot(b, values[t - i - 1])
+
+    values = values[burn:]
+
+    index = DateRange('1/1/2000', periods=nobs)
+    return DataFrame(values, index=index, columns=['a', 'b', 'c'])
+
+_B1 = np.array([[0.5, 0.1, 0.0],
+                [0.0, 0.3, 0.2],
+                [0.1, 0.0, 0.4]])
+
+_B2 = np.array([[-0.3, 0.0, 0.1],
+                [0.2, -0.2, 0.0],
+                [0.0, 0.1, -0.3]])
+
+_ALPHA = np.array([0.1, -0.2, 0.3])
+
+class TestVARFit(unittest.TestCase):
+
+    def setUp(self):
+        self.data = _simulate_var(200, [_B1, _B2], _ALPHA, seed=12345)
+        self.p = 2
+        self.model = VAR(self.data, p=self.p)
+
+    def _lagged(self):
+        values = self.data.values
+        T = len(values)
+        y = values[self.p:]
+        x = np.hstack([values[self.p - i : T - i]
+                       for i in xrange(1, 1 + self.p)])
+        return y, x
+
+    def test_beta_vs_ols(self):
+        beta = self.model.beta
+        results = self.model.ols_results
+
+        for col in self.data.columns:
+            result = results[col]
+            for name in beta.index:
+                assert_almost_equal(beta[col][name], result.beta[name])
+
+    def test_resid_vs_ols(self):
+        resid = self.model.resid
+        results = self.model.ols_results
+
+        for col in self.data.columns:
+            expected = results[col].resid
+            assert_almost_equal(resid[col].reindex(expected.index).values,
+                                expected.values)
+
+    def test_granger_causality(self):
+        y, x = self._lagged()
+        k = len(self.data.columns)
+        nobs = len(y)
+        x = np.hstack((x, np.ones((nobs, 1))))
+
+        def _ssr(y, x):
+            beta = np.linalg.lstsq(x, y)[0]
+            return ((y - np.dot(x, beta)) ** 2).sum(0)
+
+        ssr_full = _ssr(y, x)
+        df_resid = nobs - x.shape[1]
+
+        f_stats = self.model.granger_causality['f-stat']
+        for i, dropped in enumerate(self.data.columns):
+            keep = [j for j in xrange(x.shape[1]) if j >= k * self.p or
+                    j % k != i]
+            ssr_reduced = _ssr(y, x.take(keep, 1))
+
+            expected = (((ssr_reduced - ssr_full) / self.p) /
+                        (ssr_full / df_resid))
+
+            for j, col in enumerate(self.data.columns):
+                assert_almost_equal(f_stats[col][dropped], expected[j])
+
+    def test_forecast(self):
+        h = 5
+        forecast = self.model.forecast(h)
+
+        beta = self.model.beta
+        cols = self.data.columns
+        lag_betas = [np.array([[beta[row][_name(i, col)] for col in cols]
+                               for row in cols])
+                     for i in xrange(1, 1 + self.p)]
+        alpha = np.array([beta[col]['intercept'] for col in cols])
+
+        history = list(self.data.values)
+        for step in xrange(1, 1 + h):
+            value = alpha.copy()
+            for i, b in enumerate(lag_betas):
+                value += np.dot(b, history[-1 - i])
+            history.append(value)
+
+            for j, col in enumerate(cols):
+                assert_almost_equal(forecast[col][step], value[j])
+
+    def test_forecast_std_err(self):
+        # the one step forecast error is the innovation
+        std_err = self.model.forecast_std_err(1)
+        sigma = self.model._sigma
+
+        for j, col in enumerate(self.data.columns):
+            assert_almost_equal(std_err[col][1], np.sqrt(sigma[j, j]))
+
+    def test_lag_select(self):
+        data = _simulate_var(2000, [_B1, _B2], _ALPHA, seed=54321)
+
+        self.assertEqual(lag_select(data, max_lags=5, ic='bic'), 2)
+        self.assertEqual(lag_select(data, max_lags=5, ic='aic'), 2)
+
+        criteria = lag_select(data, max_lags=5)
+        assert_equal(list(criteria.index), range(1, 6))
+
+        self.assertRaises(Exception, lag_select, data, max_lags=5,
+                          ic='hqic')
+
+    def test_lag_select_vs_fit(self):
+        # with max_lags equal to the order, the criteria match the full fit
+        criteria = lag_select(self.data, max_lags=self.p)
+
+        assert_almost_equal(criteria['aic'][self.p], self.model.aic)
+        assert_almost_equal(criteria['bic'][self.p], self.model.bic)
+
+def _name(lag, col):
+    return 'L%d.%s' % (lag, col)
+
 class CheckVAR(object):
     def test_params(self):
         assert_almost_equal(self.res1.params, self.res2.params, DECIMAL_3)
@@ -5,9 +5,8 @@ import numpy as np
 from pandas.util.decorators import cache_readonly
 from pandas.core.matrix import DataFrame, DataMatrix
 from pandas.core.panel import WidePanel
-from pandas.core.series import Series
 import pandas.stats.common as common
-from pandas.stats.math import chain_dot, inv
+from pandas.stats.math import chain_dot, inv, solve
 from pandas.stats.ols import _combine_rhs
 
 class VAR(object):
@@ -23,8 +22,6 @@ class VAR(object):
     """
 
     def __init__(self, data, p=1, intercept=True):
-        import scikits.statsmodels.tsa.var as sm_var
-
         self._data = DataFrame(_combine_rhs(data))
         self._p = p
 
@@ -54,9 +51,8 @@ class VAR(object):
         -------
         DataFrame
         """
-        d = dict([(key, value.beta)
-                  for (key, value) in self.ols_results.iteritems()])
-        return DataFrame(d)
+        return DataFrame(self._beta_raw, index=self._param_names,
+                         columns=self._columns)
 
     def forecast(self, h):
         """
@@ -120,47 +116,41 @@ class VAR(object):
         and 'p-value' returns the DataMatrix containing the corresponding
         p-values of the f-stats.
         """
-        from pandas.stats.api import ols
         from scipy.stats import f
 
-        d = {}
-        for col in self._columns:
-            d[col] = {}
-            for i in xrange(1, 1 + self._p):
-                lagged_data = self._lagged_data[i].filter(self._columns - [col])
-
-                for key, value in lagged_data.iteritems():
-                    d[col][_make_param_name(i, key)] = value
-
-        f_stat_dict = {}
-        p_value_dict = {}
-
-        for col, y in self._data.iteritems():
-            ssr_full = (self.resid[col] ** 2).sum()
+        k = self._k
+        y = self._y_raw
+        x = _add_intercept(self._x_lags)
 
-            f_stats = []
-            p_values = []
+        ssr_full = (self._resid_raw ** 2).sum(1)
 
-            for col2 in self._columns:
-                result = ols(y=y, x=d[col2])
+        M = self._p
+        N = self._nobs
+        K = self._k * self._p + 1
 
-                resid = result.resid
-                ssr_reduced = (resid ** 2).sum()
+        # the restricted regressions drop the lags of one variable from the
+        # regression on all lags and the intercept, which increases the sum of
+        # squared residuals by b' V^-1 b, b the dropped coefficients and V
+        # their block of (X'X)^-1
+        xx_inv = inv(np.dot(x.T, x))
+        beta = np.dot(xx_inv, np.dot(x.T, y))
+        ssr_unrestricted = ((y - np.dot(x, beta)) ** 2).sum(0)
 
-                M = self._p
-                N = self._nobs
-                K = self._k * self._p + 1
-                f_stat = ((ssr_reduced - ssr_full) / M) / (ssr_full / (N - K))
-                f_stats.append(f_stat)
+        f_stats = np.empty((k, k))
+        for i in xrange(k):
+            cols = np.arange(i, k * self._p, k)
+            b = beta.take(cols, 0)
+            v = xx_inv.take(cols, 0).take(cols, 1)
 
-                p_value = f.sf(f_stat, M, N - K)
-                p_values.append(p_value)
+            ssr_reduced = ssr_unrestricted + (b * solve(v, b)).sum(0)
+            f_stats[i] = ((ssr_reduced - ssr_full) / M) / (ssr_full / (N - K))
 
-            f_stat_dict[col] = Series(f_stats, self._columns)
-            p_value_dict[col] = Series(p_values, self._columns)
+        p_values = f.sf(f_stats, M, N - K)
 
-        f_stat_mat = DataFrame(f_stat_dict)
-        p_value_mat = DataFrame(p_value_dict)
+        f_stat_mat = DataFrame(f_stats, index=self._columns,
+                               columns=self._columns)
+        p_value_mat = DataFrame(p_values, index=self._columns,
+                                columns=self._columns)
 
         return {
             'f-stat' : f_stat_mat,
@@ -207,9 +197,10 @@ class VAR(object):
         -------
         DataMatrix
         """
-        d = dict([(col, series.resid)
-                  for (col, series) in self.ols_results.iteritems()])
-        return DataFrame(d, index=self._index)
+        dates = self._index[self._regression_data[2]]
+        resid = DataFrame(self._resid_raw.T, index=dates,
+                          columns=self._columns)
+        return resid.reindex(self._index)
 
     @cache_readonly
     def summary(self):
@@ -249,15 +240,24 @@ BIC:                            %(bic).3f
 
     @cache_readonly
     def _beta_raw(self):
-        return np.array([self.beta[col].values() for col in self._columns]).T
-
-    def _trans_B(self, h):
         """
-        Returns 0, 1, ..., (h-1)-th power of transpose of B as defined in
-        equation (4) on p. 142 of the Stata 11 Time Series reference book.
+        Returns the (k * p [+ 1]) x k array of coefficients, the j-th column
+        from regressing the j-th column of the data on the lagged data (lag
+        1 of all columns, then lag 2, ...) and the intercept, in one least
+        squares fit for all equations
         """
-        result = [np.eye(1 + self._k * self._p)]
+        x = self._x_lags
+        if self._intercept:
+            x = _add_intercept(x)
 
+        return solve(np.dot(x.T, x), np.dot(x.T, self._y_raw))
+
+    @cache_readonly
+    def _companion(self):
+        """
+        Returns the transpose of B as defined in equation (4) on p. 142 of
+        the Stata 11 Time Series reference book.
+        """
         row1 = np.zeros((1, 1 + self._k * self._p))
         row1[0, 0] = 1
 
@@ -271,26 +271,44 @@ BIC:                            %(bic).3f
             np.zeros((m, self._k))
         ))
 
-        trans_B = np.vstack((row1, row2, row3)).T
+        return np.vstack((row1, row2, row3)).T
+
+    @cache_readonly
+    def _companion_powers(self):
+        return [np.eye(1 + self._k * self._p), self._companion]
 
-        result.append(trans_B)
+    def _trans_B(self, h):
+        """
+        Returns 0, 1, ..., (h-1)-th power of transpose of B as defined in
+        equation (4) on p. 142 of the Stata 11 Time Series reference book.
+        """
+        # powers are computed once and kept for longer horizons
+        result = self._companion_powers
 
-        for i in xrange(2, h):
-            result.append(np.dot(trans_B, result[i - 1]))
+        while len(result) < h:
+            result.append(np.dot(self._companion, result[-1]))
 
-        return result
+        return result[:max(h, 2)]
 
     @cache_readonly
-    def _x(self):
-        values = np.array([
-            self._lagged_data[i][col].values()
-            for i in xrange(1, 1 + self._p)
-            for col in self._columns
-        ]).T
+    def _regression_data(self):
+        """
+        Returns y, the p lags of y, and the locations in the index of the
+        observations with complete data
+        """
+        return _lag_data(self._data.values, self._p)
 
-        x = np.hstack((np.ones((len(values), 1)), values))[self._p:]
+    @cache_readonly
+    def _y_raw(self):
+        return self._regression_data[0]
+
+    @cache_readonly
+    def _x_lags(self):
+        return self._regression_data[1]
 
-        return x
+    @cache_readonly
+    def _x(self):
+        return np.hstack((np.ones((len(self._x_lags), 1)), self._x_lags))
 
     @cache_readonly
     def _cov_beta(self):
@@ -376,19 +394,17 @@ BIC:                            %(bic).3f
         Returns the forecast at 1, 2, ..., h timesteps in the future.
         """
         k = self._k
+        lag_betas = np.hstack(self._lag_betas)
+
+        # the last p observed cross-sections, most recent first
+        state = np.hstack([np.atleast_2d(self._data_xs(-j))
+                           for j in xrange(1, 1 + self._p)])
+
         result = []
         for i in xrange(h):
-            sum = self._alpha.reshape(1, k)
-            for j in xrange(self._p):
-                beta = self._lag_betas[j]
-                idx = i - j
-                if idx > 0:
-                    y = result[idx - 1]
-                else:
-                    y = self._data_xs(idx - 1)
-
-                sum = sum + np.dot(beta, y.T).T
-            result.append(sum)
+            y = self._alpha + np.dot(state, lag_betas.T)
+            result.append(y)
+            state = np.hstack((y, state[:, :-k]))
 
         return np.array(result)
 
@@ -405,12 +421,7 @@ BIC:                            %(bic).3f
         """
         Returns the Akaike/Bayesian information criteria.
         """
-        RSS = self._rss
-        k = self._p * (self._k * self._p + 1)
-        n = self._nobs * self._k
-
-        return {'aic' : 2 * k + n * np.log(RSS / n),
-                'bic' : n * np.log(RSS / n) + k * np.log(n)}
+        return _info_criteria(self._rss, self._nobs, self._k, self._p)
 
     @cache_readonly
     def _k(self):
@@ -435,7 +446,22 @@ BIC:                            %(bic).3f
 
     @cache_readonly
     def _nobs(self):
-        return len(self._data) - self._p
+        return len(self._y_raw)
+
+    @cache_readonly
+    def _param_names(self):
+        names = [_make_param_name(i, col)
+                 for i in xrange(1, 1 + self._p)
+                 for col in self._columns]
+
+        if self._intercept:
+            names.append('intercept')
+
+        return names
+
+    @cache_readonly
+    def _psi_values(self):
+        return [np.eye(self._k)]
 
     def _psi(self, h):
         """
@@ -444,20 +470,24 @@ BIC:                            %(bic).3f
         Returns [psi_0, psi_1, ..., psi_(h - 1)]
         """
         k = self._k
-        result = [np.eye(k)]
-        for i in xrange(1, h):
-            result.append(sum(
-                [np.dot(result[i - j], self._lag_betas[j - 1])
-                 for j in xrange(1, 1 + i)
-                 if j <= self._p]))
+        result = self._psi_values
 
-        return result
+        # psi_i = psi_(i-1) B_1 + ... + psi_(i-p) B_p, as a single product
+        lag_betas = np.vstack(self._lag_betas)
+        while len(result) < h:
+            recent = result[:-1 - self._p:-1]
+            result.append(np.dot(np.hstack(recent),
+                                 lag_betas[:k * len(recent)]))
+
+        return result[:h]
 
     @cache_readonly
     def _resid_raw(self):
-        resid = np.array([self.ols_results[col]._resid_raw
-                          for col in self._columns])
-        return resid
+        x = self._x_lags
+        if self._intercept:
+            x = _add_intercept(x)
+
+        return (self._y_raw - np.dot(x, self._beta_raw)).T
 
     @cache_readonly
     def _rss(self):
@@ -477,7 +507,7 @@ BIC:                            %(bic).3f
     def __repr__(self):
         return self.summary
 
-def lag_select(data, max_lags=5, ic=None):
+def lag_select(data, max_lags=5, ic=None, intercept=True):
     """
     Select number of lags based on a variety of information criteria
 
@@ -486,14 +516,55 @@ def lag_select(data, max_lags=5, ic=None):
     data : DataFrame-like
     max_lags : int
         Maximum number of lags to evaluate
-    ic : {None, 'aic', 'bic', ...}
-        Choosing None will just display the results
+    ic : {None, 'aic', 'bic'}
+        Choosing None will just return the criteria for every lag order
 
     Returns
     -------
-    None
+    DataMatrix of the criteria (lag orders 1, ..., max_lags x criteria) if ic
+    is None, otherwise the lag order minimizing the chosen criterion
+
+    Notes
+    -----
+    All lag orders are fit on the same observations, those with max_lags
+    prior observations, so that their criteria are comparable. The lagged
+    data and its cross products are formed once and shared by all fits
     """
-    pass
+    values = DataFrame(_combine_rhs(data)).values
+    y, x, _ = _lag_data(values, max_lags)
+
+    nobs, k = y.shape
+
+    if intercept:
+        x = _add_intercept(x)
+
+    xx = np.dot(x.T, x)
+    xy = np.dot(x.T, y)
+
+    criteria = {'aic' : [], 'bic' : []}
+    for p in xrange(1, max_lags + 1):
+        # the first p lags, and the intercept in the last column
+        cols = np.arange(k * p)
+        if intercept:
+            cols = np.concatenate((cols, [x.shape[1] - 1]))
+
+        resid = _ls_resid(y, x.take(cols, 1), xx.take(cols, 0).take(cols, 1),
+                          xy.take(cols, 0))
+
+        result = _info_criteria((resid ** 2).sum(), nobs, k, p)
+        for key, value in result.iteritems():
+            criteria[key].append(value)
+
+    result = DataMatrix(criteria, index=range(1, max_lags + 1))
+
+    if ic is None:
+        return result
+
+    if ic not in criteria:
+        raise Exception('Unknown information criterion: %s' % ic)
+
+    values = result[ic]
+    return values.index[values.values.argmin()]
 
 class PanelVAR(VAR):
     """
@@ -511,17 +582,6 @@ class PanelVAR(VAR):
 
         self._columns = self._data.items
 
-    @cache_readonly
-    def _nobs(self):
-        """Returns the number of observations."""
-        _, timesteps, entities = self._data.values.shape
-        return (timesteps - self._p) * entities
-
-    @cache_readonly
-    def _rss(self):
-        """Returns the sum of the squares of the residuals."""
-        return (self.resid.values ** 2).sum()
-
     def forecast(self, h):
         """
         Returns the forecasts at 1, 2, ..., n timesteps in the future.
@@ -541,22 +601,39 @@ class PanelVAR(VAR):
 
         Returns
         -------
-        DataMatrix
+        WidePanel
         """
-        d = dict([(key, value.resid)
-                  for (key, value) in self.ols_results.iteritems()])
-        return WidePanel.fromDict(d)
+        _, _, dates, entities = self._regression_data
 
-    def _data_xs(self, i):
-        return self._data.values[:, i, :].T
+        values = np.empty(self._data.values.shape)
+        values.fill(np.NaN)
+        values[:, dates, entities] = self._resid_raw
+
+        return WidePanel(values, self._data.items, self._data.major_axis,
+                         self._data.minor_axis)
 
     @cache_readonly
-    def _sigma(self):
-        """Returns covariance of resids."""
-        k = self._k
-        resid = _drop_incomplete_rows(self.resid.toLong().values)
-        n = len(resid)
-        return np.dot(resid.T, resid) / (n - k)
+    def _regression_data(self):
+        """
+        Returns y, the p lags of y, and the locations in the major and minor
+        axes of the observations with complete data, stacked over the
+        entities (a pooled regression)
+        """
+        values = self._data.values
+
+        pieces = [_lag_data(values[:, :, j].T, self._p)
+                  for j in xrange(values.shape[2])]
+
+        y = np.vstack([y for y, _, _ in pieces])
+        x = np.vstack([x for _, x, _ in pieces])
+        dates = np.concatenate([rows for _, _, rows in pieces])
+        entities = np.concatenate([np.repeat(j, len(rows))
+                                   for j, (_, _, rows) in enumerate(pieces)])
+
+        return y, x, dates, entities
+
+    def _data_xs(self, i):
+        return self._data.values[:, i, :].T
 
 
 def _prep_panel_data(data):
@@ -566,10 +643,44 @@ def _prep_panel_data(data):
 
     return WidePanel.fromDict(data)
 
-def _drop_incomplete_rows(array):
-    mask = np.isfinite(array).all(1)
-    indices = np.arange(len(array))[mask]
-    return array.take(indices, 0)
+def _lag_data(values, p):
+    """
+    Returns the rows of values (T x k) from the p-th on, the matrix of their
+    1, ..., p lagged values (lag-major), and the row locations, dropping
+    rows with missing data
+    """
+    T = len(values)
+
+    y = values[p:]
+    x = np.hstack([values[p - i : T - i] for i in xrange(1, 1 + p)])
+    rows = np.arange(p, T)
+
+    mask = np.isfinite(y).all(1) & np.isfinite(x).all(1)
+    if not mask.all():
+        y, x, rows = y[mask], x[mask], rows[mask]
+
+    return y, x, rows
+
+def _add_intercept(x):
+    return np.hstack((x, np.ones((len(x), 1))))
+
+def _ls_resid(y, x, xx, xy):
+    """
+    Residuals of the least squares fits of each column of y on x, given the
+    cross products xx = x'x and xy = x'y
+    """
+    return y - np.dot(x, solve(xx, xy))
+
+def _info_criteria(rss, nobs, k, p):
+    """
+    Returns the Akaike/Bayesian information criteria of a VAR(p) of k
+    variables given the sum of squared residuals
+    """
+    n_params = p * (k * p + 1)
+    n = nobs * k
+
+    return {'aic' : 2 * n_params + n * np.log(rss / n),
+            'bic' : n * np.log(rss / n) + n_params * np.log(n)}
 
 def _make_param_name(lag, name):
     return 'L%d.%s' % (lag, name)